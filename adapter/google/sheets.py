@@ -24,13 +24,18 @@ def get_gid(sheet_name: str):
 
 
 def get_values(sheet_name: str, _range: str):
+    return to_dict(get_rows(sheet_name, _range))
+
+
+def get_rows(sheet_name: str, _range: str) -> List[List[str]]:
+    """cells of `_range` as the sheet returns them, trailing blank cells left out"""
     result = (
         service()
         .values()
         .get(spreadsheetId=constants.SPREADSHEET_ID, range=f"'{sheet_name}'!{_range}")
         .execute()
     )
-    return to_dict(result.get("values", []))
+    return result.get("values", [])
 
 
 def to_dict(sheet_values: List[List[str]]):
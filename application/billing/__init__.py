@@ -0,0 +1,2 @@
+from .invoice import *
+from .simulator import *
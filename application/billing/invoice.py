@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+import constants
+from application.spotmar import deal_log as spotmar_log
+from application.spotmar import fee as spotmar_fee
+from application.swap import deal_log as swap_log
+from application.swap import fee as swap_fee
+from utils import numberutils, stringutils
+from .simulator import SPOTMAR_DEAL_LOG
+
+INVOICE_DIR = os.path.join(constants.OUTPUT_DIR, "invoice")
+SPOTMAR = "SPOTMAR"
+
+
+@dataclass(frozen=True)
+class Charge:
+    """brokerage owed by one side of one deal"""
+
+    house: str
+    month: str  # yyyy-mm
+    currency: str
+    product: str
+    amount: int
+    exempt: bool  # a switched side, listed on the invoice but not charged
+
+
+@dataclass
+class Invoice:
+    house: str
+    month: str
+    currency: str
+    total: int = field(default=0)
+    deals: int = field(default=0)
+    exempt: int = field(default=0)  # switched sides
+    product_to_amount: Dict[str, int] = field(default_factory=dict)
+
+    def add(self, charge: Charge) -> None:
+        if charge.exempt:
+            self.exempt += 1
+            return
+        self.deals += 1
+        self.total += charge.amount
+        self.product_to_amount[charge.product] = (
+            self.product_to_amount.get(charge.product, 0) + charge.amount
+        )
+
+    @property
+    def file_name(self) -> str:
+        return f"{self.month} {self.house} {self.currency}.txt"
+
+    def to_document(self) -> str:
+        lines = [
+            f"BROKERAGE INVOICE {self.month}",
+            f"HOUSE: {self.house}",
+            f"CURRENCY: {self.currency}",
+            "",
+            *(
+                f"{product:<10}{numberutils.accounting_format(amount)}"
+                for product, amount in sorted(self.product_to_amount.items())
+            ),
+            f"{'TOTAL':<10}{numberutils.accounting_format(self.total)}",
+            "",
+            f"DEALS CHARGED: {self.deals}",
+            f"SWITCHED, NOT CHARGED: {self.exempt}",
+        ]
+        return "\n".join(lines)
+
+
+def invoices(charges: Iterable[Charge]) -> List[Invoice]:
+    """
+    Rolls charges up into one invoice per (house, month, currency).
+    Charges are consumed one at a time, only the running invoices are kept.
+    """
+    key_to_invoice: Dict[Tuple[str, str, str], Invoice] = {}
+    for charge in charges:
+        key = charge.house, charge.month, charge.currency
+        invoice = key_to_invoice.get(key)
+        if invoice is None:
+            invoice = key_to_invoice[key] = Invoice(*key)
+        invoice.add(charge)
+    return [key_to_invoice[k] for k in sorted(key_to_invoice)]
+
+
+def write_invoices(invoices: Iterable[Invoice], directory: str = INVOICE_DIR) -> int:
+    os.makedirs(directory, exist_ok=True)
+    count = 0
+    for invoice in invoices:
+        with open(os.path.join(directory, invoice.file_name), "w") as f:
+            f.write(invoice.to_document())
+        count += 1
+    return count
+
+
+def spotmar_log_charges(file_path: str = SPOTMAR_DEAL_LOG) -> Iterator[Charge]:
+    """
+    Charges of the bid bro and offer bro columns of a spotmar deal log,
+    read a chunk of typed records at a time.
+    """
+    for record in spotmar_log.read_log(file_path):
+        for house, amount in (
+            (record.buy, record.bid_brokerage_fee),
+            (record.sell, record.offer_brokerage_fee),
+        ):
+            yield Charge(
+                house=house,
+                month=_month(record.trade_date),
+                currency=spotmar_fee.get_fee(house, record.trade_date).currency,
+                product=SPOTMAR,
+                amount=amount or 0,
+                exempt=amount is None,
+            )
+
+
+def swap_row_charges(rows: Iterable[dict]) -> Iterator[Charge]:
+    """swap daily sheet rows, see `swap_log_charges`"""
+    return swap_log_charges(swap_log.from_row(row) for row in rows)
+
+
+def swap_log_charges(records: Iterable[swap_log.LogRecord]) -> Iterator[Charge]:
+    """
+    Charges of swap log records, priced like `swap.Deal.of` without building deals.
+
+    :param records: e.g. `swap.deal_log.read_log` over a csv export of the daily sheet
+    """
+    for record in records:
+        trade_date = record.trade_date
+        for nickname, switch in (
+            (record.bid, record.bid_switch),
+            (record.offer, record.offer_switch),
+        ):
+            trader = stringutils.get_trader(nickname)
+            house = f"{trader.get('house', '')} {trader.get('entity', '')}"
+            amount, currency = swap_fee.calculate_fee(
+                house, record.product, record.tenor, trade_date
+            )
+            yield Charge(
+                house=house.upper(),
+                month=_month(trade_date),
+                currency=currency,
+                product=record.product.upper(),
+                amount=round(amount),
+                exempt=switch,
+            )
+
+
+def swap_deal_charges(deals: Iterable) -> Iterator[Charge]:
+    """
+    :param deals: swap.Deal, e.g. a generator over a deal repository
+    """
+    for d in deals:
+        for house, entity, switch, amount, currency in (
+            (
+                d.bid_house,
+                d.bid_entity,
+                d.bid_switch,
+                d.bid_bro_fee,
+                d.bid_brokerage_currency,
+            ),
+            (
+                d.offer_house,
+                d.offer_entity,
+                d.offer_switch,
+                d.offer_bro_fee,
+                d.offer_brokerage_currency,
+            ),
+        ):
+            yield Charge(
+                house=f"{house} {entity}",
+                month=_month(d.trade_date),
+                currency=currency,
+                product=d.product.upper(),
+                amount=amount,
+                exempt=switch,
+            )
+
+
+def _month(d: date) -> str:
+    return d.strftime("%Y-%m")
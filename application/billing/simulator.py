@@ -0,0 +1,260 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from application.spotmar import deal_log as spotmar_log
+from application.spotmar import fee as spotmar_fee
+from application.swap import fee as swap_fee
+from application.swap.fee.structure import FeeStructure
+from application.trade import tenor as tnr
+from utils import numberutils
+
+SPOTMAR_DEAL_LOG = spotmar_log.DEAL_LOG
+_NOT_AGREED = -1
+
+
+@dataclass(frozen=True)
+class RevenueDelta:
+    house: str
+    month: str  # yyyy-mm
+    currency: str
+    baseline: int
+    candidate: int
+
+    @property
+    def delta(self) -> int:
+        return self.candidate - self.baseline
+
+
+@dataclass(frozen=True)
+class SwapHistory:
+    """
+    One row per brokerage side of every swap deal. Tenors, day counts and the
+    fees charged under the schedules in force are worked out once on load,
+    so a what-if only reprices the rows of the houses it changes.
+    """
+
+    houses: np.ndarray  # "house entity", as fee structures are keyed
+    products: np.ndarray
+    months: np.ndarray  # datetime64[M]
+    switches: np.ndarray  # bool, switched sides pay no brokerage
+    period_days: np.ndarray
+    working_days: np.ndarray
+    fees: np.ndarray
+    currencies: np.ndarray
+
+    @staticmethod
+    def of(deals: Iterable) -> SwapHistory:
+        """
+        :param deals: swap.Deal, both of its sides are billed
+        """
+        columns = [
+            (f"{house} {entity}", d.type, d.tenor, d.trade_date, switch)
+            for d in deals
+            for house, entity, switch in (
+                (d.bid_house, d.bid_entity, d.bid_switch),
+                (d.offer_house, d.offer_entity, d.offer_switch),
+            )
+        ]
+        return SwapHistory.from_columns(*_transpose(columns, 5))
+
+    @staticmethod
+    def from_columns(houses, products, tenors, trade_dates, switches) -> SwapHistory:
+        houses = np.char.upper(np.asarray(houses, dtype=str))
+        products = np.char.upper(np.asarray(products, dtype=str))
+        trade_dates = np.asarray(trade_dates, dtype="datetime64[D]")
+        switches = np.asarray(switches, dtype=bool)
+        book = tnr.TenorBook.from_columns(tenors, trade_dates)
+        fees, currencies = swap_fee.calculate_fees(
+            houses, products, tenors, trade_dates, book
+        )
+        return SwapHistory(
+            houses=houses,
+            products=products,
+            months=trade_dates.astype("datetime64[M]"),
+            switches=switches,
+            period_days=book.period_days(),
+            working_days=book.working_days(),
+            fees=np.where(switches, 0, fees),
+            currencies=currencies,
+        )
+
+    def __len__(self):
+        return len(self.houses)
+
+    def simulate(
+        self, candidates: Dict[Tuple[str, str], FeeStructure]
+    ) -> List[RevenueDelta]:
+        """
+        :param candidates: fee structure to try per (house, product), in the
+            currency the house is billed in today
+        :return: revenue per house and month before and after, for the houses changed
+        """
+        fees = self.fees.copy()
+        currencies = self.currencies.copy()
+        changed = np.zeros(len(self), dtype=bool)
+        for (house, product), fs in candidates.items():
+            rows = np.flatnonzero(
+                (self.houses == house.upper()) & (self.products == product.upper())
+            )
+            fees[rows] = fs.calculate_fees(
+                self.period_days[rows], self.working_days[rows]
+            )
+            currencies[rows] = fs.currency
+            changed[rows] = True
+        fees = np.where(self.switches, 0, fees)
+        return _revenue_deltas(
+            self.houses[changed],
+            self.months[changed],
+            self.currencies[changed],
+            self.fees[changed],
+            currencies[changed],
+            fees[changed],
+        )
+
+
+@dataclass(frozen=True)
+class SpotmarHistory:
+    """
+    One row per brokerage side of every spotmar deal, priced per lot.
+    Fees agreed by hand are kept as agreed, by the baseline and every candidate.
+    """
+
+    houses: np.ndarray
+    months: np.ndarray  # datetime64[M]
+    lots: np.ndarray  # float, the log has half lots
+    switches: np.ndarray
+    per_lot: np.ndarray  # fee per lot in force on the trade date
+    currencies: np.ndarray
+    agreed: np.ndarray  # int, the fee agreed by hand, _NOT_AGREED where priced
+
+    @staticmethod
+    def of_log(file_path: str = SPOTMAR_DEAL_LOG) -> SpotmarHistory:
+        """switched sides are kept, at no charge"""
+        houses, trade_dates, lots, switches, agreed = [], [], [], [], []
+        for chunk in spotmar_log.read_log_chunks(file_path):
+            for record in chunk:
+                for house, switch, fee, hand in (
+                    (
+                        record.buy,
+                        record.bid_switch,
+                        record.bid_brokerage_fee,
+                        record.bid_agreed,
+                    ),
+                    (
+                        record.sell,
+                        record.offer_switch,
+                        record.offer_brokerage_fee,
+                        record.offer_agreed,
+                    ),
+                ):
+                    houses.append(house)
+                    trade_dates.append(record.trade_date)
+                    lots.append(record.amount)
+                    switches.append(switch)
+                    agreed.append(fee if hand else _NOT_AGREED)
+        return SpotmarHistory.from_columns(houses, trade_dates, lots, switches, agreed)
+
+    @staticmethod
+    def from_columns(
+        houses, trade_dates, lots, switches, agreed=None
+    ) -> SpotmarHistory:
+        """
+        :param agreed: fee agreed by hand per side, `_NOT_AGREED` where the
+            schedule prices it. None when no fee was agreed by hand
+        """
+        houses = np.char.upper(np.asarray(houses, dtype=str))
+        trade_dates = np.asarray(trade_dates, dtype="datetime64[D]")
+        fees = spotmar_fee.get_fees(houses, trade_dates)
+        return SpotmarHistory(
+            houses=houses,
+            months=trade_dates.astype("datetime64[M]"),
+            lots=np.asarray([numberutils.to_float(n) for n in lots], dtype=np.float64),
+            switches=np.asarray(switches, dtype=bool),
+            per_lot=np.asarray([f.amount for f in fees], dtype=np.int64),
+            currencies=np.asarray([f.currency for f in fees], dtype=object),
+            agreed=(
+                np.full(len(houses), _NOT_AGREED, dtype=np.int64)
+                if agreed is None
+                else np.asarray(agreed, dtype=np.int64)
+            ),
+        )
+
+    def __len__(self):
+        return len(self.houses)
+
+    @property
+    def fees(self) -> np.ndarray:
+        return self._fees(self.per_lot)
+
+    def _fees(self, per_lot: np.ndarray) -> np.ndarray:
+        fees = np.rint(self.lots * per_lot).astype(np.int64)
+        fees = np.where(self.agreed != _NOT_AGREED, self.agreed, fees)
+        return np.where(self.switches, 0, fees)
+
+    def simulate(self, candidates: Dict[str, spotmar_fee.Fee]) -> List[RevenueDelta]:
+        """
+        :param candidates: fee to try per house
+        :return: revenue per house and month before and after, for the houses changed
+        """
+        per_lot = self.per_lot.copy()
+        currencies = self.currencies.copy()
+        changed = np.zeros(len(self), dtype=bool)
+        for house, candidate in candidates.items():
+            rows = self.houses == house.upper()
+            per_lot[rows] = candidate.amount
+            currencies[rows] = candidate.currency
+            changed |= rows
+        return _revenue_deltas(
+            self.houses[changed],
+            self.months[changed],
+            self.currencies[changed],
+            self.fees[changed],
+            currencies[changed],
+            self._fees(per_lot)[changed],
+        )
+
+
+def _revenue_deltas(
+    houses: np.ndarray,
+    months: np.ndarray,
+    baseline_currencies: np.ndarray,
+    baseline: np.ndarray,
+    candidate_currencies: np.ndarray,
+    candidate: np.ndarray,
+) -> List[RevenueDelta]:
+    """
+    sums both fee columns per (house, month, currency) in one grouping pass, each
+    column under its own currency, a side billed in no row of a currency sums to 0
+    """
+    if not len(houses):
+        return []
+    prefixes = np.char.add(
+        np.char.add(houses, "\t"), np.datetime_as_string(months, unit="M")
+    )
+    keys = np.concatenate(
+        [
+            np.char.add(prefixes, np.char.add("\t", baseline_currencies.astype(str))),
+            np.char.add(prefixes, np.char.add("\t", candidate_currencies.astype(str))),
+        ]
+    )
+    unique_keys, index = np.unique(keys, return_inverse=True)
+    baseline_sums = np.bincount(
+        index[: len(houses)], weights=baseline, minlength=len(unique_keys)
+    )
+    candidate_sums = np.bincount(
+        index[len(houses) :], weights=candidate, minlength=len(unique_keys)
+    )
+    return [
+        RevenueDelta(*key.split("\t"), round(b), round(c))
+        for key, b, c in zip(
+            unique_keys.tolist(), baseline_sums.tolist(), candidate_sums.tolist()
+        )
+    ]
+
+
+def _transpose(rows: List[tuple], width: int) -> List[list]:
+    return [list(c) for c in zip(*rows)] if rows else [[] for _ in range(width)]
@@ -7,6 +7,7 @@ from typing import Set, List, Collection, Iterable
 from more_itertools import consume
 
 from application.trade import Deal
+from application.trade.store import DealStore
 from . import message as msg
 from .message import Message
 from .type import Type
@@ -17,6 +18,26 @@ def confirm(trades: List[Deal], _type: Type = Type.REUTER) -> List[Confirmation]
     return [Confirmation.of(e, _type, t) for e, t in house_to_deals.items()]
 
 
+def confirm_store(
+    store: DealStore,
+    houses: Iterable[str] = None,
+    _type: Type = Type.REUTER,
+    **filters,
+) -> List[Confirmation]:
+    """
+    `confirm` over a deal store, each house's deals are read off its house index.
+
+    :param houses: defaults to every house in the store
+    :param filters: narrow the deals further, see `DealStore.sides`
+    """
+    confirmations = []
+    for house in store.houses() if houses is None else houses:
+        deals = store.deals(house=house, **filters)
+        if deals:
+            confirmations.append(Confirmation.of(house, _type, deals))
+    return confirmations
+
+
 def deals_by_house(trades: List[Deal]):
     bid_trades = {
         e: list(trades)
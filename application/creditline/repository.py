@@ -3,36 +3,12 @@ from typing import List
 
 import constants
 from application.creditline import CreditLine
+from application.trade import tenor as tnr
+from application.trade.tenor import STANDARD_TENORS
 from utils import fileutils
 
 _LINE_TABLE = {}
-_TENORS = [
-    "spot",
-    "on",
-    "tn",
-    "sn",
-    "1w",
-    "2w",
-    "3w",
-    "1m",
-    "2m",
-    "3m",
-    "4m",
-    "5m",
-    "6m",
-    "7m",
-    "8m",
-    "9m",
-    "10m",
-    "11m",
-    "1y",
-    "2y",
-    "3y",
-    "4y",
-    "5y",
-    "6y",
-    "10y",
-]
+_TENORS = STANDARD_TENORS
 
 
 def _load_line_table_csv() -> None:
@@ -43,7 +19,7 @@ def _load_line_table_csv() -> None:
                 cl.source.upper(),
                 cl.destination.upper(),
                 cl.product.upper(),
-                cl.tenor.upper(),
+                tnr.parse(cl.tenor),
             ): cl
             for row in fileutils.read_csv_to_dicts(file_path)
             for cl in _line_table_row_to_credit_lines(row)
@@ -65,12 +41,12 @@ def _line_table_row_to_credit_lines(row: dict) -> List[CreditLine]:
             source=source,
             destination=destination,
             product="swap",
-            tenor=tenor,
-            symbol=row.get(tenor, "X"),
+            tenor=t,
+            symbol=row.get(t, "X"),
             can_switch=can_switch,
             allows_switch=allows_switch,
         )
-        for tenor in _TENORS
+        for t in _TENORS
     ]
 
 
@@ -78,7 +54,7 @@ def get_credit_line(
     source: str, destination: str, product: str, tenor: str
 ) -> CreditLine:
     return _LINE_TABLE.get(
-        (source.upper(), destination.upper(), product.upper(), tenor.upper())
+        (source.upper(), destination.upper(), product.upper(), tnr.parse(tenor))
     )
 
 
@@ -1,12 +1,15 @@
 from dataclasses import dataclass, field
-from datetime import date, datetime
+from datetime import date, datetime, time
 from typing import List
 
 from adapter.google import sheets
-from utils import dateutils, stringutils
+from utils import dateutils, numberutils, stringutils
 from . import confirmation as cfm
 from . import fee
 from ..trade import tenor
+from ..trade.sheet_sync import SheetSync
+
+_DAILY_SYNC: SheetSync | None = None
 
 
 def cfm_date(d: date) -> str:
@@ -58,6 +61,25 @@ class Deal:
         )
         self.product = self.product.strip().upper()
 
+    def __getattr__(self, name):
+        # a deal from `from_record` works its spot date out the first time it is read
+        if name != "spot_date":
+            raise AttributeError(name)
+        self.spot_date = dateutils.add_workdays(self.trade_date, 2)
+        return self.spot_date
+
+    @staticmethod
+    def from_record(**fields) -> "Deal":
+        """
+        A deal as it was booked, e.g. read back from storage, its fields taken as
+        they are.
+
+        :param fields: every init field of the deal
+        """
+        deal = object.__new__(Deal)
+        deal.__dict__.update(fields)
+        return deal
+
     @staticmethod
     def of(
         trade_date: date,
@@ -79,8 +101,8 @@ class Deal:
         trade_date = deal_time.date()
         bid_switch = True if switch.upper() == "BID" else False
         offer_switch = True if switch.upper() == "OFFER" else False
-        bid_brokerage_fee: fee.Fee = fee.get_fee(bid_house)
-        offer_brokerage_fee: fee.Fee = fee.get_fee(offer_house)
+        bid_brokerage_fee: fee.Fee = fee.get_fee(bid_house, trade_date)
+        offer_brokerage_fee: fee.Fee = fee.get_fee(offer_house, trade_date)
         bid_brokerage_amount = 0 if bid_switch else bid_brokerage_fee.sum(amount)
         offer_brokerage_amount = 0 if offer_switch else offer_brokerage_fee.sum(amount)
         value_date = tenor.spot(trade_date)
@@ -163,25 +185,43 @@ class Deal:
 
 
 def get_deals() -> List[Deal]:
-    return [
-        Deal.of(
-            trade_date=date.fromisoformat(d.get("DPRH")),
-            bid=d.get("BID"),
-            offer=d.get("OFFER"),
-            price=d.get("PX"),
-            amount=d.get("Q"),
-            rate=d.get("RATE"),
-            mar=d.get("M.A.R"),
-            deal_time=d.get("TIME"),
-            switch=d.get("SWITCH"),
-            bid_trader=d.get("TRADER_B"),
-            offer_trader=d.get("TRADER_O", ""),
-            bid_their_to=d.get("BID THEIR TO", ""),
-            offer_their_to=d.get("OFFER THEIR TO"),
-        )
-        for d in sheets.get_values("spotmar daily", "A:Q")
-    ]
-
-
-def get_all_deals():
-    pass
+    return [_row_to_deal(d) for d in sheets.get_values("spotmar daily", "A:Q")]
+
+
+def daily_sync() -> SheetSync:
+    """the "spotmar daily" sheet, each poll rebuilds only the rows added or edited"""
+    global _DAILY_SYNC
+    if _DAILY_SYNC is None:
+        _DAILY_SYNC = SheetSync("spotmar daily", "A:Q", _row_to_deal)
+    return _DAILY_SYNC
+
+
+def _row_to_deal(d: dict) -> Deal:
+    trade_date = dateutils.to_date(d.get("DPRH"))
+    return Deal.of(
+        trade_date=trade_date,
+        bid=d.get("BID"),
+        offer=d.get("OFFER"),
+        price=d.get("PX"),
+        amount=numberutils.to_float(d.get("Q")),  # lots, half lots are dealt
+        rate=d.get("RATE"),
+        mar=d.get("M.A.R"),
+        # the sheet keeps the clock time only, e.g. 9:01
+        deal_time=datetime.combine(
+            trade_date, dateutils.to_time(d.get("TIME")) or time()
+        ),
+        switch=d.get("SWITCH") or "",
+        bid_trader=d.get("TRADER_B"),
+        offer_trader=d.get("TRADER_O", ""),
+        bid_their_to=d.get("BID_THEIR_TO", ""),
+        offer_their_to=d.get("OFFER_THEIR_TO"),
+    )
+
+
+def get_all_deals(
+    house: str = None, start: date = None, end: date = None
+) -> List[Deal]:
+    """every spotmar deal booked, from the local deal repository"""
+    from infrastructure.sqlite import deal_repository
+
+    return deal_repository.get_repository().spotmar.deals(house, start, end)
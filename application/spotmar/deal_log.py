@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from datetime import date, time
+from typing import Iterator, List
+
+import constants
+from utils import dateutils, fileutils, numberutils
+
+DEAL_LOG = os.path.join(constants.RESOURCE_DIR, "spotmar", "deal_log.csv")
+
+
+@dataclass(frozen=True, slots=True)
+class LogRecord:
+    """one row of the spotmar deal log"""
+
+    trade_date: date
+    buy: str
+    sell: str
+    margin: int
+    amount: float  # lots, the log has half lots
+    rate: float
+    value_date: date | None
+    mar: float
+    bid_brokerage_fee: int | None  # None when the bid side was switched
+    offer_brokerage_fee: int | None
+    deal_time: time | None
+    bid_agreed: bool = False  # the bid fee was agreed by hand, not from the schedule
+    offer_agreed: bool = False
+
+    @property
+    def bid_switch(self) -> bool:
+        return self.bid_brokerage_fee is None
+
+    @property
+    def offer_switch(self) -> bool:
+        return self.offer_brokerage_fee is None
+
+
+def _brokerage_fee(cell: str) -> int | None:
+    """a `-` marks a switched side, a `*` an amount agreed by hand"""
+    return None if cell == "-" else numberutils.to_int(cell.lstrip("*"))
+
+
+def _agreed(cell: str) -> bool:
+    return cell.startswith("*")
+
+
+def _house(cell: str) -> str:
+    return cell.upper()
+
+
+SCHEMA = fileutils.CsvSchema(
+    record=LogRecord,
+    columns=(
+        fileutils.Column("date", "trade_date", dateutils.to_date),
+        fileutils.Column("buy", "buy", _house),
+        fileutils.Column("sell", "sell", _house),
+        fileutils.Column("margin", "margin", numberutils.to_int),
+        fileutils.Column("amt", "amount", numberutils.to_float),
+        fileutils.Column("rate", "rate", numberutils.to_float),
+        fileutils.Column("value", "value_date", dateutils.to_date),
+        fileutils.Column("mar", "mar", numberutils.to_float),
+        fileutils.Column("bid bro", "bid_brokerage_fee", _brokerage_fee),
+        fileutils.Column("offer bro", "offer_brokerage_fee", _brokerage_fee),
+        fileutils.Column("time", "deal_time", dateutils.to_time),
+        fileutils.Column("bid bro", "bid_agreed", _agreed),
+        fileutils.Column("offer bro", "offer_agreed", _agreed),
+    ),
+    key="date",  # monthly subtotal rows carry only an amount
+)
+
+
+def read_log_chunks(
+    file_path: str = DEAL_LOG, chunk_size: int = fileutils.CHUNK_SIZE
+) -> Iterator[List[LogRecord]]:
+    return fileutils.read_csv_chunks(file_path, SCHEMA, chunk_size)
+
+
+def read_log(
+    file_path: str = DEAL_LOG, chunk_size: int = fileutils.CHUNK_SIZE
+) -> Iterator[LogRecord]:
+    return fileutils.read_csv_records(file_path, SCHEMA, chunk_size)
@@ -1,10 +1,41 @@
+from datetime import date
+from typing import List
+
+import numpy as np
+
 from .fee import Fee
-from .repository import get_name_to_fee
+from .repository import get_name_to_fee, get_fee_history
+
+
+def get_fee(house: str, on: date = None) -> Fee:
+    """the fee in force on `on`, today by default"""
+    if on is None:
+        name_to_fee = get_name_to_fee()
+        return name_to_fee.get(house.upper(), default_fee())
+    return get_fee_history().get(house.upper(), on, default_fee())
+
 
+def get_fees(houses, trade_dates) -> List[Fee]:
+    """
+    `get_fee` of many deals, e.g. to recalculate a year of the deal log.
+    The fee of each house is looked up once per period it was in force.
 
-def get_fee(house: str) -> Fee:
-    name_to_fee = get_name_to_fee()
-    return name_to_fee.get(house.upper(), default_fee())
+    :param trade_dates: dates or datetime64[D]
+    """
+    history = get_fee_history()
+    houses = np.char.upper(np.asarray(houses, dtype=str))
+    trade_dates = np.asarray(trade_dates, dtype="datetime64[D]")
+    fees = np.empty(len(houses), dtype=object)
+    unique_houses, house_index = np.unique(houses, return_inverse=True)
+    for i, house in enumerate(unique_houses.tolist()):
+        house_rows = np.flatnonzero(house_index == i)
+        positions = history.positions(house, trade_dates[house_rows])
+        for position in np.unique(positions).tolist():
+            rows = house_rows[positions == position]
+            fees[rows] = (
+                history.value_at(house, position) if position >= 0 else default_fee()
+            )
+    return fees.tolist()
 
 
 def default_fee() -> Fee:
@@ -1,6 +1,9 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from datetime import date
+
+from utils import numberutils
 
 
 @dataclass
@@ -8,10 +11,13 @@ class Fee:
     house: str
     currency: str
     amount: int
+    effective_from: date | None = field(default=None)  # None: since forever
+    effective_to: date | None = field(default=None)  # None: until the next one
 
     def __post_init__(self):
         self.house = self.house.upper()
         self.currency = self.currency.upper()
+        self.amount = numberutils.to_int(self.amount)
 
     def sum(self, quantity: int):
         return quantity * self.amount
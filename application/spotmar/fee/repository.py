@@ -1,28 +1,36 @@
 import os
+from datetime import date
+from typing import Iterable
 
 import constants
 from adapter.google import sheets
-from utils import fileutils
+from utils import dateutils, fileutils
+from utils.intervalutils import EffectiveDated
 from .fee import Fee
 
 _NAME_TO_FEE = {}
+# every fee ever in force, _NAME_TO_FEE holds the ones in force today
+_FEE_HISTORY: EffectiveDated[Fee] = EffectiveDated()
 
 
 def _load_spotmar_fee_csv() -> None:
     file_path = os.path.join(constants.RESOURCE_DIR, "spotmar", "fee.csv")
-    _NAME_TO_FEE.update(
-        {
-            row.get("house"): row_to_fee(row)
-            for row in fileutils.read_csv_to_dicts(file_path)
-        }
-    )
+    _add_fees(row_to_fee(row) for row in fileutils.read_csv_to_dicts(file_path))
 
 
 def _load_spotmar_fee_google_sheet() -> None:
+    _add_fees(row_to_fee(row) for row in sheets.get_values("spotmar fees", "A:E"))
+
+
+def _add_fees(fees: Iterable[Fee]) -> None:
+    for fee in fees:
+        _FEE_HISTORY.add(fee.house, fee, fee.effective_from, fee.effective_to)
+    today = date.today()
     _NAME_TO_FEE.update(
         {
-            row.get("house").upper(): row_to_fee(row)
-            for row in sheets.get_values("spotmar fees", "A:C")
+            house: fee
+            for house in _FEE_HISTORY.keys()
+            if (fee := _FEE_HISTORY.get(house, today))
         }
     )
 
@@ -31,12 +39,18 @@ def row_to_fee(row) -> Fee:
     house = row.get("house")
     currency = row.get("currency")
     amount = row.get("amount")
-    return Fee(house, currency, amount)
+    effective_from = dateutils.to_date(row.get("effective_from", ""))
+    effective_to = dateutils.to_date(row.get("effective_to", ""))
+    return Fee(house, currency, amount, effective_from, effective_to)
 
 
 def get_name_to_fee():
     return _NAME_TO_FEE
 
 
+def get_fee_history() -> EffectiveDated[Fee]:
+    return _FEE_HISTORY
+
+
 if not _NAME_TO_FEE:
     _load_spotmar_fee_google_sheet()
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, fields
+from typing import Dict, Iterable, List, Tuple
+
+from utils import dateutils, stringutils
+from .deal import Deal
+from .fee import repository
+
+_CHUNK_SIZE = 2_000
+_MIN_PARALLEL = 5_000  # below this a pool costs more than it saves
+# what a worker sends back per deal, `Deal.from_record` takes it as it is
+_FIELDS = tuple(f.name for f in fields(Deal) if f.init)
+
+
+@dataclass(frozen=True)
+class ReferenceData:
+    """
+    Everything `Deal.of` looks up: trader nicknames, fee schedules and calendars.
+    Captured once in the booking process and installed once per worker, so workers
+    never go back to the sheets. The loaders only read the sheets when first asked,
+    a worker importing the deal modules reads nothing.
+    """
+
+    traders: tuple
+    fee_structures: tuple
+    calendars: Dict[str, Tuple[int | None, Tuple[int, ...]]]
+
+    @staticmethod
+    def capture() -> ReferenceData:
+        return ReferenceData(
+            traders=stringutils.snapshot(),
+            fee_structures=repository.snapshot_fee_structures(),
+            calendars=dateutils.snapshot_calendars(),
+        )
+
+    def install(self) -> None:
+        stringutils.restore(self.traders)
+        repository.restore_fee_structures(self.fee_structures)
+        dateutils.restore_calendars(self.calendars)
+
+
+def of_many(
+    rows: Iterable[dict], workers: int = None, chunk_size: int = _CHUNK_SIZE
+) -> List[Deal]:
+    """
+    `Deal.of` of many rows, in chunks spread over a pool of processes.
+
+    :param rows: keyword arguments of `Deal.of`
+    :param workers: processes, every core by default. 1 builds in this process
+    :return: deals in the order of `rows`, their tenors are built on first use
+    """
+    rows = list(rows)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(rows) < _MIN_PARALLEL:
+        return [Deal.of(**row) for row in rows]
+    chunks = [rows[i : i + chunk_size] for i in range(0, len(rows), chunk_size)]
+    with ProcessPoolExecutor(
+        min(workers, len(chunks)),
+        # spawned workers start from a clean import on every platform, a forked one
+        # would inherit the locks of the session thread in whatever state they were
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=ReferenceData.install,
+        initargs=(ReferenceData.capture(),),
+    ) as pool:
+        return [
+            _to_deal(values) for chunk in pool.map(_build, chunks) for values in chunk
+        ]
+
+
+def _build(rows: List[dict]) -> List[tuple]:
+    deals = (Deal.of(**row) for row in rows)
+    return [tuple(getattr(d, f) for f in _FIELDS) for d in deals]
+
+
+def _to_deal(values: tuple) -> Deal:
+    return Deal.from_record(**dict(zip(_FIELDS, values)))
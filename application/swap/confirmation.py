@@ -1,5 +1,6 @@
 from collections import defaultdict
 from datetime import date as date_o, datetime as datetime_o, time as time_o
+from functools import lru_cache
 from typing import Tuple, List
 
 from utils import numberutils
@@ -40,6 +41,12 @@ def bro_fee(fee: float, currency: str = "krw"):
 
 
 def vfm_dates(dates: List[date_o]) -> str:
+    # legs of the same value date share their fixing and MAR dates, format them once
+    return _vfm_dates(tuple(dates))
+
+
+@lru_cache(maxsize=1_024)
+def _vfm_dates(dates: Tuple[date_o, ...]) -> str:
     # Group dates by year, then by month
     date_groups = defaultdict(lambda: defaultdict(list))
     for dt in dates:
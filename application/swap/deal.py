@@ -2,14 +2,23 @@ from __future__ import annotations
 
 from dataclasses import dataclass, field
 from datetime import datetime, date
-from typing import List
+from typing import List, Iterable, Tuple
 
 from adapter.google import sheets
-from application.trade.tenor import Tenor, Leg
-from utils import stringutils
+from application.trade.sheet_sync import SheetSync
+from application.trade.tenor import (
+    Tenor,
+    Leg,
+    TenorResult,
+    TenorStatus,
+    try_build_many,
+)
+from utils import dateutils, stringutils
 from . import confirmation as cfm
 from . import fee
 
+_DAILY_SYNC: SheetSync | None = None
+
 
 @dataclass
 class Deal:
@@ -36,6 +45,8 @@ class Deal:
     product: str = field(default=None)
     remark: str = field(default="")
     deal_id: str = field(default_factory=stringutils.generate_uuid)
+    bid_brokerage_currency: str = field(default="")
+    offer_brokerage_currency: str = field(default="")
 
     def __post_init__(self):
         self._tenor = Tenor(self.tenor, self.trade_date)
@@ -49,6 +60,25 @@ class Deal:
         self.offer_house = self.offer_house.strip().upper()
         self.offer_entity = self.offer_entity.strip().upper()
 
+    def __getattr__(self, name):
+        # a deal from `from_record` builds its tenor the first time it is needed
+        if name != "_tenor":
+            raise AttributeError(name)
+        self._tenor = Tenor(self.tenor, self.trade_date)
+        return self._tenor
+
+    @staticmethod
+    def from_record(**fields) -> Deal:
+        """
+        A deal as it was booked, e.g. read back from storage. The fields are taken
+        as they are, the tenor is not built until a leg or the spot date is read.
+
+        :param fields: every init field of the deal
+        """
+        deal = object.__new__(Deal)
+        deal.__dict__.update(fields)
+        return deal
+
     @staticmethod
     def of(
         tenor: str,
@@ -58,7 +88,7 @@ class Deal:
         amount: int,
         near_rate: float,
         far_rate: float,
-        deal_datetime: datetime,
+        deal_datetime: datetime | str,
         confirmation_done: bool,
         bid_trader_nickname: str = "",
         offer_trader_nickname: str = "",
@@ -69,7 +99,8 @@ class Deal:
     ):
         bid_trader = stringutils.get_trader(bid_nickname)
         offer_trader = stringutils.get_trader(offer_nickname)
-        trade_date = deal_datetime.date() if deal_datetime else date.today()
+        deal_datetime = dateutils.to_datetime(deal_datetime)
+        trade_date = _trade_date_of(deal_datetime)
         deal_time = deal_datetime if deal_datetime else datetime.now()
         bid_trader_nickname = (
             bid_trader_nickname if bid_trader_nickname else bid_trader.get("trader")
@@ -86,16 +117,15 @@ class Deal:
         offer_house = offer_trader.get("house", "")
         offer_entity = offer_trader.get("entity", "")
         offer_house_symbol = f"{offer_house} {offer_entity}"
-        bid_brokerage_fee = (
-            0
-            if bid_switch
-            else fee.calculate_fee(bid_house_symbol, product, tenor, trade_date)
+        # switched sides are not charged, they are still billed in their currency
+        bid_fee, bid_brokerage_currency = fee.calculate_fee(
+            bid_house_symbol, product, tenor, trade_date
         )
-        offer_brokerage_fee = (
-            0
-            if offer_switch
-            else fee.calculate_fee(offer_house_symbol, product, tenor, trade_date)
+        offer_fee, offer_brokerage_currency = fee.calculate_fee(
+            offer_house_symbol, product, tenor, trade_date
         )
+        bid_brokerage_fee = 0 if bid_switch else bid_fee
+        offer_brokerage_fee = 0 if offer_switch else offer_fee
         return Deal(
             type=type,
             trade_date=trade_date,
@@ -112,6 +142,8 @@ class Deal:
             far_rate=far_rate,
             bid_brokerage_fee=bid_brokerage_fee,
             offer_brokerage_fee=offer_brokerage_fee,
+            bid_brokerage_currency=bid_brokerage_currency,
+            offer_brokerage_currency=offer_brokerage_currency,
             confirmation_done=confirmation_done,
             deal_time=deal_time,
             bid_switch=bid_switch,
@@ -197,27 +229,89 @@ class Deal:
 
 
 def get_deals() -> List[Deal]:
-    return [
-        Deal.of(
-            tenor=d.get("TENOR"),
-            bid_nickname=d.get("BID", ""),
-            offer_nickname=d.get("OFFER", ""),
-            margin=d.get("MARGIN"),
-            amount=d.get("AMT"),
-            near_rate=d.get("NEAR"),
-            far_rate=d.get("FAR"),
-            deal_datetime=d.get("DEAL_TIME"),
-            confirmation_done=True if d.get("CFM") else False,
-            bid_trader_nickname=d.get("TRADER_B", ""),
-            offer_trader_nickname=d.get("TRADER_O", ""),
-            type=d.get("TYPE", "df"),
-            remark=d.get("REMARK", ""),
-            bid_switch=bool(d.get("SWITCH_B", False)),
-            offer_switch=bool(d.get("SWITCH_O", False)),
+    return [_row_to_deal(d) for d in sheets.get_values("swap daily", "A:N")]
+
+
+def daily_sync() -> SheetSync:
+    """the "swap daily" sheet, each poll rebuilds only the rows added or edited"""
+    global _DAILY_SYNC
+    if _DAILY_SYNC is None:
+        _DAILY_SYNC = SheetSync("swap daily", "A:N", _row_to_deal)
+    return _DAILY_SYNC
+
+
+def _row_to_deal(d: dict) -> Deal:
+    return Deal.of(
+        tenor=d.get("TENOR"),
+        bid_nickname=d.get("BID", ""),
+        offer_nickname=d.get("OFFER", ""),
+        margin=d.get("MARGIN"),
+        amount=d.get("AMT"),
+        near_rate=d.get("NEAR"),
+        far_rate=d.get("FAR"),
+        deal_datetime=d.get("DEAL_TIME"),
+        confirmation_done=True if d.get("CFM") else False,
+        bid_trader_nickname=d.get("TRADER_B", ""),
+        offer_trader_nickname=d.get("TRADER_O", ""),
+        type=d.get("TYPE", "df"),
+        remark=d.get("REMARK", ""),
+        bid_switch=bool(d.get("SWITCH_B", False)),
+        offer_switch=bool(d.get("SWITCH_O", False)),
+    )
+
+
+def split_rows(
+    rows: Iterable[dict],
+) -> Tuple[List[dict], List[Tuple[dict, TenorResult]]]:
+    """
+    Splits swap sheet rows in one pass without raising.
+
+    :return: rows whose tenor builds on their trade date,
+        and the rejected rows with the reason they were rejected
+    """
+    rows = list(rows)
+    trade_dates = [_try_trade_date_of(d.get("DEAL_TIME")) for d in rows]
+    built = iter(
+        try_build_many(
+            (d.get("TENOR") or "", trade_date)
+            for d, trade_date in zip(rows, trade_dates)
+            if trade_date is not None
         )
-        for d in sheets.get_values("swap daily", "A:N")
-    ]
+    )
+    valid, rejected = [], []
+    for row, trade_date in zip(rows, trade_dates):
+        result = (
+            next(built)
+            if trade_date is not None
+            else TenorResult(
+                row.get("TENOR") or "", None, TenorStatus.INVALID_TRADE_DATE
+            )
+        )
+        if result.ok:
+            valid.append(row)
+        else:
+            rejected.append((row, result))
+    return valid, rejected
+
+
+def _try_trade_date_of(deal_datetime) -> date | None:
+    """None for a deal time that is not an iso date time, e.g. 29/01/2024 9:00"""
+    try:
+        return _trade_date_of(deal_datetime)
+    except ValueError:
+        return None
+
+
+def _trade_date_of(deal_datetime: datetime | str | None) -> date:
+    """sheet rows carry the deal time as text, e.g. 2024-07-04 09:00:00"""
+    deal_datetime = dateutils.to_datetime(deal_datetime)
+    return deal_datetime.date() if deal_datetime else date.today()
+
 
+def get_all_deals(
+    house: str = None, start: date = None, end: date = None
+) -> List[Deal]:
+    """every swap deal booked, from the local deal repository"""
+    from infrastructure.sqlite import deal_repository
 
-def get_all_deals():
-    pass
+    return deal_repository.get_repository().swap.deals(house, start, end)
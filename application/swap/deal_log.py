@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Iterator, List
+
+from utils import dateutils, fileutils, numberutils
+from .deal import Deal
+
+
+@dataclass(frozen=True, slots=True)
+class LogRecord:
+    """one row of the swap daily sheet, or of a csv export of it"""
+
+    tenor: str
+    bid: str  # trader nicknames
+    offer: str
+    margin: int
+    amount: int
+    near_rate: float
+    far_rate: float
+    deal_time: datetime | None
+    confirmation_done: bool
+    bid_trader: str
+    offer_trader: str
+    type: str
+    remark: str
+    bid_switch: bool
+    offer_switch: bool
+
+    @property
+    def trade_date(self) -> date:
+        return self.deal_time.date() if self.deal_time else date.today()
+
+    @property
+    def product(self) -> str:
+        return self.type or "df"
+
+    def to_deal(self) -> Deal:
+        return Deal.of(
+            tenor=self.tenor,
+            bid_nickname=self.bid,
+            offer_nickname=self.offer,
+            margin=self.margin,
+            amount=self.amount,
+            near_rate=self.near_rate,
+            far_rate=self.far_rate,
+            deal_datetime=self.deal_time,
+            confirmation_done=self.confirmation_done,
+            bid_trader_nickname=self.bid_trader,
+            offer_trader_nickname=self.offer_trader,
+            type=self.product,
+            remark=self.remark,
+            bid_switch=self.bid_switch,
+            offer_switch=self.offer_switch,
+        )
+
+
+def _flag(cell) -> bool:
+    return bool(cell)
+
+
+SCHEMA = fileutils.CsvSchema(
+    record=LogRecord,
+    columns=(
+        fileutils.Column("TENOR", "tenor"),
+        fileutils.Column("BID", "bid"),
+        fileutils.Column("OFFER", "offer"),
+        fileutils.Column("MARGIN", "margin", numberutils.to_int),
+        fileutils.Column("AMT", "amount", numberutils.to_int),
+        fileutils.Column("NEAR", "near_rate", numberutils.to_float),
+        fileutils.Column("FAR", "far_rate", numberutils.to_float),
+        fileutils.Column("DEAL_TIME", "deal_time", dateutils.to_datetime),
+        fileutils.Column("CFM", "confirmation_done", _flag),
+        fileutils.Column("TRADER_B", "bid_trader"),
+        fileutils.Column("TRADER_O", "offer_trader"),
+        fileutils.Column("TYPE", "type"),
+        fileutils.Column("REMARK", "remark"),
+        fileutils.Column("SWITCH_B", "bid_switch", _flag),
+        fileutils.Column("SWITCH_O", "offer_switch", _flag),
+    ),
+    key="TENOR",
+)
+
+
+def from_row(row: dict) -> LogRecord:
+    """a swap daily sheet row, as returned by `sheets.get_values`"""
+    return SCHEMA.parse(row)
+
+
+def read_log_chunks(
+    file_path: str, chunk_size: int = fileutils.CHUNK_SIZE
+) -> Iterator[List[LogRecord]]:
+    return fileutils.read_csv_chunks(file_path, SCHEMA, chunk_size)
+
+
+def read_log(
+    file_path: str, chunk_size: int = fileutils.CHUNK_SIZE
+) -> Iterator[LogRecord]:
+    return fileutils.read_csv_records(file_path, SCHEMA, chunk_size)
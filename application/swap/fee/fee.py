@@ -1,9 +1,18 @@
 from __future__ import annotations
 
 from datetime import date
+from functools import lru_cache
 from typing import Tuple
 
-from .repository import get_name_to_fee_structure
+import numpy as np
+
+from utils import dateutils
+from ...trade import tenor as tnr
+from .repository import (
+    fee_schedule_version,
+    get_fee_structure,
+    get_fee_structure_history,
+)
 from .structure import FeeStructure
 
 DEFAULT_FEE_STRUCTURE = FeeStructure.of(
@@ -15,11 +24,96 @@ DEFAULT_FEE_STRUCTURE = FeeStructure.of(
 )
 
 
+_FEE_CACHE_SIZE = 16_384
+
+
 def calculate_fee(
     house: str, product: str, tenor: str, trade_date: date
 ) -> Tuple[int, str]:
-    name_to_fee_structure = get_name_to_fee_structure()
-    fee_structure = name_to_fee_structure.get(
-        (house.upper(), product.upper()), DEFAULT_FEE_STRUCTURE
+    return _cached_fee(
+        house.upper(),
+        product.upper(),
+        tenor.strip().lower(),
+        trade_date,
+        fee_schedule_version(),
+        dateutils.calendar_version(),
+    )
+
+
+def _calculate_fee(
+    house: str,
+    product: str,
+    tenor: str,
+    trade_date: date,
+    fee_version: int,
+    calendar_version: int,
+) -> Tuple[int, str]:
+    """the versions are only part of the cache key, a reload misses the cache"""
+    fee_structure = get_fee_structure(house, product, trade_date)
+    return (fee_structure or DEFAULT_FEE_STRUCTURE).calculate_fee(tenor, trade_date)
+
+
+_cached_fee = lru_cache(maxsize=_FEE_CACHE_SIZE)(_calculate_fee)
+
+
+def fee_cache_info():
+    """hits, misses, maxsize and currsize of the fee result cache"""
+    return _cached_fee.cache_info()
+
+
+def configure_fee_cache(maxsize: int | None = _FEE_CACHE_SIZE) -> None:
+    """
+    Resizes (and empties) the fee result cache.
+
+    :param maxsize: number of (house, product, tenor, trade date) fees kept, None for unbounded
+    """
+    global _cached_fee
+    _cached_fee = lru_cache(maxsize=maxsize)(_calculate_fee)
+
+
+def clear_fee_cache() -> None:
+    _cached_fee.cache_clear()
+
+
+def calculate_fees(
+    houses, products, tenors, trade_dates, book: tnr.TenorBook = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    `calculate_fee` over columns, e.g. one side of a whole deal book.
+    Fee structures are resolved once per (house, product) and the period its
+    schedule was in force, tenors once per (tenor, trade date).
+    The day counts and fees are computed in bulk.
+
+    :param trade_dates: dates or datetime64[D]
+    :param book: the tenors of the rows when the caller has resolved them already
+    :return: fees as an int array and currencies as an object array
+    """
+    history = get_fee_structure_history()
+    keys = np.char.add(
+        np.char.add(np.asarray(houses, dtype=str), "\t"),
+        np.asarray(products, dtype=str),
     )
-    return fee_structure.calculate_fee(tenor, trade_date)
+    trade_dates = np.asarray(trade_dates, dtype="datetime64[D]")
+    if book is None:
+        book = tnr.TenorBook.from_columns(tenors, trade_dates)
+    period_days = book.period_days()
+    working_days = book.working_days()
+    fees = np.zeros(len(book), dtype=np.int64)
+    currencies = np.empty(len(book), dtype=object)
+    unique_keys, key_index = np.unique(keys, return_inverse=True)
+    for i, key in enumerate(unique_keys.tolist()):
+        key = tuple(key.upper().split("\t"))
+        key_rows = np.flatnonzero(key_index == i)
+        positions = history.positions(key, trade_dates[key_rows])
+        for position in np.unique(positions).tolist():
+            fee_structure = (
+                history.value_at(key, position)
+                if position >= 0
+                else DEFAULT_FEE_STRUCTURE
+            )
+            rows = key_rows[positions == position]
+            fees[rows] = fee_structure.calculate_fees(
+                period_days[rows], working_days[rows]
+            )
+            currencies[rows] = fee_structure.currency
+    return fees, currencies
@@ -1,47 +1,86 @@
 from __future__ import annotations
 
 import os
-from dataclasses import dataclass
-from typing import List, Dict, Tuple
+import threading
+from dataclasses import dataclass, field
+from datetime import date
+from typing import List, Dict, Tuple, Iterable
 
 from more_itertools import consume
 
 import constants
 from adapter.google import sheets
-from utils import fileutils
+from utils import dateutils, fileutils
+from utils.intervalutils import EffectiveDated
 from .structure import FeeStructure
 
 _NAME_TO_FEE_RATE: Dict[Tuple[str, str], Fee] = {}
 HOUSE_TO_FEE_STRUCTURE: Dict[Tuple[str, str], FeeStructure] = {}
+# every schedule ever in force, the dicts above hold the ones in force today
+_FEE_RATE_HISTORY: EffectiveDated[Fee] = EffectiveDated()
+_FEE_STRUCTURE_HISTORY: EffectiveDated[FeeStructure] = EffectiveDated()
+# whether the sheets were read, the dicts above may well be empty once they were
+_RATES_LOADED = False
+_STRUCTURES_LOADED = False
+# structures registered by `add_fee_structure`, a reload registers them again
+_REGISTERED: List[Tuple[FeeStructure, date | None, date | None]] = []
+_VERSION = 0
+_LOCK = threading.RLock()
 
 SWAP_DF = "df"
 SWAP_NDF = "nd"
 _products = [SWAP_DF, SWAP_NDF]
 
 
-def _load_swap_fee_csv() -> None:
+def _load_swap_fee_csv(history: EffectiveDated[Fee]) -> None:
     file_path = os.path.join(constants.RESOURCE_DIR, "swap", "fee.csv")
-    _NAME_TO_FEE_RATE.update(
-        {
-            (fee.house, fee.product): fee
+    _add_fee_rates(
+        history,
+        (
+            fee
             for row in fileutils.read_csv_to_dicts(file_path)
             for fee in _row_to_fees(row)
             if row.get("product")
-        }
+        ),
     )
 
 
-def __load_fee_from_google_sheet(product: str) -> None:
-    _NAME_TO_FEE_RATE.update(
-        {
-            (fee.house, fee.product): fee
-            for row in sheets.get_values(f"{product} fees", "A:M")
+def __load_fee_from_google_sheet(history: EffectiveDated[Fee], product: str) -> None:
+    _add_fee_rates(
+        history,
+        (
+            fee
+            for row in sheets.get_values(f"{product} fees", "A:O")
             for fee in _row_to_fees(row)
             if row.get("currency")
-        }
+        ),
     )
 
 
+def _add_fee_rates(history: EffectiveDated[Fee], fees: Iterable[Fee]) -> None:
+    for fee in fees:
+        history.add((fee.house, fee.product), fee, fee.effective_from, fee.effective_to)
+
+
+def _read_fee_rates() -> EffectiveDated[Fee]:
+    history = EffectiveDated()
+    consume(__load_fee_from_google_sheet(history, p) for p in _products)
+    return history
+
+
+def _to_fee_structures(rates: EffectiveDated[Fee]) -> EffectiveDated[FeeStructure]:
+    history = EffectiveDated()
+    for key in rates.keys():
+        for effective_from, effective_to, rate in rates.periods(key):
+            fs = rate.to_fee_structure()
+            history.add((fs.house, fs.product), fs, effective_from, effective_to)
+    return history
+
+
+def _in_force(history: EffectiveDated, on: date) -> dict:
+    return {key: v for key in history.keys() if (v := history.get(key, on))}
+
+
 def _row_to_fees(row) -> List[Fee]:
     house = row.get("house").upper()
     product = row.get("product", "").upper()
@@ -55,6 +94,8 @@ def _row_to_fees(row) -> List[Fee]:
     ppd3 = row.get("ppd3", "").upper()
     b3 = row.get("b3", "").upper()
     ppd4 = row.get("ppd4", "").upper()
+    effective_from = dateutils.to_date(row.get("effective_from", ""))
+    effective_to = dateutils.to_date(row.get("effective_to", ""))
     return (
         [
             Fee(
@@ -70,6 +111,8 @@ def _row_to_fees(row) -> List[Fee]:
                 ppd3=ppd3,
                 b3=b3,
                 ppd4=ppd4,
+                effective_from=effective_from,
+                effective_to=effective_to,
             ),
             Fee(
                 house=house,
@@ -84,6 +127,8 @@ def _row_to_fees(row) -> List[Fee]:
                 ppd3=ppd3,
                 b3=b3,
                 ppd4=ppd4,
+                effective_from=effective_from,
+                effective_to=effective_to,
             ),
         ]
         if product == "swap"
@@ -101,6 +146,8 @@ def _row_to_fees(row) -> List[Fee]:
                 ppd3=ppd3,
                 b3=b3,
                 ppd4=ppd4,
+                effective_from=effective_from,
+                effective_to=effective_to,
             )
         ]
     )
@@ -120,6 +167,8 @@ class Fee:
     ppd3: int
     b3: str
     ppd4: int
+    effective_from: date | None = field(default=None)  # None: since forever
+    effective_to: date | None = field(default=None)  # None: until the next one
 
     def to_fee_structure(self) -> FeeStructure:
         rates = [self.ppd1, self.ppd2, self.ppd3, self.ppd4] if self.ppd1 else []
@@ -136,18 +185,110 @@ class Fee:
 
 
 def init_fee_rate() -> None:
-    if not _NAME_TO_FEE_RATE:
-        consume(__load_fee_from_google_sheet(p) for p in _products)
+    global _NAME_TO_FEE_RATE, _FEE_RATE_HISTORY, _RATES_LOADED
+    if _RATES_LOADED:
+        return
+    with _LOCK:
+        if not _RATES_LOADED:
+            history = _read_fee_rates()
+            _FEE_RATE_HISTORY = history
+            _NAME_TO_FEE_RATE = _in_force(history, date.today())
+            _RATES_LOADED = True
 
 
 def init_house_to_fee_structure() -> None:
-    if not HOUSE_TO_FEE_STRUCTURE:
-        name_to_fee_rate = get_name_to_fee_rate()
-        HOUSE_TO_FEE_STRUCTURE.update(
-            {
-                (r.house, r.product): r.to_fee_structure()
-                for r in name_to_fee_rate.values()
-            }
+    global HOUSE_TO_FEE_STRUCTURE, _FEE_STRUCTURE_HISTORY, _STRUCTURES_LOADED
+    if _STRUCTURES_LOADED:
+        return
+    with _LOCK:
+        if not _STRUCTURES_LOADED:
+            init_fee_rate()
+            history = _to_fee_structures(_FEE_RATE_HISTORY)
+            _FEE_STRUCTURE_HISTORY = history
+            HOUSE_TO_FEE_STRUCTURE = _in_force(history, date.today())
+            _STRUCTURES_LOADED = True
+
+
+def fee_schedule_version() -> int:
+    """
+    Changes whenever the fee structures are reloaded. Anything derived from them
+    (fee results, warmed up sessions, ...) should be cached under this version.
+    """
+    return _VERSION
+
+
+def reload_fee_structures() -> int:
+    """
+    Re-reads the fee sheets and swaps the new fee structures in at once, fees
+    calculated meanwhile see either the old schedules or the new ones. Structures
+    registered by `add_fee_structure` are kept on top of the sheets.
+
+    :return: the new fee schedule version
+    """
+    rate_history = _read_fee_rates()
+    structure_history = _to_fee_structures(rate_history)
+    today = date.today()
+    with _LOCK:
+        for fs, effective_from, effective_to in _REGISTERED:
+            structure_history.add(
+                (fs.house, fs.product), fs, effective_from, effective_to
+            )
+        _swap(
+            _in_force(rate_history, today),
+            _in_force(structure_history, today),
+            rate_history,
+            structure_history,
+        )
+        return _VERSION
+
+
+def _swap(
+    name_to_fee_rate: Dict[Tuple[str, str], Fee],
+    house_to_fee_structure: Dict[Tuple[str, str], FeeStructure],
+    rate_history: EffectiveDated[Fee],
+    structure_history: EffectiveDated[FeeStructure],
+) -> None:
+    global _NAME_TO_FEE_RATE, HOUSE_TO_FEE_STRUCTURE, _VERSION
+    global _FEE_RATE_HISTORY, _FEE_STRUCTURE_HISTORY
+    global _RATES_LOADED, _STRUCTURES_LOADED
+    with _LOCK:
+        _NAME_TO_FEE_RATE = name_to_fee_rate
+        HOUSE_TO_FEE_STRUCTURE = house_to_fee_structure
+        _FEE_RATE_HISTORY = rate_history
+        _FEE_STRUCTURE_HISTORY = structure_history
+        _RATES_LOADED = _STRUCTURES_LOADED = True
+        _VERSION += 1
+
+
+def snapshot_fee_structures() -> tuple:
+    """every fee schedule loaded, to `restore_fee_structures` in another process"""
+    init_house_to_fee_structure()
+    with _LOCK:
+        return (
+            dict(_NAME_TO_FEE_RATE),
+            dict(HOUSE_TO_FEE_STRUCTURE),
+            _FEE_RATE_HISTORY,
+            _FEE_STRUCTURE_HISTORY,
+            list(_REGISTERED),
+        )
+
+
+def restore_fee_structures(snapshot: tuple) -> None:
+    global _REGISTERED
+    (
+        name_to_fee_rate,
+        house_to_fee_structure,
+        rate_history,
+        structure_history,
+        registered,
+    ) = snapshot
+    with _LOCK:
+        _REGISTERED = list(registered)
+        _swap(
+            dict(name_to_fee_rate),
+            dict(house_to_fee_structure),
+            rate_history,
+            structure_history,
         )
 
 
@@ -202,4 +343,30 @@ def get_name_to_fee_structure() -> Dict[Tuple[str, str], FeeStructure]:
     return HOUSE_TO_FEE_STRUCTURE
 
 
-init_fee_rate()
+def get_fee_structure(house: str, product: str, on: date = None) -> FeeStructure | None:
+    """the fee structure in force on `on`, today by default"""
+    init_house_to_fee_structure()
+    return _FEE_STRUCTURE_HISTORY.get(
+        (house.upper(), product.upper()), on or date.today()
+    )
+
+
+def add_fee_structure(
+    fs: FeeStructure, effective_from: date = None, effective_to: date = None
+) -> None:
+    """registers a fee structure next to the loaded ones, e.g. a negotiated rate"""
+    global _VERSION
+    init_house_to_fee_structure()
+    key = fs.house, fs.product
+    with _LOCK:
+        _REGISTERED.append((fs, effective_from, effective_to))
+        _FEE_STRUCTURE_HISTORY.add(key, fs, effective_from, effective_to)
+        current = _FEE_STRUCTURE_HISTORY.get(key, date.today())
+        if current:
+            HOUSE_TO_FEE_STRUCTURE[key] = current
+        _VERSION += 1
+
+
+def get_fee_structure_history() -> EffectiveDated[FeeStructure]:
+    init_house_to_fee_structure()
+    return _FEE_STRUCTURE_HISTORY
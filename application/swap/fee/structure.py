@@ -1,9 +1,13 @@
 import operator
 import re
+from bisect import bisect_right
 from dataclasses import dataclass, field
 from datetime import date
 from typing import List, Tuple, Callable
 
+import numpy as np
+
+from utils import numberutils
 from ...trade import tenor as tnr
 
 OPERATORS = {
@@ -22,10 +26,19 @@ class FeeStructure:
     product: str
     rates: List[int]
     currency: str
-    boundaries: List[str]
+    boundaries: List[tnr.ParsedTenor]
     operators: List[Callable]
     first_range_max: int = field(default=None)
     fixed_rate: int = field(default=None)
+    # compiled once from the fields above, see `_compile`
+    _flat: Tuple[int, str] | None = field(init=False, default=None, repr=False)
+    _thresholds: Tuple[int, ...] = field(init=False, default=(), repr=False)
+    _rates: Tuple[int, ...] = field(init=False, default=(), repr=False)
+    _caps: Tuple[int | None, ...] = field(init=False, default=(), repr=False)
+    _sorted: bool = field(init=False, default=True, repr=False)
+
+    def __post_init__(self):
+        self._compile()
 
     @staticmethod
     def of(
@@ -45,6 +58,7 @@ class FeeStructure:
         :param fixed_rate: when the rate is fixed regardless of the tenor
         :return:
         """
+        rates = [numberutils.to_int(r) for r in rates]
         if rates and boundaries:
             assert len(rates) == len(boundaries) + 1
         bds, operators = parse_boundaries(boundaries)
@@ -55,30 +69,85 @@ class FeeStructure:
             currency.upper(),
             bds,
             operators,
-            first_range_max=first_range_max,
-            fixed_rate=fixed_rate,
+            first_range_max=numberutils.to_int(first_range_max),
+            fixed_rate=numberutils.to_int(fixed_rate),
         )
 
-    def calculate_fee(self, tenor: str, trade_date: date) -> Tuple[int, str]:
+    def _compile(self) -> None:
+        """
+        Folds the boundaries into day thresholds so that the bucket of a tenor is
+        the number of thresholds it reaches: `< b` becomes b and `<= b` becomes b + 1.
+        Structures with `>` or `>=` boundaries or unsorted thresholds are scanned in order.
+        """
         if not self.rates and not self.fixed_rate:
-            return 0, self.currency
+            self._flat = 0, self.currency
+            return
         if self.fixed_rate:
-            return self.fixed_rate, self.currency
-        tnr_d = tnr.to_days(tenor)
-        days = tnr.count_days(tenor, trade_date)
-        for boundary, rate, op in zip(self.boundaries, self.rates, self.operators):
-            boundary_days = tnr.to_days(boundary)
-            if op(tnr_d, boundary_days):
-                fee = rate * days
-                return (
-                    (min(fee, self.first_range_max), self.currency)
-                    if rate == self.rates[0] and self.first_range_max
-                    else (fee, self.currency)
-                )
-        return self.rates[-1] * days, self.currency
-
-
-def parse_boundaries(boundary_strings: List[str]) -> Tuple[List[str], List[Callable]]:
+            self._flat = self.fixed_rate, self.currency
+            return
+        self._thresholds = tuple(
+            b.days + (op is operator.le)
+            for b, op in zip(self.boundaries, self.operators)
+        )
+        self._sorted = all(
+            op in (operator.lt, operator.le) for op in self.operators
+        ) and list(self._thresholds) == sorted(self._thresholds)
+        self._rates = (*self.rates[: len(self.boundaries)], self.rates[-1])
+        # the cap applies to every bucket charging the first bucket's rate,
+        # but never to the open-ended last one
+        self._caps = tuple(
+            (
+                self.first_range_max
+                if rate == self.rates[0] and self.first_range_max
+                else None
+            )
+            for rate in self.rates[: len(self.boundaries)]
+        ) + (None,)
+
+    def bucket(self, tenor_days: int) -> int:
+        """index of the rate charged for a tenor of `tenor_days` approximate days"""
+        if self._sorted:
+            return bisect_right(self._thresholds, tenor_days)
+        for i, (boundary, op) in enumerate(zip(self.boundaries, self.operators)):
+            if op(tenor_days, boundary.days):
+                return i
+        return len(self.boundaries)
+
+    def calculate_fee(self, tenor: str, trade_date: date) -> Tuple[int, str]:
+        if self._flat:
+            return self._flat
+        parsed = tnr.parse(tenor)
+        i = self.bucket(tnr.period_days(parsed, trade_date))
+        # on/tn on a us holiday have no value dates and so no days to charge
+        fee = self._rates[i] * (tnr.count_days(parsed, trade_date) or 0)
+        cap = self._caps[i]
+        return (min(fee, cap) if cap else fee), self.currency
+
+    def calculate_fees(self, tenor_days: np.ndarray, days: np.ndarray) -> np.ndarray:
+        """
+        Fees of many tenors in the currency of this structure.
+
+        :param tenor_days: `tnr.period_days` of each tenor, picks the bucket
+        :param days: working days of each tenor, what the bucket rate is charged for
+        """
+        if self._flat:
+            return np.full(len(days), self._flat[0], dtype=np.int64)
+        if self._sorted:
+            buckets = np.searchsorted(self._thresholds, tenor_days, side="right")
+        else:
+            buckets = np.fromiter(
+                (self.bucket(d) for d in tenor_days.tolist()),
+                dtype=np.intp,
+                count=len(tenor_days),
+            )
+        fees = np.asarray(self._rates, dtype=np.int64)[buckets] * days
+        caps = np.asarray([c or 0 for c in self._caps], dtype=np.int64)[buckets]
+        return np.where(caps > 0, np.minimum(fees, caps), fees)
+
+
+def parse_boundaries(
+    boundary_strings: List[str],
+) -> Tuple[List[tnr.ParsedTenor], List[Callable]]:
     parsed_boundaries = []
     parsed_operators = []
 
@@ -89,7 +158,7 @@ def parse_boundaries(boundary_strings: List[str]) -> Tuple[List[str], List[Calla
 
         # Extract operator and tenor from the match groups
         op_symbol, tenor = match.groups()
-        parsed_boundaries.append(tenor.upper())
+        parsed_boundaries.append(tnr.parse(tenor))
         parsed_operators.append(OPERATORS[op_symbol])
 
     return parsed_boundaries, parsed_operators
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from types import MappingProxyType
+from typing import Mapping, Tuple
+
+from application.swap import fee
+from application.swap.fee import repository
+from application.swap.fee.structure import FeeStructure
+from utils import dateutils
+from . import tenor
+
+_SESSION: Session | None = None
+_LOCK = threading.Lock()
+_STOP = threading.Event()
+_POLL_SECONDS = 30
+
+
+@dataclass(frozen=True)
+class Session:
+    """
+    Reference data of one kr trade date, computed up front so that the first
+    deals of the day cost the same as the rest. Replaced as a whole on a day roll.
+    """
+
+    trade_date: date
+    calendar_version: int
+    fee_version: int
+    spot_date: date  # swap spot, kr + us settlement
+    spotmar_spot_date: date  # spotmar value date, as `spotmar.Deal.of` settles
+    grid: tenor.TenorGrid
+    fee_structures: Mapping[Tuple[str, str], FeeStructure]
+    fees: Mapping[Tuple[str, str, str], Tuple[int, str]]  # (house, product, tenor)
+    warmed_at: datetime = field(default_factory=datetime.now)
+
+    def value_date(self, symbol: str) -> date:
+        return self.grid.row(symbol)["far_date"]
+
+    def fee(self, house: str, product: str, symbol: str) -> Tuple[int, str] | None:
+        return self.fees.get((house.upper(), product.upper(), symbol))
+
+
+def trade_date_of(d: date = None) -> date:
+    """the kr trade date of a calendar day, holidays roll to the next working day"""
+    d = d or date.today()
+    kr = dateutils.get_calendar("kr")
+    return d if kr.is_working_day(d) else kr.next_working_day(d)
+
+
+def warm_up(trade_date: date = None) -> Session:
+    """
+    Precomputes the standard tenor grid, spot/value dates and every (house, product)
+    fee structure for `trade_date` and publishes them in a single assignment.
+    The fees are worked out through `fee.calculate_fee`, so the cache `Deal.of`
+    reads is warm as well.
+    """
+    global _SESSION
+    trade_date = trade_date_of(trade_date)
+    version = dateutils.calendar_version()
+    fee_version = fee.fee_schedule_version()
+    tenor.fixing_table()
+    grid = tenor.TenorGrid.for_trade_date(trade_date)
+    fee_structures = {
+        (fs.house, fs.product): fs
+        for fs in (
+            *repository.get_name_to_fee_structure().values(),
+            fee.DEFAULT_FEE_STRUCTURE,
+        )
+    }
+    fees = {
+        (house, product, symbol): fee.calculate_fee(house, product, symbol, trade_date)
+        for house, product in fee_structures
+        for symbol, days in zip(grid.symbols, grid.days)
+        if days is not None
+    }
+    session = Session(
+        trade_date=trade_date,
+        calendar_version=version,
+        fee_version=fee_version,
+        spot_date=grid.spot,
+        spotmar_spot_date=tenor.spot(trade_date),
+        grid=grid,
+        fee_structures=MappingProxyType(fee_structures),
+        fees=MappingProxyType(fees),
+    )
+    with _LOCK:
+        _SESSION = session
+    return session
+
+
+def current() -> Session:
+    """
+    the published session, warmed up again when the trade date,
+    a calendar or the fee structures changed
+    """
+    session = _SESSION
+    if (
+        session is None
+        or session.trade_date != trade_date_of()
+        or session.calendar_version != dateutils.calendar_version()
+        or session.fee_version != fee.fee_schedule_version()
+    ):
+        return warm_up()
+    return session
+
+
+def start(poll_seconds: int = _POLL_SECONDS) -> threading.Thread:
+    """
+    Runs the day roll in a daemon thread: warms up now and again whenever
+    the trade date rolls over or a calendar is reloaded.
+    """
+    _STOP.clear()
+    thread = threading.Thread(
+        target=_run, args=(poll_seconds,), name="day-roll", daemon=True
+    )
+    thread.start()
+    return thread
+
+
+def stop() -> None:
+    _STOP.set()
+
+
+def _run(poll_seconds: int) -> None:
+    while not _STOP.is_set():
+        try:
+            current()
+        except Exception as e:
+            print(f"Day roll warm up failed: {e}")
+        _STOP.wait(poll_seconds)
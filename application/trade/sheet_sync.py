@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import hashlib
+import re
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List
+
+from adapter.google import sheets
+
+_HEADER_ROW = 1
+_CELL_SEPARATOR = "\x1f"
+_RANGE_PATTERN = re.compile(r"^([A-Z]+)\d*:([A-Z]+)\d*$")
+
+
+@dataclass
+class SyncResult:
+    """sheet row numbers touched by one sync"""
+
+    added: List[int] = field(default_factory=list)
+    changed: List[int] = field(default_factory=list)
+    removed: List[int] = field(default_factory=list)
+    failed: Dict[int, Exception] = field(default_factory=dict)
+
+    def __bool__(self):
+        return bool(self.added or self.changed or self.removed)
+
+
+@dataclass
+class SheetSync:
+    """
+    Keeps the deals of an append-only daily sheet, such as "swap daily", up to date.
+
+    Every ingested row is remembered by a hash of its cells. A poll downloads only
+    the rows from `overlap` rows above the last one ingested onwards, and only the
+    rows that are new or whose hash changed are built into deals again. Edits further
+    up than `overlap` are picked up by `resync`, which downloads every row but still
+    rebuilds only the changed ones. A poll also reads the row just above its window,
+    when that row no longer hashes the same rows were inserted or deleted further up
+    and the poll resyncs instead. A row that fails to build is tried again by every
+    sync that downloads it, the reference data it missed may have been added since.
+
+    A deal with a `deal_id` gets the id its row was given when first ingested, so
+    building the row again upserts the same deal rather than a copy. The id stays
+    with the row through edits of its cells and when rows above it are inserted or
+    deleted. Identical rows are distinct deals.
+    """
+
+    sheet_name: str
+    columns: str  # e.g. "A:N", as `sheets.get_values` takes it
+    build: Callable[[dict], Any]  # a row keyed by header, as `sheets.to_dict` keys it
+    overlap: int = 20
+    header: List[str] = field(default_factory=list)
+    _hashes: List[bytes] = field(default_factory=list)  # [i] is sheet row i + 2
+    _deals: List[Any] = field(default_factory=list)  # None for a blank or failed row
+    _ids: List[str] = field(default_factory=list)  # deal id of each row
+    _first_column: str = field(init=False, repr=False)
+    _last_column: str = field(init=False, repr=False)
+
+    def __post_init__(self):
+        match = _RANGE_PATTERN.match(self.columns.upper())
+        if not match:
+            raise ValueError(f"{self.columns} is not a column range such as A:N")
+        self._first_column, self._last_column = match.groups()
+
+    @property
+    def cursor(self) -> int:
+        """the last sheet row ingested"""
+        return _HEADER_ROW + len(self._hashes)
+
+    @property
+    def deals(self) -> List[Any]:
+        return [d for d in self._deals if d is not None]
+
+    def poll(self) -> SyncResult:
+        if not self.header:
+            return self.resync()
+        first = max(_HEADER_ROW + 1, self.cursor + 1 - self.overlap)
+        anchor = first - 1  # the row above the window, the header at the top
+        rows = sheets.get_rows(
+            self.sheet_name, f"{self._first_column}{anchor}:{self._last_column}"
+        )
+        if not rows or self._moved(anchor, rows[0]):
+            # rows were inserted or deleted further up, every row below moved
+            return self.resync()
+        rows = rows[1:]
+        if not _trim(rows) and first <= self.cursor:
+            # the sheet ends above the window, rows were deleted further up
+            return self.resync()
+        return self._apply(first, rows)
+
+    def resync(self) -> SyncResult:
+        rows = sheets.get_rows(self.sheet_name, self.columns)
+        if not rows:
+            return self._apply(_HEADER_ROW + 1, [])
+        header = _header(rows[0])
+        if header != self.header:
+            # columns moved, every row means something else now
+            self.header, self._hashes, self._deals, self._ids = header, [], [], []
+        return self._apply(_HEADER_ROW + 1, rows[1:])
+
+    def _moved(self, row_number: int, cells: List[str]) -> bool:
+        """whether a row ingested before reads differently now"""
+        if row_number == _HEADER_ROW:
+            return _header(cells) != self.header
+        return _hash(_trim_cells(cells)) != self._hashes[row_number - _HEADER_ROW - 1]
+
+    def _apply(self, first: int, rows: List[List[str]]) -> SyncResult:
+        """
+        :param first: sheet row number of rows[0]
+        :param rows: every row from `first` to the end of the sheet
+        """
+        result = SyncResult()
+        rows = _trim(rows)
+        known = len(self._hashes)
+        start = first - _HEADER_ROW - 1
+        digests = [_hash(cells) for cells in rows]
+        moved, present = self._moved_ids(start, digests), set(digests)
+        for row_number, cells, digest in zip(
+            range(first, first + len(rows)), rows, digests
+        ):
+            i = row_number - _HEADER_ROW - 1
+            if i < known and self._hashes[i] == digest:
+                if self._deals[i] is not None or not cells:
+                    continue
+                # the row failed to build, it is tried again
+                deal_id = self._ids[i]
+            elif moved.get(digest):
+                deal_id = moved[digest].pop(0)
+            elif i < known and self._hashes[i] not in present:
+                deal_id = self._ids[i]  # the row was edited in place
+            else:
+                deal_id = _deal_id(self.sheet_name, row_number, cells)
+            deal = self._build(row_number, cells, deal_id, result.failed)
+            if i < known:
+                self._hashes[i], self._deals[i] = digest, deal
+                self._ids[i] = deal_id
+                result.changed.append(row_number)
+            else:
+                self._hashes.append(digest)
+                self._deals.append(deal)
+                self._ids.append(deal_id)
+                result.added.append(row_number)
+        end = start + len(rows)
+        if end < len(self._hashes):
+            result.removed = list(
+                range(end + _HEADER_ROW + 1, len(self._hashes) + _HEADER_ROW + 1)
+            )
+            del self._hashes[end:], self._deals[end:], self._ids[end:]
+        return result
+
+    def _moved_ids(self, start: int, digests: List[bytes]) -> Dict[bytes, List[str]]:
+        """
+        ids of the rows from `start` on that no longer read the same where they were,
+        by their hash, a row found again elsewhere takes its id with it
+
+        :param start: index of digests[0]
+        """
+        moved: Dict[bytes, List[str]] = {}
+        for i in range(start, len(self._hashes)):
+            j = i - start
+            if j >= len(digests) or digests[j] != self._hashes[i]:
+                moved.setdefault(self._hashes[i], []).append(self._ids[i])
+        return moved
+
+    def _build(
+        self,
+        row_number: int,
+        cells: List[str],
+        deal_id: str,
+        failed: Dict[int, Exception],
+    ):
+        if not cells:
+            return None
+        row = {self.header[i]: v for i, v in enumerate(cells) if i < len(self.header)}
+        try:
+            deal = self.build(row)
+        except Exception as e:  # a row being typed in must not stop the poll
+            failed[row_number] = e
+            return None
+        if hasattr(deal, "deal_id"):
+            deal.deal_id = deal_id
+        return deal
+
+
+def _hash(cells: List[str]) -> bytes:
+    return hashlib.blake2b(
+        _CELL_SEPARATOR.join(map(str, cells)).encode(), digest_size=8
+    ).digest()
+
+
+def _header(cells: List[str]) -> List[str]:
+    return [c.replace(" ", "_") for c in cells]
+
+
+def _deal_id(sheet_name: str, row_number: int, cells: List[str]) -> str:
+    """a uuid of where the row was first seen and what it read then"""
+    digest = hashlib.blake2b(
+        _CELL_SEPARATOR.join(map(str, [sheet_name, row_number, *cells])).encode(),
+        digest_size=16,
+    ).digest()
+    return str(uuid.UUID(bytes=digest))
+
+
+def _trim(rows: List[List[str]]) -> List[List[str]]:
+    """trailing blank cells and rows carry nothing, the api drops most of them"""
+    rows = [_trim_cells(r) for r in rows]
+    while rows and not rows[-1]:
+        rows.pop()
+    return rows
+
+
+def _trim_cells(cells: List[str]) -> List[str]:
+    cells = [c.strip() if isinstance(c, str) else c for c in cells]
+    while cells and cells[-1] in ("", None):
+        cells.pop()
+    return cells
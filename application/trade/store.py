@@ -0,0 +1,254 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, Dict, Iterable, List
+
+import numpy as np
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+_GROUPS = ("house", "entity", "product", "tenor", "date", "month")
+
+
+@dataclass
+class _Codes:
+    """interns strings as dense int32 codes, code i is values[i]"""
+
+    values: List[str] = field(default_factory=list)
+    _value_to_code: Dict[str, int] = field(default_factory=dict)
+
+    def code(self, value: str) -> int:
+        c = self._value_to_code.get(value)
+        if c is None:
+            c = self._value_to_code[value] = len(self.values)
+            self.values.append(value)
+        return c
+
+    def get(self, value: str) -> int:
+        """-1 for a value never interned, it matches no row"""
+        return self._value_to_code.get(value, -1)
+
+    def decode(self, codes: np.ndarray) -> List[str]:
+        return [self.values[c] for c in codes.tolist()]
+
+
+@dataclass
+class DealStore:
+    """
+    Swap and spotmar deals held column by column.
+
+    Every deal is a row of the deal columns (product, tenor, trade date, amount)
+    and two rows of the side columns (house, entity, brokerage charged), bid side
+    `2 * row` and offer side `2 * row + 1`. Strings are interned codes and dates
+    are day ordinals, so a filter is a couple of array compares.
+    A house index keeps the sides of every house, selecting the deals of one house
+    touches only those rows.
+
+    Deals are appended in bulk, columns are stitched together on the first read
+    after an append.
+    """
+
+    _houses: _Codes = field(default_factory=_Codes)
+    _entities: _Codes = field(default_factory=_Codes)
+    _products: _Codes = field(default_factory=_Codes)
+    _tenors: _Codes = field(default_factory=_Codes)
+    _deals: List[Any] = field(default_factory=list)
+    _chunks: Dict[str, List[np.ndarray]] = field(default_factory=dict)
+    _columns: Dict[str, np.ndarray] = field(default_factory=dict)
+    _house_sides: Dict[int, List[np.ndarray]] = field(default_factory=dict)
+
+    def __len__(self):
+        return len(self._deals)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(c.nbytes for c in self._stitched().values())
+
+    def append(self, deals: Iterable[Any]) -> int:
+        """
+        :param deals: swap.Deal or spotmar.Deal, a spotmar deal has no entity or tenor
+            and its house is the whole "HOUSE ENTITY" symbol
+        :return: number of deals appended
+        """
+        deals = list(deals)
+        if not deals:
+            return 0
+        first = len(self._deals)
+        house, entity = self._houses.code, self._entities.code
+        columns = {
+            "product": [self._products.code(d.product.upper()) for d in deals],
+            "tenor": [self._tenors.code(_tenor(d)) for d in deals],
+            "trade_date": [_trade_date(d).toordinal() for d in deals],
+            "amount": [d.amount for d in deals],
+            "house": [
+                house(h.upper()) for d in deals for h in (d.bid_house, d.offer_house)
+            ],
+            "entity": [
+                entity(e.upper())
+                for d in deals
+                for e in (getattr(d, "bid_entity", ""), getattr(d, "offer_entity", ""))
+            ],
+            "fee": [f for d in deals for f in (d.bid_bro_fee, d.offer_bro_fee)],
+        }
+        for name, values in columns.items():
+            self._chunks.setdefault(name, []).append(
+                np.asarray(values, dtype=_DTYPES[name])
+            )
+        self._index_houses(np.asarray(columns["house"], dtype=np.int32), 2 * first)
+        self._deals.extend(deals)
+        self._columns.clear()
+        return len(deals)
+
+    def _index_houses(self, houses: np.ndarray, first_side: int) -> None:
+        order = np.argsort(houses, kind="stable")
+        codes, starts = np.unique(houses[order], return_index=True)
+        for code, sides in zip(
+            codes.tolist(), np.split(order + first_side, starts[1:])
+        ):
+            self._house_sides.setdefault(code, []).append(sides.astype(np.int64))
+
+    def _stitched(self) -> Dict[str, np.ndarray]:
+        if not self._columns and self._chunks:
+            for name, chunks in self._chunks.items():
+                column = np.concatenate(chunks) if len(chunks) > 1 else chunks[0]
+                self._chunks[name] = [column]
+                self._columns[name] = column
+            for code, chunks in self._house_sides.items():
+                if len(chunks) > 1:
+                    self._house_sides[code] = [np.concatenate(chunks)]
+        return self._columns
+
+    def sides(
+        self,
+        house: str = None,
+        entity: str = None,
+        product: str = None,
+        tenor: str = None,
+        start: date = None,
+        end: date = None,
+    ) -> np.ndarray:
+        """
+        Positions of the sides matching every filter given, in booking order.
+
+        :param house: the side's house, looked up in the house index. Spotmar
+            sides only match their whole symbol, e.g. "WOORI SL" and not "WOORI"
+        :param entity: the side's entity, e.g. "SL"
+        :param start: first trade date, inclusive
+        :param end: last trade date, inclusive
+        """
+        columns = self._stitched()
+        if not columns:
+            return np.empty(0, dtype=np.int64)
+        if house is not None:
+            chunks = self._house_sides.get(self._houses.get(house.upper()))
+            sides = chunks[0] if chunks else np.empty(0, dtype=np.int64)
+        else:
+            sides = np.arange(2 * len(self), dtype=np.int64)
+        if entity is not None:
+            sides = sides[
+                columns["entity"][sides] == self._entities.get(entity.upper())
+            ]
+        rows = sides // 2
+        keep = np.ones(len(sides), dtype=bool)
+        if product is not None:
+            keep &= columns["product"][rows] == self._products.get(product.upper())
+        if tenor is not None:
+            keep &= columns["tenor"][rows] == self._tenors.get(tenor.upper())
+        if start is not None:
+            keep &= columns["trade_date"][rows] >= start.toordinal()
+        if end is not None:
+            keep &= columns["trade_date"][rows] <= end.toordinal()
+        return sides[keep]
+
+    def rows(self, **filters) -> np.ndarray:
+        """positions of the deals with a side matching `filters`, see `sides`"""
+        return np.unique(self.sides(**filters) // 2)
+
+    def deals(self, **filters) -> List[Any]:
+        """the deals appended, in booking order, that have a side matching `filters`"""
+        return [self._deals[r] for r in self.rows(**filters).tolist()]
+
+    def sum(self, value: str = "fee", by: str = "house", **filters) -> Dict[Any, float]:
+        """
+        Totals per group of the sides matching `filters`.
+
+        :param value: "fee" sums the brokerage charged on every side,
+            "amount" the amount of every deal once per group it falls in
+        :param by: "house", "entity" (as "house entity"), "product", "tenor",
+            "date" or "month" (as "yyyy-mm")
+        """
+        if by not in _GROUPS:
+            raise ValueError(f"cannot group by {by}, one of {_GROUPS}")
+        sides = self.sides(**filters)
+        if not len(sides):
+            return {}
+        keys = self._group_keys(by, sides)
+        if value == "fee":
+            values = self._columns["fee"][sides]
+        elif value == "amount":
+            # both sides of a deal land in one group unless grouped by the side
+            if by not in ("house", "entity"):
+                sides = sides[np.unique(sides // 2, return_index=True)[1]]
+                keys = self._group_keys(by, sides)
+            values = self._columns["amount"][sides // 2]
+        else:
+            raise ValueError(f"cannot sum {value}, one of ('fee', 'amount')")
+        unique_keys, index = np.unique(keys, return_inverse=True)
+        totals = np.bincount(index, weights=values, minlength=len(unique_keys))
+        return dict(zip(self._decode(by, unique_keys), totals.tolist()))
+
+    def _group_keys(self, by: str, sides: np.ndarray) -> np.ndarray:
+        columns = self._columns
+        if by == "house":
+            return columns["house"][sides]
+        if by == "entity":
+            houses = columns["house"][sides].astype(np.int64)
+            return houses << 32 | columns["entity"][sides]
+        if by in ("product", "tenor"):
+            return columns[by][sides // 2]
+        days = columns["trade_date"][sides // 2]
+        if by == "month":
+            return (
+                (days - _EPOCH_ORDINAL).astype("datetime64[D]").astype("datetime64[M]")
+            )
+        return days
+
+    def _decode(self, by: str, keys: np.ndarray) -> List[Any]:
+        if by == "house":
+            return self._houses.decode(keys)
+        if by == "entity":
+            houses, entities = self._houses.values, self._entities.values
+            return [
+                f"{houses[k >> 32]} {entities[k & 0xFFFFFFFF]}".strip()
+                for k in keys.tolist()
+            ]
+        if by == "product":
+            return self._products.decode(keys)
+        if by == "tenor":
+            return self._tenors.decode(keys)
+        if by == "month":
+            return np.datetime_as_string(keys, unit="M").tolist()
+        return [date.fromordinal(d) for d in keys.tolist()]
+
+    def houses(self) -> List[str]:
+        return sorted(self._houses.values)
+
+
+_DTYPES = {
+    "product": np.int32,
+    "tenor": np.int32,
+    "trade_date": np.int32,
+    "amount": np.float64,
+    "house": np.int32,
+    "entity": np.int32,
+    "fee": np.int64,
+}
+
+
+def _tenor(deal) -> str:
+    return (getattr(deal, "tenor", "") or "").upper()
+
+
+def _trade_date(deal) -> date:
+    trade_date = getattr(deal, "trade_date", None)
+    return trade_date if trade_date is not None else deal.deal_date
@@ -1,153 +1,558 @@
 from __future__ import annotations
 
 import re
+from bisect import bisect_right
 from dataclasses import dataclass, field
 from datetime import date, timedelta
-from typing import Tuple, Callable, List
+from enum import Enum
+from functools import lru_cache
+from typing import Tuple, Callable, List, Iterable, Dict
 
+import numpy as np
 from dateutil.relativedelta import relativedelta
 
-from application.swap.exception import InvalidTenorDateException
+from application.trade.exception import InvalidTenorDateException
 from utils import dateutils
+from utils.dateutils import CalendarLike
 
 _WEEK = 7
 _MONTH = 30
+_QUARTER = 91
 _YEAR = 365
+_IMM_MONTHS = (3, 6, 9, 12)
+
+STANDARD_TENORS = (
+    "spot",
+    "on",
+    "tn",
+    "sn",
+    "1w",
+    "2w",
+    "3w",
+    "1m",
+    "2m",
+    "3m",
+    "4m",
+    "5m",
+    "6m",
+    "7m",
+    "8m",
+    "9m",
+    "10m",
+    "11m",
+    "1y",
+    "2y",
+    "3y",
+    "4y",
+    "5y",
+    "6y",
+    "10y",
+)
+
+
+def overnight(_trade: date, calendar: CalendarLike = None) -> date:
+    return dateutils.add_workdays(_trade, 1, calendar)
+
+
+def spot(
+    _trade: date, calendar: CalendarLike = "kr", settlement: CalendarLike = "us"
+) -> date:
+    """
+    :param calendar: calendar the spot lag is counted on
+    :param settlement: when spot falls on its holiday, spot becomes the next joint working day
+    """
+    d = dateutils.add_workdays(_trade, 2, calendar)
+    if dateutils.is_holiday(d, settlement):
+        return dateutils.union(calendar, settlement).add_workdays(_trade, 1)
+    return d
+
+
+def fixing(_value: date, calendar: CalendarLike = "kr") -> date:
+    return dateutils.add_workdays(_value, -1, calendar)
+
+
+def mar(_fixing: date, calendar: CalendarLike = "kr") -> date:
+    return dateutils.add_workdays(_fixing, -1, calendar)
+
+
+@dataclass(frozen=True)
+class FixingTable:
+    """
+    NDF fixing and MAR dates of every value date in the kr holiday horizon,
+    one entry per calendar day from `first` on.
+    """
+
+    first: date | None
+    fixings: np.ndarray  # datetime64[D]
+    mars: np.ndarray  # datetime64[D]
+    fixing_dates: List[date]
+    mar_dates: List[date]
+
+    @staticmethod
+    def of(calendar: dateutils.Calendar) -> FixingTable:
+        if calendar.first is None:
+            empty = np.empty(0, dtype="datetime64[D]")
+            return FixingTable(None, empty, empty, [], [])
+        values = np.arange(
+            calendar.first, calendar.last + timedelta(days=1), dtype="datetime64[D]"
+        )
+        fixings = calendar.add_workdays_many(values, -1)
+        mars = calendar.add_workdays_many(fixings, -1)
+        return FixingTable(
+            calendar.first, fixings, mars, fixings.tolist(), mars.tolist()
+        )
+
+    def __len__(self):
+        return len(self.fixing_dates)
 
+    def lookup(self, value: date) -> Tuple[date, date]:
+        """fixing and MAR date of `value`, walked on the calendar outside the horizon"""
+        i = value.toordinal() - self.first.toordinal() if self.first else -1
+        if 0 <= i < len(self.fixing_dates):
+            return self.fixing_dates[i], self.mar_dates[i]
+        fixing_date = fixing(value)
+        return fixing_date, mar(fixing_date)
 
-def overnight(_trade: date) -> date:
-    return dateutils.add_workdays(_trade, 1)
+    def query(self, values) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        :param values: array-like of datetime64[D] value dates, e.g. the far legs of a book
+        :return: fixing and MAR dates as datetime64[D] arrays shaped like `values`
+        """
+        values = np.asarray(values, dtype="datetime64[D]")
+        if self.first is None:
+            i = np.full(values.shape, -1)
+        else:
+            i = (values - np.datetime64(self.first, "D")).astype(np.int64)
+        inside = (0 <= i) & (i < len(self))
+        if inside.all():
+            return self.fixings[i], self.mars[i]
+        fixings = np.empty(values.shape, dtype="datetime64[D]")
+        mars = np.empty(values.shape, dtype="datetime64[D]")
+        fixings[inside] = self.fixings[i[inside]]
+        mars[inside] = self.mars[i[inside]]
+        outside = ~inside
+        fixings[outside] = dateutils.add_workdays_many(values[outside], -1, "kr")
+        mars[outside] = dateutils.add_workdays_many(fixings[outside], -1, "kr")
+        return fixings, mars
 
 
-def spot(_trade: date) -> date:
-    d = dateutils.add_workdays(_trade, 2, "kr")
-    return dateutils.add_workdays(_trade, 1) if dateutils.is_holiday(d, "us") else d
+def fixing_table() -> FixingTable:
+    return _fixing_table(dateutils.calendar_version())
 
 
-def fixing(_value: date) -> date:
-    return dateutils.add_workdays(_value, -1, "kr")
+@lru_cache(maxsize=1)
+def _fixing_table(calendar_version: int) -> FixingTable:
+    return FixingTable.of(dateutils.get_calendar("kr"))
 
 
-def mar(_fixing: date) -> date:
-    return dateutils.add_workdays(_fixing, -1, "kr")
+def fixing_schedule(values) -> Tuple[np.ndarray, np.ndarray]:
+    """fixing and MAR dates of many value dates in one vectorized query"""
+    return fixing_table().query(values)
 
 
-def week(_spot: date, n: int = 1) -> date:
+def week(_spot: date, n: int = 1, calendar: CalendarLike = None) -> date:
     v = _spot + timedelta(weeks=n)
-    if dateutils.is_holiday(v):
-        return dateutils.add_workdays(v, 1)
+    if dateutils.is_holiday(v, calendar):
+        return dateutils.add_workdays(v, 1, calendar)
     return v
 
 
-def month(_spot: date, n: int = 1, end_of_month: bool = False) -> date:
+def month(
+    _spot: date, n: int = 1, end_of_month: bool = False, calendar: CalendarLike = None
+) -> date:
     v = _spot + relativedelta(months=n)
-    if end_of_month:
-        return dateutils.end_of_month(v, working_day=True)
-    if not dateutils.is_working_day(v):
-        return dateutils.add_workdays(v, 1)
-    return v
+    return _roll(v, end_of_month, calendar)
 
 
-def year(_spot: date, n: int = 1, end_of_month: bool = False) -> date:
+def year(
+    _spot: date, n: int = 1, end_of_month: bool = False, calendar: CalendarLike = None
+) -> date:
     v = _spot + relativedelta(years=n)
+    return _roll(v, end_of_month, calendar)
+
+
+def _roll(v: date, end_of_month: bool, calendar: CalendarLike = None) -> date:
+    cal = dateutils.get_calendar(calendar)
     if end_of_month:
-        return dateutils.end_of_month(v, working_day=True)
-    if not dateutils.is_working_day(v):
-        return dateutils.add_workdays(v, 1)
+        return cal.end_of_month(v, working_day=True)
+    if not cal.is_working_day(v):
+        return cal.add_workdays(v, 1)
     return v
 
 
-def imm(_spot: date):
-    pass
+def imm(_spot: date, n: int = 1, calendar: CalendarLike = None) -> date:
+    """
+    :return: the `n`th IMM date after `_spot`, the third wednesday of mar, jun,
+        sep or dec rolled to the next working day of `calendar`
+    """
+    cal = dateutils.get_calendar(calendar)
+    dates = _imm_table(cal)
+    i = bisect_right(dates, _spot) + n - 1
+    if dates and dates[0] <= _spot and i < len(dates):
+        return dates[i]
+    dates = _imm_dates(_spot.year, _spot.year + n // 4 + 1, cal)
+    return dates[bisect_right(dates, _spot) + n - 1]
+
+
+@lru_cache(maxsize=16)
+def _imm_table(calendar: dateutils.Calendar) -> List[date]:
+    """adjusted IMM dates over the span of `calendar`, sorted"""
+    if calendar.first is None:
+        return []
+    return _imm_dates(calendar.first.year, calendar.last.year, calendar)
+
+
+def _imm_dates(first_year: int, last_year: int, calendar: CalendarLike) -> List[date]:
+    return [
+        _roll(_third_wednesday(y, m), False, calendar)
+        for y in range(first_year, last_year + 1)
+        for m in _IMM_MONTHS
+    ]
+
+
+def _third_wednesday(year: int, month: int) -> date:
+    fifteenth = date(year, month, 15)
+    return fifteenth + timedelta(days=(2 - fifteenth.weekday()) % 7)
+
+
+def custom(
+    near_date: date, far_date: date, calendar: CalendarLike = "kr"
+) -> Tuple[date, date]:
+    """
+    Broken dates, checked to be working days of `calendar` with the far date after the near date.
+    """
+    if not valid_broken_dates(near_date, far_date, calendar):
+        raise InvalidTenorDateException(
+            far_date, f"No broken date tenor from {near_date}."
+        )
+    return near_date, far_date
+
+
+def valid_broken_dates(
+    near_date: date, far_date: date, calendar: CalendarLike = "kr"
+) -> bool:
+    cal = dateutils.get_calendar(calendar)
+    return (
+        near_date < far_date
+        and cal.is_working_day(near_date)
+        and cal.is_working_day(far_date)
+    )
+
+
+_PERIOD_PATTERN = re.compile(r"^(\d*)\s*(\D+)$")
+_FORWARD_FORWARD_PATTERN = re.compile(r"^(\d+[a-z]+)(\d+[a-z]+)$")
+_BROKEN_DATE_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+_UNIT_TO_KIND = {
+    "spot": "spot",
+    "on": "on",
+    "o/n": "on",
+    "tn": "tn",
+    "t/n": "tn",
+    "sn": "sn",
+    "s/n": "sn",
+    "w": "w",
+    "wk": "w",
+    "m": "m",
+    "y": "y",
+    "imm": "imm",
+}
+_KIND_TO_DAYS = {"w": _WEEK, "m": _MONTH, "imm": _QUARTER, "y": _YEAR}
+
+
+@dataclass(frozen=True)
+class TenorPeriod:
+    """one leg of a tenor symbol, e.g. 3m, o/n, 2imm or a 2024-09-20 broken date"""
+
+    symbol: str
+    n: int
+    unit: str  # as written, e.g. wk
+    kind: str | None  # spot, on, tn, sn, w, m, imm, y or custom. None when unknown
+    value: date | None = None  # the date of a custom period
+
+    @property
+    def days(self) -> int:
+        """approximate calendar days, used to compare tenors"""
+        return self.n * _KIND_TO_DAYS[self.kind] if self.kind in _KIND_TO_DAYS else 1
+
+
+@dataclass(frozen=True)
+class ParsedTenor:
+    """
+    A tenor symbol parsed once: a single period (1m), a spread (1m*3m) or a
+    forward-forward (1m3m). Obtained from `parse`, which interns the results,
+    so parsed tenors are cheap to hash and compare.
+    """
+
+    symbol: str
+    near: TenorPeriod | None
+    far: TenorPeriod
+
+    @property
+    def days(self) -> int:
+        return self.far.days
+
+    @property
+    def near_symbol(self) -> str:
+        return self.near.symbol if self.near else ""
+
+    @property
+    def far_symbol(self) -> str:
+        return self.far.symbol
+
+    @property
+    def known(self) -> bool:
+        """every period has a unit tenors can be built for"""
+        return self.far.kind is not None and (
+            self.near is None or self.near.kind is not None
+        )
+
+
+_NO_PERIOD = TenorPeriod("", 0, "", None)
+
+
+def parse(tenor: str | ParsedTenor) -> ParsedTenor:
+    if isinstance(tenor, ParsedTenor):
+        return tenor
+    return _parse(tenor)
+
+
+@lru_cache(maxsize=None)
+def _parse(tenor: str) -> ParsedTenor:
+    return _parse_normalized(tenor.strip().lower())
 
 
-def custom(near_date: date, far_date: date):
-    pass
+@lru_cache(maxsize=None)
+def _parse_normalized(symbol: str) -> ParsedTenor:
+    forward_forward = _FORWARD_FORWARD_PATTERN.match(symbol)
+    if forward_forward:
+        near, far = forward_forward.groups()
+    elif symbol.count("*") == 1:
+        near, far = (s.strip() for s in symbol.split("*"))
+    else:
+        near, far = "", symbol
+    return ParsedTenor(
+        symbol, _parse_period(near) if near else None, _parse_period(far)
+    )
 
 
-def _separate_numeric(string):
-    match = re.match(r"(\d*)(\D+)", string)
-    if match:
-        # Extract the numeric part and the string part
-        num_part, str_part = match.groups()
-        num = int(num_part) if num_part else 0
-        return num, str_part
-    return 0, string
+def _parse_period(symbol: str) -> TenorPeriod:
+    if _BROKEN_DATE_PATTERN.match(symbol):
+        try:
+            return TenorPeriod(symbol, 0, "", "custom", date.fromisoformat(symbol))
+        except ValueError:
+            return TenorPeriod(symbol, 0, symbol, None)
+    match = _PERIOD_PATTERN.match(symbol)
+    if not match:
+        return TenorPeriod(symbol, 0, symbol, None)
+    num_part, unit = match.groups()
+    kind = _UNIT_TO_KIND.get(unit)
+    if not num_part:
+        return TenorPeriod(symbol, 1 if kind == "imm" else 0, unit, kind)
+    return TenorPeriod(symbol, int(num_part), unit, kind)
 
 
-def to_days(tenor) -> int:
-    if tenor.endswith("w"):
-        return int(tenor[:-1]) * _WEEK
-    if tenor.endswith("m"):
-        return int(tenor[:-1]) * _MONTH
-    if tenor.endswith("y"):
-        return int(tenor[:-1]) * _YEAR
-    return 1
+def to_days(tenor: str | ParsedTenor) -> int:
+    return parse(tenor).days
 
 
-def count_days(tenor: str, trade_date: date = None) -> int:
+def period_days(tenor: str | ParsedTenor, trade_date: date) -> int:
+    """
+    `to_days`, except for a custom far date whose days are the calendar days
+    from the near value date, which only the trade date can tell
+    """
+    tenor = parse(tenor)
+    if tenor.far.kind != "custom":
+        return tenor.days
+    tenor_schedule = schedule(tenor, trade_date)
+    return (tenor_schedule.far.value - tenor_schedule.near.value).days
+
+
+def count_days(tenor: str | ParsedTenor, trade_date: date = None) -> int:
     if not trade_date:
         trade_date = date.today()
-    return Tenor(tenor, trade_date).days
+    return schedule(tenor, trade_date).days
 
 
-@dataclass
+@dataclass(frozen=True)
+class TenorSchedule:
+    """
+    Everything a tenor resolves to on a trade date. Immutable so that a single
+    schedule can be shared by every deal of the same tenor and trade date.
+    """
+
+    tenor: ParsedTenor
+    trade: date
+    spot: date
+    product: str
+    near: Leg
+    far: Leg
+    value_eom: bool  # value date should be end of month
+    near_symbol: str
+    far_symbol: str
+    days: int | None  # kr working days between the near and far value dates
+
+    @property
+    def symbol(self) -> str:
+        return self.tenor.symbol
+
+
+_SCHEDULE_CACHE_SIZE = 4_096
+
+
+def _build_schedule(
+    tenor: ParsedTenor, trade: date, calendar_version: int
+) -> TenorSchedule:
+    """`calendar_version` is only part of the cache key, a calendar reload misses the cache"""
+    return _builder(trade, calendar_version).build(tenor)
+
+
+@lru_cache(maxsize=64)
+def _builder(trade: date, calendar_version: int) -> _ScheduleBuilder:
+    return _ScheduleBuilder(trade)
+
+
+_cached_schedule = lru_cache(maxsize=_SCHEDULE_CACHE_SIZE)(_build_schedule)
+
+
+def schedule(tenor: str | ParsedTenor, trade: date) -> TenorSchedule:
+    return _cached_schedule(parse(tenor), trade, dateutils.calendar_version())
+
+
+def schedule_cache_info():
+    """hits, misses, maxsize and currsize of the schedule cache"""
+    return _cached_schedule.cache_info()
+
+
+def configure_schedule_cache(maxsize: int | None = _SCHEDULE_CACHE_SIZE) -> None:
+    """
+    Resizes (and empties) the schedule cache.
+
+    :param maxsize: number of (symbol, trade date) schedules kept, None for unbounded
+    """
+    global _cached_schedule
+    _cached_schedule = lru_cache(maxsize=maxsize)(_build_schedule)
+
+
+def clear_schedule_cache() -> None:
+    _cached_schedule.cache_clear()
+    _builder.cache_clear()
+    _fixing_table.cache_clear()
+
+
+@dataclass(frozen=True)
+class TenorGrid:
+    """
+    Every standard tenor of a trade date as one column-per-field table,
+    for quoting screens and bulk fee lookups.
+    """
+
+    trade: date
+    spot: date
+    symbols: Tuple[str, ...]
+    near_dates: Tuple[date | None, ...]
+    far_dates: Tuple[date | None, ...]
+    fixing_dates: Tuple[date | None, ...]
+    mar_dates: Tuple[date | None, ...]
+    days: Tuple[int | None, ...]
+
+    @staticmethod
+    def for_trade_date(
+        trade: date, symbols: Iterable[str] = STANDARD_TENORS
+    ) -> TenorGrid:
+        return _tenor_grid(trade, tuple(symbols), dateutils.calendar_version())
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def index(self, symbol: str) -> int:
+        return self.symbols.index(symbol)
+
+    def row(self, symbol: str) -> dict:
+        i = self.index(symbol)
+        return {
+            "tenor": symbol,
+            "trade_date": self.trade,
+            "spot_date": self.spot,
+            "near_date": self.near_dates[i],
+            "far_date": self.far_dates[i],
+            "fixing_date": self.fixing_dates[i],
+            "mar_date": self.mar_dates[i],
+            "days": self.days[i],
+        }
+
+    def rows(self) -> List[dict]:
+        return [self.row(s) for s in self.symbols]
+
+
+@lru_cache(maxsize=8)
+def _tenor_grid(
+    trade: date, symbols: Tuple[str, ...], calendar_version: int
+) -> TenorGrid:
+    builder = _builder(trade, calendar_version)
+    schedules = [builder.build(s) for s in symbols]
+    return TenorGrid(
+        trade=trade,
+        spot=builder.spot,
+        symbols=symbols,
+        near_dates=tuple(s.near.value for s in schedules),
+        far_dates=tuple(s.far.value for s in schedules),
+        fixing_dates=tuple(s.far.fixing for s in schedules),
+        mar_dates=tuple(s.far.mar for s in schedules),
+        days=tuple(s.days for s in schedules),
+    )
+
+
+@dataclass(slots=True)
 class Tenor:
+    """
+    A tenor of a trade date. Only the symbol, trade date and a reference to the
+    shared schedule are kept per instance, everything else is read from the schedule.
+    """
+
     symbol: str
     trade: date
-    spot: date = field(init=False)
-    product: str = field(init=False)
-    _legs: Tuple[Leg, Leg] = field(default=tuple)
-    _value_eom: bool = field(init=False)  # value date should be end of month
-    _near: str = field(init=False)
-    _far: str = field(init=False)
+    _schedule: TenorSchedule = field(init=False, repr=False)
 
     def __post_init__(self):
-        if dateutils.is_holiday(self.trade, "kr"):
-            raise InvalidTenorDateException(
-                self.trade, "No tenor exists for the Korean holidays."
-            )
-        self.spot = spot(self.trade)
-        self._value_eom = dateutils.is_end_of_month(month(self.spot), working_day=True)
-        self._near, self._far = self.near_far_symbols
-        self.product = "ndf" if self._near else "df"
-        self._init_legs()
-        self._func(self.symbol)
-
-    def _init_legs(self):
-        first, second = self.near_far_symbols
-        n, near_tenor = _separate_numeric(first)
-        tenor_func = self._func(near_tenor)
-        first_near_date, first_value_date = tenor_func(n=n)
-        n, far_tenor = _separate_numeric(second)
-        tenor_func = self._func(far_tenor)
-        near_date, second_value_date = tenor_func(
-            n=n, near_date=first_value_date if first_value_date else first_near_date
-        )
-        self._legs = self._make_legs(
-            near_tenor, near_date, far_tenor, second_value_date
-        )
+        self._schedule = schedule(self.symbol, self.trade)
+
+    @staticmethod
+    def try_build(symbol: str, trade: date) -> TenorResult:
+        """
+        Builds the tenor without raising, the returned status tells why
+        there is no tenor when it can not be built.
+        """
+        status = _status(parse(symbol), trade)
+        tenor = Tenor(symbol, trade) if status is TenorStatus.OK else None
+        return TenorResult(symbol, trade, status, tenor)
+
+    @property
+    def schedule(self) -> TenorSchedule:
+        return self._schedule
+
+    @property
+    def parsed(self) -> ParsedTenor:
+        return self._schedule.tenor
+
+    @property
+    def spot(self) -> date:
+        return self._schedule.spot
+
+    @property
+    def product(self) -> str:
+        return self._schedule.product
 
     @property
     def near_far_symbols(self) -> Tuple[str, str]:
-        if re.match(r"^\d[a-zA-Z]\d[a-zA-Z]$", self.symbol):
-            matches = re.findall(r"\d+\D+")
-            return matches[0], matches[1]
-        symbols = self.symbol.split("*")
-        near = ""
-        far = self.symbol
-        if len(symbols) == 2:
-            near = symbols[0].strip()
-            far = symbols[1].strip()
-        return near, far
+        return self._schedule.near_symbol, self._schedule.far_symbol
 
     @property
     def near(self) -> Leg:
-        return self._legs[0]
+        return self._schedule.near
 
     @property
     def far(self) -> Leg:
-        return self._legs[1]
+        return self._schedule.far
 
     @property
     def near_date(self) -> date:
@@ -167,25 +572,302 @@ class Tenor:
 
     @property
     def days(self):
-        return dateutils.working_days_between(
-            self.near_date, self.far_date, country_code="kr"
+        return self._schedule.days
+
+
+class TenorStatus(Enum):
+    OK = "ok"
+    HOLIDAY_TRADE_DATE = "no tenor exists for the korean holidays"
+    UNKNOWN_SYMBOL = "unknown tenor symbol"
+    US_HOLIDAY = "on/tn unavailable on a us holiday"
+    INVALID_BROKEN_DATE = "broken dates must be working days after their near date"
+    INVERTED_LEGS = "the far leg must settle after the near leg"
+    INVALID_TRADE_DATE = "the trade date can not be read"
+
+
+@dataclass(frozen=True)
+class TenorResult:
+    symbol: str
+    trade: date | None  # None when the trade date could not be read
+    status: TenorStatus
+    tenor: Tenor | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.status is TenorStatus.OK
+
+
+def try_build_many(rows: Iterable[Tuple[str, date]]) -> List[TenorResult]:
+    """
+    :param rows: (tenor symbol, trade date) pairs
+    :return: one result per row, in order
+    """
+    return [Tenor.try_build(symbol, trade) for symbol, trade in rows]
+
+
+def _status(tenor: ParsedTenor, trade: date) -> TenorStatus:
+    if dateutils.is_holiday(trade, "kr"):
+        return TenorStatus.HOLIDAY_TRADE_DATE
+    if not tenor.known:
+        return TenorStatus.UNKNOWN_SYMBOL
+    builder = _builder(trade, dateutils.calendar_version())
+    if builder.unavailable(tenor):
+        return TenorStatus.US_HOLIDAY
+    if builder.broken(tenor):
+        return TenorStatus.INVALID_BROKEN_DATE
+    if builder.inverted(tenor):
+        return TenorStatus.INVERTED_LEGS
+    return TenorStatus.OK
+
+
+_SYMBOLS: List[str] = []
+_SYMBOL_TO_ID: Dict[str, int] = {}
+_NO_DATE = 0  # ordinal of a leg without a value date
+
+
+def symbol_id(symbol: str) -> int:
+    """interned id of a tenor symbol, stable for the life of the process"""
+    if symbol not in _SYMBOL_TO_ID:
+        _SYMBOL_TO_ID[symbol] = len(_SYMBOLS)
+        _SYMBOLS.append(symbol)
+    return _SYMBOL_TO_ID[symbol]
+
+
+def symbol_of(i: int) -> str:
+    return _SYMBOLS[i]
+
+
+@dataclass(frozen=True)
+class TenorBook:
+    """
+    Tenors of many deals as int32 columns: an interned symbol id and the day
+    ordinals of the trade, near and far value dates. `date` objects are only
+    created by the accessors, fixing and MAR dates come from the fixing table.
+    """
+
+    symbol_ids: np.ndarray
+    trades: np.ndarray
+    nears: np.ndarray
+    fars: np.ndarray
+
+    @staticmethod
+    def of(tenors: Iterable[Tenor]) -> TenorBook:
+        rows = [
+            (
+                symbol_id(t.symbol),
+                t.trade.toordinal(),
+                _ordinal(t.near_date),
+                _ordinal(t.far_date),
+            )
+            for t in tenors
+        ]
+        columns = np.asarray(rows, dtype=np.int32).reshape(-1, 4).T
+        return TenorBook(*(np.ascontiguousarray(c) for c in columns))
+
+    @staticmethod
+    def from_columns(symbols, trades) -> TenorBook:
+        """
+        Resolves every distinct (symbol, trade date) pair once.
+
+        :param symbols: tenor symbols of the deals
+        :param trades: trade dates of the deals, dates or datetime64[D]
+        """
+        unique_symbols, symbol_index = np.unique(
+            np.asarray(symbols, dtype=str), return_inverse=True
+        )
+        trade_ordinals = _to_ordinals(trades)
+        # one int per pair sorts much faster than pairs of columns
+        pairs, pair_index = np.unique(
+            trade_ordinals.astype(np.int64) * len(unique_symbols) + symbol_index,
+            return_inverse=True,
+        )
+        ids = np.empty(len(pairs), dtype=np.int32)
+        nears = np.empty(len(pairs), dtype=np.int32)
+        fars = np.empty(len(pairs), dtype=np.int32)
+        for i, pair in enumerate(pairs.tolist()):
+            trade, s = divmod(pair, len(unique_symbols))
+            symbol = str(unique_symbols[s])
+            tenor_schedule = schedule(symbol, date.fromordinal(trade))
+            ids[i] = symbol_id(symbol)
+            nears[i] = _ordinal(tenor_schedule.near.value)
+            fars[i] = _ordinal(tenor_schedule.far.value)
+        pair_index = pair_index.reshape(-1)
+        return TenorBook(
+            ids[pair_index], trade_ordinals, nears[pair_index], fars[pair_index]
+        )
+
+    def __len__(self):
+        return len(self.trades)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(
+            c.nbytes for c in (self.symbol_ids, self.trades, self.nears, self.fars)
+        )
+
+    def symbol(self, i: int) -> str:
+        return symbol_of(self.symbol_ids[i])
+
+    def trade_date(self, i: int) -> date:
+        return date.fromordinal(int(self.trades[i]))
+
+    def near_date(self, i: int) -> date | None:
+        return _date(self.nears[i])
+
+    def far_date(self, i: int) -> date | None:
+        return _date(self.fars[i])
+
+    def vfm_dates(self, i: int, far: bool = True) -> List[date]:
+        value = self.far_date(i) if far else self.near_date(i)
+        return [value, *fixing_table().lookup(value)]
+
+    def tenor(self, i: int) -> Tenor:
+        return Tenor(self.symbol(i), self.trade_date(i))
+
+    def fixing_schedule(self) -> Tuple[np.ndarray, np.ndarray]:
+        """fixing and MAR dates of every far leg"""
+        return fixing_schedule(_to_days(self.fars))
+
+    def working_days(self) -> np.ndarray:
+        """
+        kr working days between the near and far value dates like `Tenor.days`,
+        0 where a leg has no value date
+        """
+        dated = (self.nears != _NO_DATE) & (self.fars != _NO_DATE)
+        days = dateutils.working_days_between_many(
+            _to_days(self.nears), _to_days(self.fars), "kr"
+        )
+        return np.where(dated, days, 0)
+
+    def period_days(self) -> np.ndarray:
+        """`period_days` of every tenor, what fee buckets are chosen by"""
+        symbol_days = np.asarray([parse(s).days for s in _SYMBOLS], dtype=np.int64)
+        custom = np.asarray(
+            [parse(s).far.kind == "custom" for s in _SYMBOLS], dtype=bool
         )
+        return np.where(
+            custom[self.symbol_ids],
+            self.fars.astype(np.int64) - self.nears,
+            symbol_days[self.symbol_ids],
+        )
+
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def _ordinal(d: date | None) -> int:
+    return d.toordinal() if d else _NO_DATE
 
-    def _func(self, tenor: str) -> Callable:
+
+def _date(ordinal) -> date | None:
+    return date.fromordinal(int(ordinal)) if ordinal != _NO_DATE else None
+
+
+def _to_days(ordinals: np.ndarray) -> np.ndarray:
+    return (ordinals - _EPOCH_ORDINAL).astype("datetime64[D]")
+
+
+def _to_ordinals(dates) -> np.ndarray:
+    days = np.asarray(dates, dtype="datetime64[D]").astype(np.int64)
+    return (days + _EPOCH_ORDINAL).astype(np.int32)
+
+
+@dataclass
+class _ScheduleBuilder:
+    """
+    Computes TenorSchedules of one trade date. The spot date and end-of-month flag
+    are worked out once and shared by every tenor built from the same builder.
+    Use `schedule` or `TenorGrid` to get cached results.
+    """
+
+    trade: date
+    spot: date = field(init=False)
+    _value_eom: bool = field(init=False)
+
+    def __post_init__(self):
+        if dateutils.is_holiday(self.trade, "kr"):
+            raise InvalidTenorDateException(
+                self.trade, "No tenor exists for the Korean holidays."
+            )
+        self.spot = spot(self.trade)
+        self._value_eom = dateutils.is_end_of_month(month(self.spot), working_day=True)
+
+    def build(self, tenor: str | ParsedTenor) -> TenorSchedule:
+        tenor = parse(tenor)
+        near, far = self._legs(tenor)
+        return TenorSchedule(
+            tenor=tenor,
+            trade=self.trade,
+            spot=self.spot,
+            product="ndf" if tenor.near else "df",
+            near=near,
+            far=far,
+            value_eom=self._value_eom,
+            near_symbol=tenor.near_symbol,
+            far_symbol=tenor.far_symbol,
+            days=(
+                dateutils.working_days_between(near.value, far.value, "kr")
+                if near.value and far.value
+                else None
+            ),
+        )
+
+    def unavailable(self, tenor: ParsedTenor) -> bool:
+        """on and tn have no value dates when their near date is a us holiday"""
+        return any(
+            self._func(p.kind)()[0] is None
+            for p in (tenor.near, tenor.far)
+            if p and p.kind in ("on", "tn")
+        )
+
+    def broken(self, tenor: ParsedTenor) -> bool:
+        """custom periods whose dates are not working days after the date they start"""
+        if tenor.far.kind != "custom" and (tenor.near or _NO_PERIOD).kind != "custom":
+            return False
+        try:
+            self._legs(tenor)
+        except InvalidTenorDateException:
+            return True
+        return False
+
+    def inverted(self, tenor: ParsedTenor) -> bool:
+        """far legs settling on or before their near leg, e.g. 0imm"""
+        near, far = self._legs(tenor, validate=False)
+        return _inverted(near.value, far.value)
+
+    def _legs(self, tenor: ParsedTenor, validate: bool = True) -> Tuple[Leg, Leg]:
+        near = tenor.near or _NO_PERIOD
+        tenor_func = self._func(near.kind)
+        first_near_date, first_value_date = tenor_func(
+            n=near.n, value=near.value, validate=validate
+        )
+        far = tenor.far
+        tenor_func = self._func(far.kind)
+        near_date, second_value_date = tenor_func(
+            n=far.n,
+            near_date=first_value_date if first_value_date else first_near_date,
+            value=far.value,
+            validate=validate,
+        )
+        if validate and _inverted(near_date, second_value_date):
+            raise InvalidTenorDateException(
+                second_value_date, f"{tenor.symbol} settles on or before its near leg."
+            )
+        return self._make_legs(near.unit, near_date, far.unit, second_value_date)
+
+    def _func(self, kind: str | None) -> Callable:
         _functions = {
             "spot": self._spot,
             "on": self._overnight,
-            "o/n": self._overnight,
             "tn": self._tomorrow_next,
-            "t/n": self._tomorrow_next,
             "sn": self._spot_next,
-            "s/n": self._spot_next,
             "w": self._week,
-            "wk": self._week,
             "m": self._month,
+            "imm": self._imm,
             "y": self._year,
+            "custom": self._custom,
         }
-        return _functions.get(tenor, self._default)
+        return _functions.get(kind, self._default)
 
     def _default(self, **kwargs):
         return None, None
@@ -254,11 +936,45 @@ class Tenor:
         far_date = year(near_date, n, self._value_eom)
         return near_date, far_date
 
+    def _imm(self, **kwargs) -> Tuple[date, date]:
+        """
+        :param kwargs:
+            n = # of IMM dates
+            near_date = near date. defaults to spot date
+        :return:
+        """
+        n = kwargs.get("n", 1)
+        near_date = kwargs.get("near_date")
+        if near_date is None:
+            near_date = self.spot
+        far_date = imm(near_date, n)
+        return near_date, far_date
+
+    def _custom(self, **kwargs) -> Tuple[date, date]:
+        """
+        :param kwargs:
+            value = the broken value date
+            near_date = near date. defaults to spot date
+            validate = raise when the dates are not valid broken dates
+        :return:
+        """
+        near_date = kwargs.get("near_date")
+        if near_date is None:
+            near_date = self.spot
+        far_date = kwargs.get("value")
+        if kwargs.get("validate", True):
+            return custom(near_date, far_date)
+        return near_date, far_date
+
     def _make_legs(self, near_tenor: str, near: date, far_tenor: str, far: date):
         return Leg(near_tenor, self.trade, near), Leg(far_tenor, self.trade, far)
 
 
-@dataclass
+def _inverted(near: date | None, far: date | None) -> bool:
+    return near is not None and far is not None and far <= near
+
+
+@dataclass(frozen=True, slots=True)
 class Leg:
     symbol: str
     trade: date
@@ -269,8 +985,9 @@ class Leg:
     def __post_init__(self):
         if self.value is None:
             return
-        self.fixing = fixing(self.value)
-        self.mar = mar(self.fixing)
+        fixing_date, mar_date = fixing_table().lookup(self.value)
+        object.__setattr__(self, "fixing", fixing_date)
+        object.__setattr__(self, "mar", mar_date)
 
     @property
     def vfm_dates(self) -> List[date]:
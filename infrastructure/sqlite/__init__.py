@@ -0,0 +1 @@
+from .deal_repository import *
@@ -0,0 +1,354 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple
+
+import numpy as np
+
+import constants
+from application.spotmar.deal import Deal as SpotmarDeal
+from application.swap.deal import Deal as SwapDeal
+
+DB_PATH = os.path.join(constants.RESOURCE_DIR, "db", "deals.db")
+CHUNK_SIZE = 10_000
+
+# column kind -> (sqlite type, to sql, from sql, numpy dtype of a columnar batch)
+_KINDS: Dict[str, Tuple[str, Callable, Callable, Any]] = {
+    "text": ("TEXT", lambda v: v, lambda v: v, object),
+    "int": ("INTEGER", lambda v: v, lambda v: v, np.int64),
+    "real": ("REAL", lambda v: v, lambda v: v, np.float64),
+    "bool": ("INTEGER", int, bool, bool),
+    "date": ("TEXT", date.isoformat, date.fromisoformat, "datetime64[D]"),
+    "datetime": (
+        "TEXT",
+        datetime.isoformat,
+        datetime.fromisoformat,
+        "datetime64[us]",
+    ),
+}
+
+
+@dataclass(frozen=True)
+class _Schema:
+    """a deal table, its columns are named after the fields of the deal type"""
+
+    table: str
+    record: Callable[..., Any]  # takes every column by name, e.g. `Deal.from_record`
+    columns: Tuple[Tuple[str, str], ...]  # (field, kind), deal_id first
+
+    @property
+    def names(self) -> List[str]:
+        return [name for name, _ in self.columns]
+
+    def ddl(self) -> List[str]:
+        columns = ", ".join(
+            f"{name} {_KINDS[kind][0]}" + (" PRIMARY KEY" if name == "deal_id" else "")
+            for name, kind in self.columns
+        )
+        t = self.table
+        return [
+            f"CREATE TABLE IF NOT EXISTS {t} ({columns})",
+            # the house indexes cover the brokerage owed by a house over a period
+            f"CREATE INDEX IF NOT EXISTS {t}_trade_date ON {t} (trade_date)",
+            *(
+                f"CREATE INDEX IF NOT EXISTS {t}_{side}_house ON {t} ({side}_house, "
+                f"trade_date, {side}_switch, {side}_brokerage_currency, "
+                f"{side}_brokerage_fee)"
+                for side in ("bid", "offer")
+            ),
+        ]
+
+    def upsert_sql(self) -> str:
+        names = self.names
+        return (
+            f"INSERT INTO {self.table} ({', '.join(names)}) "
+            f"VALUES ({', '.join('?' * len(names))}) "
+            "ON CONFLICT (deal_id) DO UPDATE SET "
+            + ", ".join(f"{n} = excluded.{n}" for n in names[1:])
+        )
+
+    def to_row(self, deal) -> tuple:
+        return tuple(_to_sql(getattr(deal, name), kind) for name, kind in self.columns)
+
+    def to_record(self, row: tuple):
+        return self.record(
+            **{
+                name: None if v is None else _KINDS[kind][2](v)
+                for (name, kind), v in zip(self.columns, row)
+            }
+        )
+
+
+SWAP = _Schema(
+    "swap_deal",
+    SwapDeal.from_record,
+    (
+        ("deal_id", "text"),
+        ("type", "text"),
+        ("product", "text"),
+        ("trade_date", "date"),
+        ("tenor", "text"),
+        ("bid_house", "text"),
+        ("bid_entity", "text"),
+        ("bid_trader", "text"),
+        ("offer_house", "text"),
+        ("offer_entity", "text"),
+        ("offer_trader", "text"),
+        ("margin", "real"),
+        ("amount", "int"),
+        ("near_rate", "real"),
+        ("far_rate", "real"),
+        ("bid_brokerage_fee", "int"),
+        ("bid_brokerage_currency", "text"),
+        ("offer_brokerage_fee", "int"),
+        ("offer_brokerage_currency", "text"),
+        ("confirmation_done", "bool"),
+        ("deal_time", "datetime"),
+        ("bid_switch", "bool"),
+        ("offer_switch", "bool"),
+        ("remark", "text"),
+    ),
+)
+
+SPOTMAR = _Schema(
+    "spotmar_deal",
+    SpotmarDeal.from_record,
+    (
+        ("deal_id", "text"),
+        ("product", "text"),
+        ("trade_date", "date"),
+        ("bid_house", "text"),
+        ("offer_house", "text"),
+        ("price", "real"),
+        ("amount", "real"),
+        ("rate", "real"),
+        ("value_date", "date"),
+        ("mar", "real"),
+        ("bid_brokerage_currency", "text"),
+        ("bid_brokerage_fee", "int"),
+        ("offer_brokerage_currency", "text"),
+        ("offer_brokerage_fee", "int"),
+        ("deal_time", "datetime"),
+        ("bid_switch", "bool"),
+        ("offer_switch", "bool"),
+        ("bid_trader", "text"),
+        ("offer_trader", "text"),
+        ("bid_their_to", "text"),
+        ("offer_their_to", "text"),
+    ),
+)
+
+
+@dataclass(frozen=True)
+class DealTable:
+    """the deals of one product in a `DealRepository`"""
+
+    repository: DealRepository
+    schema: _Schema
+
+    def upsert(self, deals: Iterable[Any], chunk_size: int = CHUNK_SIZE) -> int:
+        """
+        Inserts deals, replacing those already stored under the same deal id.
+        Every chunk of `chunk_size` deals is written in one transaction.
+
+        :return: number of deals written
+        """
+        sql = self.schema.upsert_sql()
+        count = 0
+        deals = iter(deals)
+        with self.repository.writing() as connection:
+            while chunk := list(islice(deals, chunk_size)):
+                with connection:
+                    connection.executemany(sql, map(self.schema.to_row, chunk))
+                count += len(chunk)
+        return count
+
+    def delete(self, deal_ids: Iterable[str]) -> int:
+        with self.repository.writing() as connection, connection:
+            cursor = connection.executemany(
+                f"DELETE FROM {self.schema.table} WHERE deal_id = ?",
+                ((i,) for i in deal_ids),
+            )
+        return cursor.rowcount
+
+    def __len__(self):
+        (count,) = self._execute(f"SELECT COUNT(*) FROM {self.schema.table}").fetchone()
+        return count
+
+    def get(self, deal_id: str):
+        row = self._execute(*self._select(deal_id=deal_id)).fetchone()
+        return self.schema.to_record(row) if row else None
+
+    def deals(
+        self, house: str = None, start: date = None, end: date = None
+    ) -> List[Any]:
+        """
+        :param house: deals where the house is on either side
+        :param start: first trade date, inclusive
+        :param end: last trade date, inclusive
+        :return: deals ordered by trade date and deal time
+        """
+        cursor = self._execute(*self._select(house=house, start=start, end=end))
+        return [self.schema.to_record(row) for row in cursor]
+
+    def batches(
+        self,
+        house: str = None,
+        start: date = None,
+        end: date = None,
+        size: int = CHUNK_SIZE,
+    ) -> Iterator[Dict[str, np.ndarray]]:
+        """`deals` as columnar batches of at most `size` deals, one array per field"""
+        cursor = self._execute(*self._select(house=house, start=start, end=end))
+        while rows := cursor.fetchmany(size):
+            yield {
+                name: _column(values, kind)
+                for (name, kind), values in zip(self.schema.columns, zip(*rows))
+            }
+
+    def brokerage(
+        self, house: str, start: date = None, end: date = None
+    ) -> Dict[str, int]:
+        """brokerage charged to `house` per currency, read off the house indexes"""
+        currency_to_fee: Dict[str, int] = {}
+        for side in ("bid", "offer"):
+            where, params = _period(start, end)
+            cursor = self._execute(
+                f"SELECT {side}_brokerage_currency, SUM({side}_brokerage_fee) "
+                f"FROM {self.schema.table} "
+                f"WHERE {side}_house = ? AND NOT {side}_switch{where} "
+                f"GROUP BY {side}_brokerage_currency",
+                (house.upper(), *params),
+            )
+            for currency, fee in cursor:
+                currency_to_fee[currency] = currency_to_fee.get(currency, 0) + fee
+        return currency_to_fee
+
+    def _select(
+        self,
+        deal_id: str = None,
+        house: str = None,
+        start: date = None,
+        end: date = None,
+    ) -> Tuple[str, tuple]:
+        t = self.schema.table
+        select = f"SELECT {', '.join(self.schema.names)} FROM {t}"
+        where, params = _period(start, end)
+        if deal_id is not None:
+            return f"{select} WHERE deal_id = ?", (deal_id,)
+        if house is not None:
+            # one branch per house index rather than an OR the planner may scan for
+            house = house.upper()
+            sql = (
+                f"{select} WHERE bid_house = ?{where} "
+                f"UNION {select} WHERE offer_house = ?{where}"
+            )
+            params = (house, *params, house, *params)
+        else:
+            sql = f"{select} WHERE 1{where}"
+        return f"{sql} ORDER BY trade_date, deal_time", params
+
+    def _execute(self, sql: str, params: tuple = ()) -> sqlite3.Cursor:
+        return self.repository.connection().execute(sql, params)
+
+
+@dataclass
+class DealRepository:
+    """
+    Swap and spotmar deals in a local SQLite file.
+
+    The file is in WAL mode so readers on other threads keep reading while deals
+    are booked. Every thread gets its own connection, writes are serialized.
+    """
+
+    path: str = DB_PATH
+    _local: threading.local = field(default_factory=threading.local, repr=False)
+    _write_lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def __post_init__(self):
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        connection = self.connection()
+        with connection:
+            for schema in (SWAP, SPOTMAR):
+                for statement in schema.ddl():
+                    connection.execute(statement)
+
+    @property
+    def swap(self) -> DealTable:
+        return DealTable(self, SWAP)
+
+    @property
+    def spotmar(self) -> DealTable:
+        return DealTable(self, SPOTMAR)
+
+    def connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path)
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute("PRAGMA synchronous = NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def writing(self) -> _Writing:
+        return _Writing(self)
+
+    def close(self) -> None:
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+
+@dataclass(frozen=True)
+class _Writing:
+    """holds the write lock and hands out this thread's connection"""
+
+    repository: DealRepository
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.repository._write_lock.acquire()
+        return self.repository.connection()
+
+    def __exit__(self, *exc) -> None:
+        self.repository._write_lock.release()
+
+
+_REPOSITORY: DealRepository | None = None
+
+
+def get_repository() -> DealRepository:
+    global _REPOSITORY
+    if _REPOSITORY is None:
+        _REPOSITORY = DealRepository()
+    return _REPOSITORY
+
+
+def _to_sql(v, kind: str):
+    return None if v is None else _KINDS[kind][1](v)
+
+
+def _period(start: date | None, end: date | None) -> Tuple[str, tuple]:
+    where, params = "", ()
+    if start is not None:
+        where, params = f"{where} AND trade_date >= ?", (*params, start.isoformat())
+    if end is not None:
+        where, params = f"{where} AND trade_date <= ?", (*params, end.isoformat())
+    return where, params
+
+
+def _column(values: tuple, kind: str) -> np.ndarray:
+    dtype = _KINDS[kind][3]
+    if kind == "bool":
+        return np.asarray(values, dtype=bool)
+    if kind in ("date", "datetime"):
+        return np.asarray([v if v is not None else "NaT" for v in values], dtype=dtype)
+    if kind in ("int", "real"):
+        return np.asarray([v if v is not None else 0 for v in values], dtype=dtype)
+    return np.asarray(values, dtype=dtype)
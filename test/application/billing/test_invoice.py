@@ -0,0 +1,60 @@
+from collections import defaultdict
+from datetime import date
+from types import SimpleNamespace
+
+from application.billing import invoice
+from utils import fileutils, numberutils
+
+
+def test_spotmar_log_invoices(tmp_path):
+    invoices = invoice.invoices(invoice.spotmar_log_charges())
+    expected = defaultdict(int)
+    for row in fileutils.read_csv_to_dicts(invoice.SPOTMAR_DEAL_LOG):
+        if row.get("date"):
+            for house, bro in ((row["buy"], "bid_bro"), (row["sell"], "offer_bro")):
+                expected[house.upper(), row["date"][:7]] += numberutils.to_int(
+                    row[bro].lstrip("*")
+                )
+    assert {(i.house, i.month): i.total for i in invoices} == dict(expected)
+    assert sum(i.deals + i.exempt for i in invoices) == 2 * 2_382
+
+    hana = next(i for i in invoices if (i.house, i.month) == ("HANA SEC", "2023-01"))
+    assert hana.product_to_amount == {invoice.SPOTMAR: hana.total}
+    assert "HOUSE: HANA SEC" in hana.to_document()
+    assert invoice.write_invoices(invoices, str(tmp_path)) == len(invoices)
+    assert (tmp_path / hana.file_name).read_text() == hana.to_document()
+
+
+def test_swap_deal_invoices():
+    def deal(trade_date, bid_switch, product="df"):
+        return SimpleNamespace(
+            trade_date=trade_date,
+            product=product,
+            bid_house="WOORI",
+            bid_entity="SL",
+            bid_switch=bid_switch,
+            bid_bro_fee=0 if bid_switch else 30_000,
+            bid_brokerage_currency="KRW",
+            offer_house="KB",
+            offer_entity="SL",
+            offer_switch=False,
+            offer_bro_fee=40,
+            offer_brokerage_currency="USD",
+        )
+
+    deals = (
+        deal(date(2024, 1, 29), False),
+        deal(date(2024, 1, 30), True),
+        deal(date(2024, 1, 31), False, "ndf"),
+        deal(date(2024, 2, 1), False),
+    )
+    invoices = invoice.invoices(invoice.swap_deal_charges(deals))
+    assert [
+        (i.house, i.month, i.currency, i.total, i.deals, i.exempt) for i in invoices
+    ] == [
+        ("KB SL", "2024-01", "USD", 120, 3, 0),
+        ("KB SL", "2024-02", "USD", 40, 1, 0),
+        ("WOORI SL", "2024-01", "KRW", 60_000, 2, 1),
+        ("WOORI SL", "2024-02", "KRW", 30_000, 1, 0),
+    ]
+    assert invoices[2].product_to_amount == {"DF": 30_000, "NDF": 30_000}
@@ -0,0 +1,84 @@
+from dataclasses import replace
+from datetime import date, timedelta
+
+import numpy as np
+
+from application.billing import simulator
+from application.spotmar.fee import Fee
+from application.swap.fee.structure import FeeStructure
+from application.trade.tenor import STANDARD_TENORS
+from utils import dateutils
+
+
+def test_spotmar_simulation():
+    history = simulator.SpotmarHistory.of_log()
+    assert len(history) == 2 * 2_382  # both sides of every dated row
+    assert history.simulate({}) == []
+
+    hana = history.houses == "HANA SEC"
+    deltas = history.simulate({"hana sec": Fee("hana sec", "krw", 7_000)})
+    assert {d.house for d in deltas} == {"HANA SEC"}
+    assert sum(d.baseline for d in deltas) == history.fees[hana].sum()
+    billed = hana & ~history.switches
+    assert (
+        sum(d.candidate for d in deltas) == np.rint(history.lots[billed] * 7_000).sum()
+    )
+
+    # the two sides agreed at 500,000 by hand keep that fee under any candidate
+    agreed = history.agreed != simulator._NOT_AGREED
+    assert history.agreed[agreed].tolist() == [500_000, 500_000]
+    meritz = (history.houses == "MERITZ") & ~history.switches
+    assert (meritz & agreed).sum() == 2
+    deltas = history.simulate({"meritz": Fee("meritz", "krw", 7_000)})
+    assert sum(d.candidate for d in deltas) == 1_000_000 + (
+        np.rint(history.lots[meritz & ~agreed] * 7_000).sum()
+    )
+
+
+def test_swap_simulation():
+    trade_dates = [
+        d
+        for d in (date(2023, 1, 2) + timedelta(days=i) for i in range(730))
+        if dateutils.is_working_day(d, "kr")
+    ]
+    n = 200_000
+    rng = np.random.default_rng(0)
+    houses = np.asarray(["woori sl", "kb sl", "ibk sl"])[rng.integers(0, 3, n)]
+    products = np.asarray(["df", "ndf"])[rng.integers(0, 2, n)]
+    tenors = np.asarray(STANDARD_TENORS[1:])[
+        rng.integers(0, len(STANDARD_TENORS) - 1, n)
+    ]
+    dates = np.asarray(trade_dates, dtype="datetime64[D]")[
+        rng.integers(0, len(trade_dates), n)
+    ]
+    switches = rng.random(n) < 0.05
+    history = simulator.SwapHistory.from_columns(
+        houses, products, tenors, dates, switches
+    )
+
+    candidate = FeeStructure.of(
+        "woori sl", "df", [2_000, 5_000, 10_000, 15_000], "usd", ["<1w", "<1m", "<=2m"]
+    )
+    deltas = history.simulate({("woori sl", "df"): candidate})
+    assert {(d.house, d.currency) for d in deltas} == {("WOORI SL", "USD")}
+    assert len(deltas) == 24  # months
+
+    rows = np.flatnonzero(
+        (houses == "woori sl")
+        & (products == "df")
+        & ~switches
+        & (dates.astype("datetime64[M]") == np.datetime64("2023-03"))
+    )
+    expected = sum(
+        candidate.calculate_fee(str(tenors[i]), dates[i].item())[0]
+        for i in rows.tolist()
+    )
+    assert next(d for d in deltas if d.month == "2023-03").candidate == expected
+
+    # a candidate billed in another currency does not relabel the baseline
+    baseline = sum(d.baseline for d in deltas)
+    deltas = history.simulate({("woori sl", "df"): replace(candidate, currency="KRW")})
+    assert len(deltas) == 48
+    assert sum(d.baseline for d in deltas if d.currency == "USD") == baseline
+    assert all(d.candidate == 0 for d in deltas if d.currency == "USD")
+    assert all(d.baseline == 0 for d in deltas if d.currency == "KRW")
@@ -0,0 +1,19 @@
+import pytest
+
+from application.swap.fee import repository
+from utils.intervalutils import EffectiveDated
+
+
+@pytest.fixture
+def fee_structures(monkeypatch):
+    """
+    An empty swap fee schedule for the test, restored afterwards. The fee sheets
+    count as read already, nothing is downloaded.
+
+    :return: `repository.add_fee_structure`, to register the structures under test
+    """
+    monkeypatch.setattr(repository, "_FEE_STRUCTURE_HISTORY", EffectiveDated())
+    monkeypatch.setattr(repository, "HOUSE_TO_FEE_STRUCTURE", {})
+    monkeypatch.setattr(repository, "_STRUCTURES_LOADED", True)
+    monkeypatch.setattr(repository, "_REGISTERED", [])
+    return repository.add_fee_structure
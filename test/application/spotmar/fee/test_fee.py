@@ -1,6 +1,39 @@
+from datetime import date
+
 from application import spotmar
+from application.spotmar.fee import repository
+from utils.intervalutils import EffectiveDated
 
 
 def test_fee():
     fee = spotmar.get_fee("anz sl")
     print(fee)
+
+
+def test_effective_dated_fee(monkeypatch):
+    monkeypatch.setattr(repository, "_FEE_HISTORY", EffectiveDated())
+    monkeypatch.setattr(repository, "_NAME_TO_FEE", {})
+    repository._add_fees(
+        repository.row_to_fee(row)
+        for row in [
+            {"house": "anz sl", "currency": "krw", "amount": "5,000"},
+            {
+                "house": "anz sl",
+                "currency": "krw",
+                "amount": "6,000",
+                "effective_from": "2023-07-01",
+            },
+        ]
+    )
+    assert spotmar.get_fee("anz sl").amount == 6_000
+    assert spotmar.get_fee("ANZ SL", date(2023, 6, 30)).amount == 5_000
+    assert spotmar.get_fee("bony sl", date(2023, 6, 30)).house == "DEFAULT"
+    fees = spotmar.fee.get_fees(
+        ["anz sl", "anz sl", "bony sl"],
+        [date(2023, 1, 2), date(2023, 7, 3), date(2023, 7, 3)],
+    )
+    assert [(f.house, f.amount) for f in fees] == [
+        ("ANZ SL", 5_000),
+        ("ANZ SL", 6_000),
+        ("DEFAULT", 6_000),
+    ]
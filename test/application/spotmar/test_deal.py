@@ -0,0 +1,34 @@
+from datetime import date, datetime
+
+from adapter.google import sheets
+from application.spotmar import deal, fee
+from utils import stringutils
+
+
+def test_daily_sync(monkeypatch):
+    # rows as the "spotmar daily" sheet returns them, blank trailing cells dropped
+    rows = [
+        ["DPRH", "BID", "OFFER", "PX", "Q", "RATE", "M.A.R", "TIME", "SWITCH"],
+        ["2024-02-08", "jpmc", "ing", "0", "14", "1300", "1300", "9:01", "bid"],
+        ["2024-02-08", "ing", "jpmc", "5", "21", "1300.05", "1300", "9:08"],
+    ]
+    monkeypatch.setattr(sheets, "get_rows", lambda sheet_name, _range: rows)
+    monkeypatch.setattr(deal, "_DAILY_SYNC", None)
+    for nickname in ("jpmc", "ing"):
+        trader = {"symbol": f"{nickname} sl", "house": nickname, "entity": "sl"}
+        monkeypatch.setitem(stringutils._NICKNAME_TO_TRADER, nickname, trader)
+
+    result = deal.daily_sync().poll()
+
+    assert result.added == [2, 3] and not result.failed
+    first, second = deal.daily_sync().deals
+    assert first.trade_date == date(2024, 2, 8)
+    assert first.deal_time == datetime(2024, 2, 8, 9, 1)
+    assert (first.bid_house, first.offer_house) == ("JPMC SL", "ING SL")
+    assert first.bid_switch and not first.offer_switch
+    assert first.amount == 14
+    assert (
+        first.offer_brokerage_fee == 14 * fee.get_fee("ING SL", date(2024, 2, 8)).amount
+    )
+    assert second.deal_time == datetime(2024, 2, 8, 9, 8)
+    assert not (second.bid_switch or second.offer_switch)
@@ -1,6 +1,145 @@
-from application.swap.fee import fee
+from datetime import date, timedelta
+
+import numpy as np
+
+from application.swap.fee import fee, repository
+from application.swap.fee.structure import FeeStructure
+from application.trade.tenor import STANDARD_TENORS
+from utils import dateutils
+from utils.intervalutils import EffectiveDated
 
 
 def test_calculate_fee():
     df_fee = fee.calculate_fee("woori sl", "df", "1m", 1)
     print(df_fee)
+
+
+def test_calculate_fees(fee_structures):
+    woori = FeeStructure.of(
+        "woori sl", "df", [1_000, 5_000, 10_000, 15_000], "krw", ["<1w", "<1m", "<=2m"]
+    )
+    fee_structures(woori, effective_from=date(2024, 1, 15))
+    trade_dates = [
+        d
+        for d in (date(2024, 1, 2) + timedelta(days=i) for i in range(60))
+        if dateutils.is_working_day(d, "kr")
+    ]
+    symbols = [*STANDARD_TENORS[1:], "imm", "2024-06-14"]
+    rows = [
+        (house, product, symbol, trade_date)
+        for house in ("woori sl", "default")
+        for product in ("df", "ndf")
+        for symbol in symbols
+        for trade_date in trade_dates[::7]
+    ]
+    assert fee.calculate_fee("woori sl", "df", "1m", date(2024, 1, 12)) == (
+        fee.DEFAULT_FEE_STRUCTURE.calculate_fee("1m", date(2024, 1, 12))
+    )
+    assert fee.calculate_fee("woori sl", "df", "1m", date(2024, 1, 15))[1] == "KRW"
+    fees, currencies = fee.calculate_fees(*zip(*rows))
+    assert [(f, c) for f, c in zip(fees.tolist(), currencies)] == [
+        fee.calculate_fee(*row) for row in rows
+    ]
+
+    n = 100_000
+    rng = np.random.default_rng(0)
+    columns = [
+        np.asarray(["woori sl", "default"])[rng.integers(0, 2, n)],
+        np.full(n, "df"),
+        np.asarray(STANDARD_TENORS[1:])[rng.integers(0, len(STANDARD_TENORS) - 1, n)],
+        np.asarray(trade_dates, dtype="datetime64[D]")[
+            rng.integers(0, len(trade_dates), n)
+        ],
+    ]
+    fees, currencies = fee.calculate_fees(*columns)
+    sample = range(0, n, 997)
+    assert [(fees[i].item(), currencies[i]) for i in sample] == [
+        fee.calculate_fee(*(c[i].item() for c in columns)) for i in sample
+    ]
+
+
+def test_fee_cache(fee_structures):
+    fee.configure_fee_cache(maxsize=2)
+    try:
+        trade_date = date(2024, 1, 29)
+        assert fee.calculate_fee("woori sl", "df", "1m", trade_date) == (
+            fee.DEFAULT_FEE_STRUCTURE.calculate_fee("1m", trade_date)
+        )
+        fee.calculate_fee("WOORI SL", "DF", "1m", trade_date)
+        info = fee.fee_cache_info()
+        assert (info.hits, info.misses, info.maxsize) == (1, 1, 2)
+
+        woori = FeeStructure.of("woori sl", "df", [1_000, 5_000], "krw", ["<1w"])
+        fee_structures(woori)
+        assert fee.calculate_fee("woori sl", "df", "1m", trade_date) == (
+            woori.calculate_fee("1m", trade_date)
+        )
+        dateutils.reload_calendar("kr")
+        fee.calculate_fee("woori sl", "df", "1m", trade_date)
+        assert fee.fee_cache_info().misses == 3
+    finally:
+        fee.configure_fee_cache()
+
+
+def test_reload_fee_structures(monkeypatch):
+    rate = repository.Fee(
+        house="WOORI SL",
+        product="DF",
+        currency="KRW",
+        fpm=0,
+        mp1=0,
+        ppd1=1_000,
+        b1="<1w",
+        ppd2=5_000,
+        b2="<1m",
+        ppd3=10_000,
+        b3="<=2m",
+        ppd4=15_000,
+    )
+    rates = EffectiveDated()
+    rates.add(("WOORI SL", "DF"), rate)
+    monkeypatch.setattr(repository, "_read_fee_rates", lambda: rates)
+    for name in (
+        "_NAME_TO_FEE_RATE",
+        "HOUSE_TO_FEE_STRUCTURE",
+        "_FEE_RATE_HISTORY",
+        "_FEE_STRUCTURE_HISTORY",
+        "_RATES_LOADED",
+        "_STRUCTURES_LOADED",
+        "_REGISTERED",
+    ):
+        monkeypatch.setattr(repository, name, getattr(repository, name))
+    before = repository.HOUSE_TO_FEE_STRUCTURE
+    unchanged = dict(before)
+
+    assert repository.reload_fee_structures() == repository.fee_schedule_version()
+    # a reader still holding the old map sees it whole
+    assert before == unchanged and before is not repository.HOUSE_TO_FEE_STRUCTURE
+    assert repository.get_name_to_fee_rate() == {("WOORI SL", "DF"): rate}
+    assert repository.get_fee_structure("woori sl", "df") is (
+        repository.HOUSE_TO_FEE_STRUCTURE[("WOORI SL", "DF")]
+    )
+
+    # a negotiated rate registered next to the sheets survives the next reload
+    monkeypatch.setattr(repository, "_REGISTERED", [])
+    kb = FeeStructure.of("kb sl", "df", [2_000, 6_000], "krw", ["<1w"])
+    repository.add_fee_structure(kb, date(2024, 1, 1))
+    repository.reload_fee_structures()
+    assert repository.get_fee_structure("kb sl", "df") is kb
+    assert repository.get_name_to_fee_structure()[("KB SL", "DF")] is kb
+    assert repository.get_fee_rate("woori sl", "df") == rate
+
+
+def test_add_fee_structure(fee_structures, monkeypatch):
+    def read_fee_rates():
+        raise AssertionError("the fee sheets are not read again")
+
+    monkeypatch.setattr(repository, "_read_fee_rates", read_fee_rates)
+    # neither is in force today, the schedule of today stays empty
+    woori = FeeStructure.of("woori sl", "df", [1_000, 5_000], "krw", ["<1w"])
+    kb = FeeStructure.of("kb sl", "df", [2_000, 6_000], "krw", ["<1w"])
+    fee_structures(woori, date(2024, 1, 1), date(2024, 2, 1))
+    fee_structures(kb, date(2024, 1, 1), date(2024, 2, 1))
+    assert repository.HOUSE_TO_FEE_STRUCTURE == {}
+    assert repository.get_fee_structure("woori sl", "df", date(2024, 1, 15)) is woori
+    assert repository.get_fee_structure("kb sl", "df", date(2024, 1, 15)) is kb
@@ -1,4 +1,9 @@
+import operator
+from datetime import date
+
 from application.swap import fee
+from application.swap.fee.structure import FeeStructure
+from application.trade import tenor as tnr
 
 
 def test_calculate_fee():
@@ -38,3 +43,43 @@ def test_calculate_fee():
     bro_fee, currency = fee.get_fee(house, "5d", 6)
     assert bro_fee == 5_000
     assert currency == "KRW"
+
+
+def test_compiled_fee_structure():
+    def scanned(fs: FeeStructure, tenor: str, trade_date: date):
+        # the per-call scan the compiled lookup replaces
+        days = tnr.count_days(tenor, trade_date)
+        for boundary, rate, op in zip(fs.boundaries, fs.rates, fs.operators):
+            if op(tnr.to_days(tenor), boundary.days):
+                fee = rate * days
+                if rate == fs.rates[0] and fs.first_range_max:
+                    return min(fee, fs.first_range_max), fs.currency
+                return fee, fs.currency
+        return fs.rates[-1] * days, fs.currency
+
+    structures = [
+        FeeStructure.of("a", "df", [1, 5, 15, 20], "usd", ["<1w", "<1m", "<=1y"]),
+        FeeStructure.of(
+            "b",
+            "ndf",
+            ["1,000", "1,000", "3,000", "5,000"],
+            "krw",
+            ["<=1w", "<1m", "<1y"],
+            first_range_max="5,000",
+        ),
+        FeeStructure.of("c", "df", [3, 2, 1], "usd", [">=1y", ">1m"]),
+    ]
+    assert structures[1].rates == [1_000, 1_000, 3_000, 5_000]
+    assert structures[2].operators == [operator.ge, operator.gt]
+    trade_date = date(2024, 1, 29)
+    for fs in structures:
+        for symbol in tnr.STANDARD_TENORS:
+            assert fs.calculate_fee(symbol, trade_date) == scanned(
+                fs, symbol, trade_date
+            ), (fs.house, symbol)
+
+    fixed = FeeStructure.of("d", "df", [1, 2], "usd", ["<1m"], fixed_rate="5,000")
+    assert fixed.calculate_fee("1y", trade_date) == (5_000, "USD")
+    assert FeeStructure.of("e", "df", [], "usd", []).calculate_fee(
+        "1y", trade_date
+    ) == (0, "USD")
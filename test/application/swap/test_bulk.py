@@ -0,0 +1,66 @@
+from datetime import date, datetime, timedelta
+
+from application.swap import Deal, bulk
+from application.swap.fee.structure import FeeStructure
+from utils import dateutils, stringutils
+
+
+def _rows(n):
+    days = [
+        d
+        for d in (date(2024, 1, 2) + timedelta(days=i) for i in range(90))
+        if dateutils.is_working_day(d, "kr")
+    ]
+    tenors = ["on", "tn", "1w", "1m", "3m", "6m", "1y"]
+    return [
+        dict(
+            tenor=tenors[i % len(tenors)],
+            bid_nickname="kbs",
+            offer_nickname="woori",
+            margin=i % 3,
+            amount=50,
+            near_rate=1300.5,
+            far_rate=1299.2,
+            deal_datetime=datetime.combine(days[i % len(days)], datetime.min.time()),
+            confirmation_done=False,
+            bid_switch=i % 5 == 0,
+        )
+        for i in range(n)
+    ]
+
+
+def test_of_many(monkeypatch, fee_structures):
+    fee_structures(
+        FeeStructure.of(
+            "woori sl", "df", [1_000, 5_000, 10_000], "krw", ["<1w", "<=1m"]
+        )
+    )
+    for nickname, house in (("kbs", "kb"), ("woori", "woori")):
+        trader = {"symbol": f"{house} sl", "house": house, "entity": "sl", "trader": ""}
+        monkeypatch.setitem(stringutils._NICKNAME_TO_TRADER, nickname, trader)
+    monkeypatch.setattr(bulk, "_MIN_PARALLEL", 0)
+    rows = _rows(3_000)
+
+    expected = [Deal.of(**row) for row in rows]
+    parallel = bulk.of_many(rows, workers=2, chunk_size=500)
+
+    assert "_tenor" not in parallel[0].__dict__  # not rebuilt in this process
+    fields = [f for f in bulk._FIELDS if f != "deal_id"]
+    assert [[getattr(d, f) for f in fields] for d in parallel] == [
+        [getattr(d, f) for f in fields] for d in expected
+    ]
+    assert [(d.spot_date, d.first_leg, d.second_leg) for d in parallel] == [
+        (d.spot_date, d.first_leg, d.second_leg) for d in expected
+    ]
+    assert len({d.deal_id for d in parallel}) == len(rows)
+    assert parallel[0].offer_house == "WOORI"
+    assert parallel[3].offer_brokerage_currency == "KRW"
+
+
+def test_reference_data_round_trip():
+    reference = bulk.ReferenceData.capture()
+    version = dateutils.calendar_version()
+    reference.install()
+    assert dateutils.calendar_version() > version
+    assert dateutils.snapshot_calendars() == reference.calendars
+    assert dateutils.is_holiday(date(2024, 2, 9), "kr")
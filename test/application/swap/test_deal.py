@@ -1,6 +1,11 @@
+from datetime import date, datetime
+
 from more_itertools import consume
 
 from application.swap import deal
+from application.swap.fee.structure import FeeStructure
+from application.trade.tenor import TenorStatus
+from utils import stringutils
 
 
 def test_get_deals():
@@ -8,3 +13,59 @@ def test_get_deals():
     print(deals)
     assert 0 < len(deals)
     consume(print(d) for d in deals)
+
+
+def test_split_rows():
+    rows = [
+        {"TENOR": "1m", "DEAL_TIME": datetime(2024, 7, 4, 9)},
+        {"TENOR": "on", "DEAL_TIME": datetime(2024, 7, 4, 9)},
+        {"TENOR": "1m", "DEAL_TIME": datetime(2024, 9, 16, 9)},
+        {"TENOR": "5x", "DEAL_TIME": datetime(2024, 7, 4, 9)},
+        {"TENOR": "1m*3m", "DEAL_TIME": datetime(2024, 7, 5, 9)},
+    ]
+    valid, rejected = deal.split_rows(rows)
+    assert valid == [rows[0], rows[4]]
+    assert [(row, result.status) for row, result in rejected] == [
+        (rows[1], TenorStatus.US_HOLIDAY),
+        (rows[2], TenorStatus.HOLIDAY_TRADE_DATE),
+        (rows[3], TenorStatus.UNKNOWN_SYMBOL),
+    ]
+    # rows read off the sheet carry the deal time as text
+    rows = [
+        {"TENOR": "1m", "DEAL_TIME": "2024-07-04 09:00:00"},
+        {"TENOR": "1m", "DEAL_TIME": "29/01/2024 9:00"},
+        {"TENOR": "1m", "DEAL_TIME": "2024-09-16 09:00:00"},
+    ]
+    valid, rejected = deal.split_rows(rows)
+    assert valid == rows[:1]
+    assert [(row, result.status) for row, result in rejected] == [
+        (rows[1], TenorStatus.INVALID_TRADE_DATE),
+        (rows[2], TenorStatus.HOLIDAY_TRADE_DATE),
+    ]
+
+
+def test_switched_sides_are_not_charged(monkeypatch, fee_structures):
+    for nickname in ("woori", "kb"):
+        trader = {"symbol": f"{nickname} sl", "house": nickname, "entity": "sl"}
+        monkeypatch.setitem(stringutils._NICKNAME_TO_TRADER, nickname, trader)
+    woori = FeeStructure.of("woori sl", "df", [1_000, 5_000], "krw", ["<1w"])
+    fee_structures(woori)
+
+    d = deal.Deal.of(
+        tenor="1m",
+        bid_nickname="woori",
+        offer_nickname="kb",
+        margin=0,
+        amount=10,
+        near_rate=1.0,
+        far_rate=1.5,
+        deal_datetime=datetime(2024, 7, 4, 9),
+        confirmation_done=False,
+        bid_switch=True,
+    )
+    assert (d.bid_brokerage_fee, d.bid_bro_fee) == (0, 0)
+    assert d.bid_brokerage_currency == "KRW"
+    assert d.offer_brokerage_fee == d.offer_bro_fee > 0
+    assert d.brokerage_fee("WOORI") == 0
+    # not for want of a fee, woori would pay one
+    assert woori.calculate_fee("1m", date(2024, 7, 4))[0] > 0
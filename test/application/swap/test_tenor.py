@@ -3,10 +3,15 @@ import time
 from datetime import timedelta, date
 from typing import List
 
+import numpy as np
+import pytest
 from dateutil.relativedelta import relativedelta
 from more_itertools import consume
 
 from application.swap import Tenor, Leg
+from application.trade import tenor as tnr
+from application.trade.exception import InvalidTenorDateException
+from application.trade.tenor import STANDARD_TENORS, TenorGrid, TenorStatus
 from utils import dateutils
 
 
@@ -452,3 +457,234 @@ def write_tenors_to_csv(tenors: List[Tenor], filename: str):
 def flatten_leg(leg: Leg):
     # Extract the desired attributes from a Leg
     return [leg.symbol, leg.value, leg.fixing, leg.mar]
+
+
+def test_long_tenor_days():
+    trade_date = date(2024, 1, 29)
+    tenor = Tenor("10y", trade_date)
+    assert tenor.days == dateutils._count_working_days(
+        tenor.near_date, tenor.far_date, "kr"
+    )
+
+
+def test_tenor_functions_take_calendars():
+    kr = dateutils.get_calendar("kr")
+    us = dateutils.get_calendar("us")
+    trade_date = date(2024, 8, 14)
+    assert tnr.spot(trade_date, kr, us) == tnr.spot(trade_date)
+    assert tnr.fixing(date(2024, 9, 3), kr) == date(2024, 9, 2)
+    assert tnr.month(date(2024, 2, 29), 1, True, dateutils.get_calendar()) == date(
+        2024, 3, 29
+    )
+
+
+def test_tenor_schedule_cache():
+    tnr.configure_schedule_cache(maxsize=2)
+    try:
+        trade_date = date(2024, 1, 29)
+        first = Tenor("1y", trade_date)
+        second = Tenor("1y", trade_date)
+        assert first.schedule is second.schedule
+        assert first.far is second.far
+        info = tnr.schedule_cache_info()
+        assert (info.hits, info.misses, info.maxsize) == (1, 1, 2)
+
+        Tenor("1m", trade_date)
+        Tenor("2m", trade_date)
+        Tenor("1y", trade_date)
+        assert tnr.schedule_cache_info().misses == 4  # 1y was evicted
+
+        dateutils.reload_calendar("kr")
+        assert Tenor("1y", trade_date).schedule is not first.schedule
+        assert Tenor("1y", trade_date).schedule == first.schedule
+    finally:
+        tnr.configure_schedule_cache()
+
+
+def test_tenor_grid():
+    trade_date = date(2024, 1, 29)
+    grid = TenorGrid.for_trade_date(trade_date)
+    assert TenorGrid.for_trade_date(trade_date) is grid
+    assert len(grid) == len(STANDARD_TENORS)
+    assert grid.spot == date(2024, 1, 31)
+    for symbol in STANDARD_TENORS:
+        tenor = Tenor(symbol, trade_date)
+        row = grid.row(symbol)
+        assert row["near_date"] == tenor.near_date
+        assert row["far_date"] == tenor.far_date
+        assert row["fixing_date"] == tenor.fixing_date
+        assert row["mar_date"] == tenor.mar_date
+        assert row["days"] == tenor.days
+    assert grid.row("1y")["far_date"] == date(2025, 1, 31)
+
+
+def test_parse_tenor():
+    assert tnr.parse("1M") is tnr.parse("1m")
+    assert tnr.parse(" o/n ") is tnr.parse("o/n")
+    assert tnr.parse("o/n").far.kind == tnr.parse("on").far.kind == "on"
+    assert tnr.parse("1wk").days == tnr.parse("1w").days == 7
+    assert tnr.parse("1Y").days == 365
+    spread = tnr.parse("1m*3m")
+    assert (spread.near.n, spread.near.kind, spread.far.n, spread.far.kind) == (
+        1,
+        "m",
+        3,
+        "m",
+    )
+    forward_forward = tnr.parse("1m3m")
+    assert (forward_forward.near_symbol, forward_forward.far_symbol) == ("1m", "3m")
+    assert tnr.parse("5d").far.kind is None
+    assert tnr.to_days("5d") == 1
+
+
+def test_tenor_spreads():
+    trade_date = date(2023, 6, 28)
+    spread = Tenor("1m*3m", trade_date)
+    forward_forward = Tenor("1m3m", trade_date)
+    assert spread.product == forward_forward.product == "ndf"
+    assert spread.near_date == forward_forward.near_date == date(2023, 7, 31)
+    assert spread.far_date == forward_forward.far_date == date(2023, 10, 31)
+    assert Tenor("1M", trade_date).far_date == Tenor("1m", trade_date).far_date
+
+
+def test_fixing_table():
+    table = tnr.fixing_table()
+    assert tnr.fixing_table() is table
+    kr = dateutils.get_calendar("kr")
+    assert table.first == kr.first
+    for i in range(0, len(table), 7):
+        value = table.first + timedelta(days=i)
+        fixing_date = tnr.fixing(value)
+        assert table.lookup(value) == (fixing_date, tnr.mar(fixing_date))
+    beyond = kr.last + timedelta(days=40)
+    assert table.lookup(beyond) == (tnr.fixing(beyond), tnr.mar(tnr.fixing(beyond)))
+
+    values = [date(2024, 9, 3), date(2024, 9, 19), beyond]
+    fixings, mars = tnr.fixing_schedule(values)
+    assert fixings.tolist() == [table.lookup(v)[0] for v in values]
+    assert mars.tolist() == [table.lookup(v)[1] for v in values]
+
+    trade_date = date(2024, 1, 29)
+    far = Tenor("3m", trade_date).far
+    assert (far.fixing, far.mar) == (
+        tnr.fixing(far.value),
+        tnr.mar(tnr.fixing(far.value)),
+    )
+
+    far_dates = [Tenor(s, trade_date).far_date for s in tnr.STANDARD_TENORS[4:]]
+    book = np.resize(np.asarray(far_dates, dtype="datetime64[D]"), 1_000_000)
+    fixings, mars = tnr.fixing_schedule(book)
+    assert fixings[: len(far_dates)].tolist() == [tnr.fixing(d) for d in far_dates]
+    assert mars[: len(far_dates)].tolist() == [
+        tnr.mar(tnr.fixing(d)) for d in far_dates
+    ]
+
+
+def test_tenor_book():
+    trade_dates = [
+        d
+        for d in (date(2024, 1, 2) + timedelta(days=i) for i in range(366))
+        if dateutils.is_working_day(d, "kr")
+    ]
+    symbols = tnr.STANDARD_TENORS[1:]
+    tenors = [
+        Tenor(s, trade_dates[i % len(trade_dates)]) for i, s in enumerate(symbols * 4)
+    ]
+    book = tnr.TenorBook.of(tenors)
+    assert len(book) == len(tenors)
+    for i, t in enumerate(tenors):
+        assert book.symbol(i) == t.symbol
+        assert book.trade_date(i) == t.trade
+        assert book.near_date(i) == t.near_date
+        assert book.far_date(i) == t.far_date
+        assert book.vfm_dates(i) == t.far.vfm_dates
+        assert book.tenor(i).schedule is t.schedule
+    fixings, mars = book.fixing_schedule()
+    assert fixings.tolist() == [t.fixing_date for t in tenors]
+    assert mars.tolist() == [t.mar_date for t in tenors]
+
+    n = 1_000_000
+    rng = np.random.default_rng(0)
+    deal_symbols = np.asarray(symbols)[rng.integers(0, len(symbols), n)]
+    deal_trades = np.asarray(trade_dates, dtype="datetime64[D]")[
+        rng.integers(0, len(trade_dates), n)
+    ]
+    synthetic = tnr.TenorBook.from_columns(deal_symbols, deal_trades)
+    assert len(synthetic) == n and synthetic.nbytes == 4 * 4 * n
+    assert (
+        synthetic.far_date(0)
+        == Tenor(str(deal_symbols[0]), synthetic.trade_date(0)).far_date
+    )
+
+
+def test_try_build():
+    built = Tenor.try_build("1m", date(2024, 7, 4))
+    assert built.ok and built.tenor.far_date == Tenor("1m", date(2024, 7, 4)).far_date
+    statuses = [
+        r.status
+        for r in tnr.try_build_many(
+            [
+                ("1m", date(2024, 9, 16)),
+                ("1q", date(2024, 7, 3)),
+                ("on", date(2024, 7, 4)),
+                ("tn", date(2024, 7, 3)),
+                ("on*1m", date(2024, 7, 4)),
+                ("tn", date(2024, 7, 4)),
+            ]
+        )
+    ]
+    assert statuses == [
+        TenorStatus.HOLIDAY_TRADE_DATE,
+        TenorStatus.UNKNOWN_SYMBOL,
+        TenorStatus.US_HOLIDAY,
+        TenorStatus.US_HOLIDAY,
+        TenorStatus.US_HOLIDAY,
+        TenorStatus.OK,
+    ]
+
+
+def test_imm_and_broken_dates():
+    assert tnr.imm(date(2024, 1, 31)) == date(2024, 3, 20)
+    assert tnr.imm(date(2024, 3, 20)) == tnr.imm(date(2024, 3, 19), 2)
+    assert tnr.imm(date(2024, 3, 20), 1, "kr") == date(2024, 6, 19)
+    assert tnr.imm(date(2024, 3, 20), 1, "us") == date(2024, 6, 20)  # juneteenth
+    beyond = dateutils.get_calendar().last + timedelta(days=1)
+    # past the precomputed table, no holidays are known
+    assert tnr.imm(beyond, 4) == tnr._third_wednesday(beyond.year, 12)
+
+    trade_date = date(2024, 1, 29)
+    outright = Tenor("imm", trade_date)
+    assert (outright.near_date, outright.far_date) == (outright.spot, date(2024, 3, 20))
+    spread = Tenor("imm*2imm", trade_date)
+    assert (spread.near_date, spread.far_date) == (date(2024, 3, 20), date(2024, 9, 19))
+    assert spread.product == "ndf"
+    # the imm date before spot, the far leg would settle before the near leg
+    assert Tenor.try_build("0imm", trade_date).status is TenorStatus.INVERTED_LEGS
+    with pytest.raises(InvalidTenorDateException):
+        Tenor("0imm", trade_date)
+
+    broken = Tenor("2024-03-15", trade_date)
+    assert (broken.near_date, broken.far_date) == (broken.spot, date(2024, 3, 15))
+    assert broken.fixing_date == tnr.fixing(date(2024, 3, 15))
+    assert tnr.period_days("2024-03-15", trade_date) == 44
+    assert tnr.custom(date(2024, 2, 15), date(2024, 3, 15)) == (
+        date(2024, 2, 15),
+        date(2024, 3, 15),
+    )
+    assert [
+        r.status
+        for r in tnr.try_build_many(
+            [
+                ("2024-03-16", trade_date),
+                ("2024-01-30", trade_date),
+                ("2024-02-30", trade_date),
+                # a near leg on or before spot, the far leg alone is fine
+                ("2024-01-30*2024-03-15", trade_date),
+            ]
+        )
+    ] == [
+        TenorStatus.INVALID_BROKEN_DATE,
+        TenorStatus.INVALID_BROKEN_DATE,
+        TenorStatus.UNKNOWN_SYMBOL,
+        TenorStatus.INVALID_BROKEN_DATE,
+    ]
@@ -0,0 +1,49 @@
+from datetime import date
+
+from application.swap import fee
+from application.swap.fee.structure import FeeStructure
+from application.trade import session
+from application.trade.tenor import STANDARD_TENORS, Tenor
+from utils import dateutils
+
+
+def test_warm_up(fee_structures):
+    woori = FeeStructure.of(
+        house="woori sl",
+        product="df",
+        rates=[1_000, 5_000, 10_000],
+        currency="krw",
+        boundaries=["<1w", "<=1m"],
+    )
+    fee_structures(woori)
+    trade_date = date(2024, 1, 29)
+
+    s = session.warm_up(trade_date)
+
+    assert s.spot_date == Tenor("spot", trade_date).spot == date(2024, 1, 31)
+    assert s.spotmar_spot_date == date(2024, 1, 31)
+    assert session.warm_up(date(2024, 7, 3)).spotmar_spot_date == date(2024, 7, 5)
+    assert s.value_date("1y") == date(2025, 1, 31)
+    assert s.fee_structures[("WOORI SL", "DF")] is woori
+    assert len(s.grid) == len(STANDARD_TENORS)
+    assert s.fee("woori sl", "df", "1m") == woori.calculate_fee("1m", trade_date)
+    assert s.fee("default", "swap", "1y") == (15 * Tenor("1y", trade_date).days, "USD")
+
+    hits = fee.fee_cache_info().hits
+    assert fee.calculate_fee("woori sl", "df", "1M", trade_date) == s.fee(
+        "woori sl", "df", "1m"
+    )
+    assert fee.fee_cache_info().hits == hits + 1
+
+
+def test_trade_date_rolls_over_holidays():
+    # 2024-02-09 ~ 2024-02-12 is SEOLLAL
+    assert session.trade_date_of(date(2024, 2, 9)) == date(2024, 2, 13)
+    assert session.trade_date_of(date(2024, 2, 8)) == date(2024, 2, 8)
+
+
+def test_current_session_is_published_once():
+    published = session.current()
+    assert session.current() is published
+    dateutils.reload_calendar("kr")
+    assert session.current() is not published
@@ -0,0 +1,116 @@
+import re
+
+from adapter.google import sheets
+from application.trade.sheet_sync import SheetSync
+
+
+class _Sheet:
+    def __init__(self, rows):
+        self.rows = rows
+        self.ranges = []
+
+    def get_rows(self, sheet_name, _range):
+        self.ranges.append(_range)
+        first = re.match(r"A(\d*):", _range).group(1)
+        return [list(r) for r in self.rows[int(first or 1) - 1 :]]
+
+
+def _build(row):
+    if row["AMT"] == "x":
+        raise ValueError(row["AMT"])
+    return row["TENOR"], int(row["AMT"])
+
+
+def test_poll_rebuilds_only_new_and_edited_rows(monkeypatch):
+    sheet = _Sheet([["TENOR", "AMT"], ["1m", "10"], ["3m", "20"], ["", ""]])
+    monkeypatch.setattr(sheets, "get_rows", sheet.get_rows)
+    built = []
+    sync = SheetSync("swap daily", "A:N", lambda r: built.append(r) or _build(r), 1)
+
+    result = sync.poll()
+    assert result.added == [2, 3] and sync.cursor == 3
+    assert sync.deals == [("1m", 10), ("3m", 20)]
+
+    sheet.rows[3:] = [["6m", "30"], ["1y", "x"]]  # typed into the blank row
+    sheet.rows[2] = ["3m", "25"]
+    built.clear()
+    result = sync.poll()
+    assert sheet.ranges[-1] == "A2:N"  # one row of overlap and the row above it
+    assert (result.added, result.changed) == ([4, 5], [3])
+    assert list(result.failed) == [5]
+    assert [r["TENOR"] for r in built] == ["3m", "6m", "1y"]
+    assert sync.deals == [("1m", 10), ("3m", 25), ("6m", 30)]
+
+    sheet.rows[-1] = ["1y", "40"]
+    assert sync.poll().changed == [5]
+    assert not sync.poll()
+
+    sheet.rows[1] = ["2m", "15"]  # above the overlap
+    assert not sync.poll()
+    assert sync.resync().changed == [2]
+
+    del sheet.rows[-2:]
+    assert sync.poll().removed == [4, 5]
+    assert sync.deals == [("2m", 15), ("3m", 25)]
+
+
+def test_polling_a_long_sheet(monkeypatch):
+    rows = [["TENOR", "AMT"]] + [["1m", str(i)] for i in range(20_000)]
+    sheet = _Sheet(rows)
+    monkeypatch.setattr(sheets, "get_rows", sheet.get_rows)
+    sync = SheetSync("swap daily", "A:N", _build)
+
+    sync.poll()
+    rows.append(["3m", "1"])
+    result = sync.poll()
+    assert result.added == [20_002] and len(sync.deals) == 20_001
+    # only the overlap window and the row above it are downloaded again
+    assert sheet.ranges[-1] == "A19981:N"
+
+
+class _Deal:
+    def __init__(self, row):
+        self.tenor, self.amount = _build(row)
+        self.deal_id = "new"
+
+
+def test_poll_resyncs_when_rows_move(monkeypatch):
+    rows = [["TENOR", "AMT"]] + [["1m", str(i)] for i in range(10)]
+    sheet = _Sheet(rows)
+    monkeypatch.setattr(sheets, "get_rows", sheet.get_rows)
+    sync = SheetSync("swap daily", "A:N", _Deal, overlap=3)
+    sync.poll()
+    ids = {d.amount: d.deal_id for d in sync.deals}
+    assert len(set(ids.values())) == 10 and "new" not in ids.values()
+
+    del rows[2]  # above the window, every row below moves up one
+    result = sync.poll()
+    assert sheet.ranges[-1] == "A:N"
+    assert [d.amount for d in sync.deals] == [0, *range(2, 10)]
+    assert result.removed == [11]
+    # rows rebuilt by the resync keep the deal ids they were first given
+    assert all(d.deal_id == ids[d.amount] for d in sync.deals)
+
+
+def test_deal_ids_survive_edits(monkeypatch):
+    rows = [["TENOR", "AMT"], ["1m", "1"], ["1m", "1"], ["3m", "2"]]
+    sheet = _Sheet(rows)
+    monkeypatch.setattr(sheets, "get_rows", sheet.get_rows)
+    sync = SheetSync("swap daily", "A:N", _Deal)
+    sync.poll()
+    ids = [d.deal_id for d in sync.deals]
+    # identical rows are distinct deals
+    assert len(set(ids)) == 3
+
+    rows[3] = ["3m", "5"]
+    result = sync.poll()
+    assert result.changed == [4] and sync.deals[2].amount == 5
+    assert [d.deal_id for d in sync.deals] == ids
+
+    rows.insert(1, ["6m", "3"])  # above the window once the overlap is exceeded
+    sync.overlap = 1
+    sync.resync()
+    moved = [d.deal_id for d in sync.deals]
+    # the identical rows may trade ids, either way no deal is lost or doubled
+    assert moved[3] == ids[2] and set(moved[1:]) == set(ids)
+    assert moved[0] not in ids
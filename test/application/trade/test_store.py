@@ -0,0 +1,82 @@
+import random
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+from application.trade.store import DealStore
+
+
+def _deal(trade_date, bid, offer, product="df", tenor="1m", amount=10, fee=1_000):
+    (bid_house, bid_entity), (offer_house, offer_entity) = bid, offer
+    return SimpleNamespace(
+        trade_date=trade_date,
+        product=product,
+        tenor=tenor,
+        amount=amount,
+        bid_house=bid_house,
+        bid_entity=bid_entity,
+        bid_bro_fee=fee,
+        bid_switch=False,
+        offer_house=offer_house,
+        offer_entity=offer_entity,
+        offer_bro_fee=0,  # switched
+        offer_switch=True,
+    )
+
+
+def test_deal_store():
+    kb, woori, citi = ("KB", "SL"), ("WOORI", "SL"), ("CITI", "")
+    deals = [
+        _deal(date(2024, 1, 2), kb, woori),
+        _deal(date(2024, 1, 31), woori, citi, "ndf", "3m", 20, 2_000),
+        _deal(date(2024, 2, 1), citi, kb, tenor="on", amount=30),
+    ]
+    store = DealStore()
+    assert store.append(deals[:1]) == 1 and store.append(iter(deals[1:])) == 2
+    assert store.append([]) == 0 and len(store) == 3
+
+    assert store.deals(house="kb") == [deals[0], deals[2]]
+    assert store.deals(house="kb", start=date(2024, 2, 1)) == [deals[2]]
+    assert store.deals(house="woori", product="ndf") == [deals[1]]
+    assert store.deals(entity="sl", end=date(2024, 1, 31)) == deals[:2]
+    # houses and entities are matched whatever case they were booked in
+    lower = DealStore()
+    lower.append([_deal(date(2024, 2, 2), ("shinhan", "sl"), kb)])
+    assert len(lower.deals(house="SHINHAN", entity="SL")) == 1
+    assert lower.houses() == ["KB", "SHINHAN"]
+    assert store.deals(tenor="ON") == [deals[2]]
+    assert store.deals(house="nobody") == []
+
+    assert store.sum() == {"KB": 1_000, "WOORI": 2_000, "CITI": 1_000}
+    assert store.sum(by="entity") == {"KB SL": 1_000, "WOORI SL": 2_000, "CITI": 1_000}
+    assert store.sum("amount", by="month") == {"2024-01": 30, "2024-02": 30}
+    assert store.sum("amount", by="house", product="df") == {
+        "KB": 40,
+        "WOORI": 10,
+        "CITI": 30,
+    }
+    assert store.sum(by="date", house="woori") == {
+        date(2024, 1, 2): 0,
+        date(2024, 1, 31): 2_000,
+    }
+    assert store.sum("amount", by="tenor") == {"1M": 10, "3M": 20, "ON": 30}
+    assert store.houses() == ["CITI", "KB", "WOORI"]
+
+
+def test_deal_store_house_selection():
+    random.seed(11)
+    houses = [(f"H{i}", "SL") for i in range(50)]
+    deals = [
+        _deal(date(2020, 1, 1) + timedelta(days=i // 200), *random.sample(houses, 2))
+        for i in range(200_000)
+    ]
+    store = DealStore()
+    for i in range(0, len(deals), 50_000):
+        store.append(deals[i : i + 50_000])
+
+    selected = store.deals(house="H7", start=date(2021, 1, 1))
+    scanned = [
+        d
+        for d in deals
+        if "H7" in (d.bid_house, d.offer_house) and d.trade_date >= date(2021, 1, 1)
+    ]
+    assert selected == scanned
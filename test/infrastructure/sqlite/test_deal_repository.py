@@ -0,0 +1,137 @@
+import threading
+from dataclasses import replace
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+
+import numpy as np
+
+from application.spotmar import Deal as SpotmarDeal
+from application.swap import Deal as SwapDeal
+from infrastructure.sqlite import DealRepository
+
+
+def _swap_deal(trade_date, bid_house, offer_house, fee=30_000, **kwargs):
+    return SwapDeal(
+        type="df",
+        trade_date=trade_date,
+        tenor="1m",
+        bid_house=bid_house,
+        bid_entity="sl",
+        bid_trader="kim",
+        offer_house=offer_house,
+        offer_entity="sl",
+        offer_trader="lee",
+        margin=0.5,
+        amount=50,
+        near_rate=1300.5,
+        far_rate=1299.2,
+        bid_brokerage_fee=fee,
+        offer_brokerage_fee=fee,
+        bid_brokerage_currency="KRW",
+        offer_brokerage_currency="KRW",
+        deal_time=datetime.combine(trade_date, datetime.min.time()),
+        **kwargs,
+    )
+
+
+def _ids(deals):
+    return [d.deal_id for d in deals]
+
+
+def test_swap_deals(tmp_path):
+    repository = DealRepository(str(tmp_path / "deals.db"))
+    deals = [
+        _swap_deal(date(2024, 1, 29), "kb", "woori"),
+        _swap_deal(date(2024, 1, 30), "woori", "citi", bid_switch=True),
+        _swap_deal(date(2024, 2, 1), "citi", "kb", remark="given"),
+    ]
+    assert repository.swap.upsert(deals, chunk_size=2) == 3
+    assert len(repository.swap) == 3
+
+    stored = repository.swap.get(deals[0].deal_id)
+    assert "_tenor" not in stored.__dict__  # built when a leg is first read
+    assert stored.spot_date == deals[0].spot_date
+    assert stored.__dict__.keys() == deals[0].__dict__.keys()
+    assert all(
+        getattr(stored, k) == getattr(deals[0], k)
+        for k in deals[0].__dict__
+        if k != "_tenor"  # tenors compare by the symbol as typed
+    )
+
+    assert _ids(repository.swap.deals(house="kb")) == _ids([deals[0], deals[2]])
+    period = repository.swap.deals(start=date(2024, 1, 30), end=date(2024, 1, 31))
+    assert _ids(period) == _ids(deals[1:2])
+    assert repository.swap.brokerage("woori") == {"KRW": 30_000}  # bid side switched
+
+    repository.swap.upsert([replace(deals[0], amount=70)])
+    assert len(repository.swap) == 3
+    assert repository.swap.get(deals[0].deal_id).amount == 70
+
+    (batch,) = repository.swap.batches(house="citi")
+    assert batch["trade_date"].tolist() == [date(2024, 1, 30), date(2024, 2, 1)]
+    assert batch["bid_switch"].dtype == bool and batch["amount"].dtype == np.int64
+
+    assert repository.swap.delete([deals[1].deal_id]) == 1
+    assert _ids(repository.swap.deals(house="citi")) == _ids(deals[2:])
+
+    # a tenor that no longer resolves still reads back as booked
+    unresolved = SimpleNamespace(**{**vars(deals[0]), "deal_id": "x", "tenor": "0IMM"})
+    repository.swap.upsert([unresolved])
+    assert repository.swap.get("x").tenor == "0IMM"
+    assert len(repository.swap.deals()) == 3
+
+
+def test_spotmar_deals(tmp_path):
+    repository = DealRepository(str(tmp_path / "deals.db"))
+    deal = SpotmarDeal(
+        trade_date=date(2023, 1, 2),
+        bid_house="hana sec",
+        offer_house="kookmin",
+        price=1268.9,
+        amount=13,
+        rate=1268.9,
+        value_date=date(2023, 1, 4),
+        mar=1268.9,
+        bid_brokerage_currency="KRW",
+        bid_brokerage_fee=78_000,
+        offer_brokerage_currency="KRW",
+        offer_brokerage_fee=78_000,
+        deal_time=datetime(2023, 1, 2, 8, 44),
+    )
+    repository.spotmar.upsert([deal])
+    assert repository.spotmar.deals(house="Kookmin") == [deal]
+    assert repository.swap.deals() == []
+
+
+def test_bulk_upsert_and_concurrent_reads(tmp_path):
+    repository = DealRepository(str(tmp_path / "deals.db"))
+    houses = [f"h{i}" for i in range(20)]
+    first = vars(_swap_deal(date(2024, 1, 2), "kb", "woori"))
+    deals = [  # only read back as sums, any calendar day will do
+        SimpleNamespace(
+            **{
+                **first,
+                "deal_id": str(i),
+                "trade_date": date(2020, 1, 1) + timedelta(days=i // 50),
+                "bid_house": houses[i % 20].upper(),
+                "offer_house": houses[(i + 1) % 20].upper(),
+            }
+        )
+        for i in range(50_000)
+    ]
+
+    assert repository.swap.upsert(deals) == 50_000
+
+    counts = []
+    reader = threading.Thread(target=lambda: counts.append(len(repository.swap)))
+    writer = threading.Thread(target=lambda: repository.swap.upsert(deals[:10_000]))
+    writer.start()
+    reader.start()
+    writer.join()
+    reader.join()
+
+    brokerage = repository.swap.brokerage("h3", date(2021, 1, 1), date(2021, 12, 31))
+    assert counts == [50_000]
+    in_2021 = [d for d in deals if d.trade_date.year == 2021]
+    sides = sum((d.bid_house, d.offer_house).count("H3") for d in in_2021)
+    assert brokerage == {"KRW": sides * 30_000}
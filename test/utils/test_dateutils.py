@@ -0,0 +1,158 @@
+import random
+import sys
+from datetime import date, timedelta
+
+from adapter.google import sheets
+from utils import dateutils
+
+COUNTRY_CODES = [None, "kr", "us"]
+
+
+def _random_dates(n: int, seed: int = 7):
+    rnd = random.Random(seed)
+    first = date(2018, 6, 1).toordinal()
+    last = date(2071, 6, 30).toordinal()
+    return [date.fromordinal(rnd.randint(first, last)) for _ in range(n)]
+
+
+def test_add_workdays_matches_walk():
+    rnd = random.Random(11)
+    for d in _random_dates(1_000):
+        n = rnd.randint(-300, 300)
+        for c in COUNTRY_CODES:
+            assert dateutils.add_workdays(d, n, c) == dateutils._walk_workdays(
+                d, n, c
+            ), (d, n, c)
+
+
+def test_working_days_between_matches_walk():
+    rnd = random.Random(13)
+    for d in _random_dates(300):
+        end = d + timedelta(days=rnd.randint(-10, 4_000))
+        for c in COUNTRY_CODES:
+            assert dateutils.working_days_between(
+                d, end, c
+            ) == dateutils._count_working_days(d, end, c), (d, end, c)
+
+
+def test_next_and_previous_working_day():
+    # 2024-02-09 ~ 2024-02-12 is SEOLLAL in korea
+    assert dateutils.next_working_day(date(2024, 2, 8), "kr") == date(2024, 2, 13)
+    assert dateutils.previous_working_day(date(2024, 2, 13), "kr") == date(2024, 2, 8)
+    assert dateutils.next_working_day(date(2024, 2, 8), "us") == date(2024, 2, 9)
+
+
+def test_joint_calendars():
+    kr_or_us = dateutils.get_calendar("kr|us")
+    kr_and_us = dateutils.get_calendar("kr&us")
+    assert dateutils.get_calendar() is kr_or_us
+    assert dateutils.union("kr", "us") is kr_or_us
+    assert dateutils.intersection("kr", "us") is kr_and_us
+    # 2024-01-15 is MLK day in the us only, 2024-01-01 is a holiday in both
+    assert not kr_or_us.is_working_day(date(2024, 1, 15))
+    assert kr_and_us.is_working_day(date(2024, 1, 15))
+    assert not kr_and_us.is_working_day(date(2024, 1, 1))
+    assert kr_or_us.add_workdays(date(2024, 1, 12), 1) == date(2024, 1, 16)
+    assert kr_and_us.add_workdays(date(2024, 1, 12), 1) == date(2024, 1, 15)
+
+
+def test_calendar_end_of_month():
+    kr = dateutils.get_calendar("kr")
+    # 2024-03-31 is a sunday
+    assert kr.end_of_month(date(2024, 3, 5)) == date(2024, 3, 31)
+    assert kr.end_of_month(date(2024, 3, 5), working_day=True) == date(2024, 3, 29)
+    assert kr.is_end_of_month(date(2024, 3, 29), working_day=True)
+
+
+def test_custom_weekend_calendar():
+    friday_saturday = dateutils.Calendar.of("fri-sat", [], weekend=[4, 5])
+    assert not friday_saturday.is_working_day(date(2024, 3, 1))
+    assert friday_saturday.is_working_day(date(2024, 3, 3))
+    assert friday_saturday.add_workdays(date(2024, 2, 29), 1) == date(2024, 3, 3)
+
+
+def _holiday_range():
+    first = date(2019, 1, 1)
+    return [first + timedelta(days=i) for i in range((date(2070, 12, 31) - first).days)]
+
+
+def test_is_working_day_many_matches_scalar():
+    days = _holiday_range()
+    for c in COUNTRY_CODES + ["kr&us"]:
+        expected = [dateutils.is_working_day(d, c) for d in days]
+        assert dateutils.is_working_day_many(days, c).tolist() == expected, c
+
+
+def test_add_workdays_many_matches_scalar():
+    rnd = random.Random(17)
+    days = _holiday_range()
+    n = [rnd.randint(-20, 20) for _ in days]
+    for c in COUNTRY_CODES + ["kr&us"]:
+        expected = [dateutils.add_workdays(d, k, c) for d, k in zip(days, n)]
+        assert dateutils.add_workdays_many(days, n, c).tolist() == expected, c
+
+
+def test_working_days_between_many_matches_scalar():
+    rnd = random.Random(19)
+    days = _holiday_range()
+    ends = [min(d + timedelta(days=rnd.randint(-5, 3_650)), days[-1]) for d in days]
+    for c in COUNTRY_CODES + ["kr&us"]:
+        expected = [dateutils.working_days_between(s, e, c) for s, e in zip(days, ends)]
+        assert dateutils.working_days_between_many(days, ends, c).tolist() == expected
+
+
+def test_compiled_holidays_round_trip(tmp_path):
+    kr = dateutils.get_calendar("kr")
+    path = str(tmp_path / "kr.bin")
+    dateutils._write_compiled_holidays(path, b"1" * 20, kr.first_year, kr.holiday_masks)
+    assert dateutils._read_compiled_holidays(path, b"1" * 20) == (
+        kr.first_year,
+        kr.holiday_masks,
+    )
+    # a changed source csv invalidates the artifact
+    assert dateutils._read_compiled_holidays(path, b"2" * 20) is None
+    assert kr.holidays == frozenset(dateutils.get_holidays("kr"))
+
+
+def test_bitset_calendar_against_holiday_dict():
+    days = _holiday_range()
+    for c in ["kr", "us"]:
+        cal = dateutils.get_calendar(c)
+        holiday_dict = dateutils.get_holidays(c)
+        assert [cal.is_holiday(d) for d in days] == [d in holiday_dict for d in days]
+        start, end = date(2024, 1, 1), date(2034, 12, 31)
+        assert cal.holidays_between(start, end) == sum(
+            1 for d in holiday_dict if start <= d <= end
+        )
+
+        dict_bytes = sys.getsizeof(holiday_dict) + sum(
+            sys.getsizeof(d) for d in holiday_dict
+        )
+        bitset_bytes = sys.getsizeof(cal.holiday_masks) + sum(
+            sys.getsizeof(m) for m in cal.holiday_masks
+        )
+        assert bitset_bytes < dict_bytes
+
+
+def test_reload_calendar(monkeypatch):
+    kr = dateutils.get_calendar("kr")
+    kr_or_us = dateutils.get_calendar()
+    version = dateutils.calendar_version()
+    monkeypatch.setattr(
+        sheets,
+        "get_values",
+        lambda *_: [{"date": "2024-01-16", "name": "EXTRA_HOLIDAY"}],
+    )
+    try:
+        assert dateutils.reload_calendar("kr", dateutils.SOURCE_SHEET) == version + 1
+        assert dateutils.calendar_version() == version + 1
+        assert dateutils.is_holiday(date(2024, 1, 16), "kr")
+        assert not dateutils.is_holiday(date(2024, 2, 9), "kr")
+        assert dateutils.get_calendar() is not kr_or_us
+        assert dateutils.add_workdays(date(2024, 1, 15), 1) == date(2024, 1, 17)
+        assert dateutils.get_holidays("kr") == {date(2024, 1, 16): "EXTRA_HOLIDAY"}
+    finally:
+        dateutils.reload_calendar("kr")
+    assert dateutils.calendar_version() == version + 2
+    assert dateutils.get_calendar("kr") == kr
+    assert dateutils.is_holiday(date(2024, 2, 9), "kr")
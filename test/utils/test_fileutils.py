@@ -0,0 +1,75 @@
+from datetime import date, datetime, time
+
+from application.spotmar import deal_log as spotmar_log
+from application.swap import deal_log as swap_log
+from utils import fileutils
+
+
+def test_read_csv_chunks(tmp_path):
+    log = tmp_path / "deal_log.csv"
+    log.write_text(
+        "date,buy,sell,margin,amt,rate,value,mar,bid bro,offer bro,time\n"
+        '2023-01-02,hana sec,kookmin,0,13,1268.9,2023-01-04,1268.9,"78,000","78,000",8:44\n'
+        '2023-01-02,hana sec,keb hana,0,1.5,1268.9,2023-01-04,1268.9,-,"*9,000",13:05\n'
+        ",,,,14.5,,,,,,\n"
+        "2023-01-03,kookmin,citi,0,2,1270,2023-01-05,1270,,-,\n"
+    )
+    chunks = list(spotmar_log.read_log_chunks(str(log), chunk_size=2))
+    assert [len(c) for c in chunks] == [2, 1]  # the subtotal row is skipped
+
+    first, second, third = (r for c in chunks for r in c)
+    assert first == spotmar_log.LogRecord(
+        trade_date=date(2023, 1, 2),
+        buy="HANA SEC",
+        sell="KOOKMIN",
+        margin=0,
+        amount=13.0,
+        rate=1268.9,
+        value_date=date(2023, 1, 4),
+        mar=1268.9,
+        bid_brokerage_fee=78_000,
+        offer_brokerage_fee=78_000,
+        deal_time=time(8, 44),
+    )
+    assert second.bid_switch and not second.offer_switch
+    assert second.offer_brokerage_fee == 9_000 and second.amount == 1.5
+    assert third.bid_brokerage_fee == 0 and third.offer_switch
+    assert third.deal_time is None
+
+
+def test_read_spotmar_log():
+    records = 0
+    for chunk in spotmar_log.read_log_chunks(chunk_size=500):
+        assert len(chunk) <= 500
+        records += len(chunk)
+    assert records == 2_382
+    assert all(isinstance(r.trade_date, date) for r in spotmar_log.read_log())
+    agreed = [r for r in spotmar_log.read_log() if r.bid_agreed or r.offer_agreed]
+    assert [
+        (r.bid_brokerage_fee, r.bid_agreed, r.offer_brokerage_fee, r.offer_agreed)
+        for r in agreed
+    ] == [(500_000, True, 264_000, False), (None, False, 500_000, True)]
+
+
+def test_swap_log(tmp_path):
+    log = tmp_path / "swap.csv"
+    log.write_text(
+        "TENOR,BID,OFFER,MARGIN,AMT,NEAR,FAR,DEAL_TIME,CFM,TRADER_B,TRADER_O,TYPE\n"
+        "1m,kbs,woori,-,50,1300.5,1299.2,2024-01-29 08:44:00,y,,,\n"
+        ",,,,,,,,,,,\n"
+    )
+    (record,) = swap_log.read_log(str(log))
+    assert record.deal_time == datetime(2024, 1, 29, 8, 44)
+    assert (record.margin, record.amount, record.far_rate) == (0, 50, 1299.2)
+    assert record.confirmation_done and not record.bid_switch
+    assert (record.product, record.remark) == ("df", "")
+
+    row = {"TENOR": "1m", "AMT": 50, "DEAL_TIME": datetime(2024, 1, 29, 8, 44)}
+    row.update(SWITCH_B="y", TYPE="ndf")
+    sheet_record = swap_log.from_row(row)
+    assert sheet_record.trade_date == date(2024, 1, 29)
+    assert sheet_record.bid_switch and sheet_record.product == "ndf"
+
+    empty = tmp_path / "empty.csv"
+    empty.write_text("")
+    assert list(fileutils.read_csv_chunks(str(empty), swap_log.SCHEMA)) == []
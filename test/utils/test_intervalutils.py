@@ -0,0 +1,33 @@
+from datetime import date
+
+import numpy as np
+
+from utils.intervalutils import EffectiveDated
+
+
+def test_effective_dated():
+    history = EffectiveDated()
+    history.add("a", 1)
+    history.add("a", 3, date(2024, 1, 1))
+    history.add("a", 2, date(2023, 1, 1), date(2023, 6, 30))
+    history.add("b", 10, date(2024, 1, 1), date(2024, 12, 31))
+
+    assert history.get("a", date(2022, 12, 31)) == 1
+    assert history.get("a", date(2023, 6, 30)) == 2
+    assert history.get("a", date(2023, 7, 1)) is None  # 2 had ended
+    assert history.get("a", date(2030, 1, 1)) == 3
+    assert history.get("b", date(2023, 12, 31), 0) == 0
+    assert history.get("b", date(2025, 1, 1)) is None
+    assert history.get("c", date(2024, 1, 1)) is None
+    assert history.periods("a")[0] == (None, None, 1)
+    assert len(history) == 4
+
+    history.add("a", 4, date(2024, 1, 1))
+    assert history.get("a", date(2024, 1, 1)) == 4 and len(history) == 4
+
+    dates = np.asarray(
+        ["2022-12-31", "2023-06-30", "2023-07-01", "2030-01-01"], dtype="datetime64[D]"
+    )
+    assert history.positions("a", dates).tolist() == [0, 1, -1, 2]
+    assert history.positions("b", dates).tolist() == [-1, -1, -1, -1]
+    assert history.positions("c", dates).tolist() == [-1, -1, -1, -1]
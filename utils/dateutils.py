@@ -1,19 +1,497 @@
+from __future__ import annotations
+
 import calendar
 import csv
+import hashlib
+import mmap
+import operator
 import os.path
-from datetime import datetime, date, timedelta
-
+import struct
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime, date, time, timedelta
+from functools import cached_property, reduce
+from typing import Dict, FrozenSet, Iterable, List, Tuple, Union
+
+import numpy as np
 from more_itertools import consume
 
 import constants
 
 _HOLIDAYS = {}
 _COUNTRY_CODES = ["kr", "us"]
+_CALENDARS = {}
+_VERSION = 0  # bumped on every reload, derived caches key on it
+_LOCK = threading.RLock()
+
+SOURCE_CSV = "csv"
+SOURCE_SHEET = "sheet"
+
+_HOLIDAY_DIR = os.path.join(constants.RESOURCE_DIR, "holidays")
+_COMPILED_DIR = os.path.join(_HOLIDAY_DIR, "compiled")
+# magic, sha1 of the source csv, first year, number of years
+_COMPILED_HEADER = struct.Struct("<4s20sHH")
+_COMPILED_MAGIC = b"HLD1"
+_YEAR_BYTES = 46  # 366 bits, bit (day of year - 1) is set for a holiday
+
+ANY = "any"
+WEEKEND = frozenset({5, 6})
+
+
+@dataclass(frozen=True)
+class _WorkdayIndex:
+    """
+    Cumulative working-day ordinals over the span covered by the holiday files.
+
+    counts[i] is the number of working days in [first, first + i] and
+    workdays holds the ordinals of those working days in ascending order,
+    so adding or counting working days is a couple of list lookups.
+    """
+
+    first: int
+    counts: List[int]
+    workdays: List[int]
+
+    def covers(self, d: date) -> bool:
+        return 0 <= d.toordinal() - self.first < len(self.counts)
+
+    def count_until(self, d: date) -> int:
+        """number of working days on or before `d` within the span"""
+        return self.counts[d.toordinal() - self.first]
+
+    def is_working_day(self, d: date) -> bool:
+        i = d.toordinal() - self.first
+        return self.counts[i] != (self.counts[i - 1] if i else 0)
+
+    def add(self, d: date, n: int) -> date | None:
+        """`n` working days from `d`, or None when the result leaves the span"""
+        k = self.count_until(d)
+        if n < 0 and self.is_working_day(d):
+            k -= 1
+        i = k + n - 1 if n > 0 else k + n
+        if not 0 <= i < len(self.workdays):
+            return None
+        return date.fromordinal(self.workdays[i])
+
+    def between(self, start: date, end: date) -> int:
+        k = self.count_until(end) - self.count_until(start)
+        return k + 1 if self.is_working_day(start) else k
+
+
+@dataclass(frozen=True)
+class Calendar:
+    """
+    A named holiday calendar plus weekend rule, stored as one 366-bit mask per year
+    (bit `day of year - 1` is set for a holiday) from `first_year` onwards.
+    Holiday names are not kept here, see `get_holidays`.
+    Joint calendars (e.g. kr|us, kr&us) are plain calendars built by `union`/`intersection`.
+    """
+
+    name: str
+    first_year: int | None
+    holiday_masks: Tuple[int, ...]
+    weekend: FrozenSet[int] = field(default=WEEKEND)
+
+    @staticmethod
+    def of(
+        name: str,
+        holidays: Iterable[date],
+        weekend: Iterable[int] = WEEKEND,
+        first: date = None,
+        last: date = None,
+    ) -> Calendar:
+        """
+        :param name: registry name, e.g. "kr", "kr|us"
+        :param holidays: non-working dates besides the weekend
+        :param weekend: weekday numbers (monday = 0) that are never working days
+        :param first: first day of the span. defaults to Jan 1 of the earliest holiday
+        :param last: last day of the span. defaults to Dec 31 of the latest holiday
+        """
+        holidays = list(holidays)
+        years = [d.year for d in holidays] + [d.year for d in (first, last) if d]
+        if not years:
+            return Calendar(name.lower(), None, (), frozenset(weekend))
+        first_year = min(years)
+        masks = [0] * (max(years) - first_year + 1)
+        for d in holidays:
+            masks[d.year - first_year] |= 1 << (d.toordinal() - _year_start(d.year))
+        return Calendar(name.lower(), first_year, tuple(masks), frozenset(weekend))
+
+    @property
+    def first(self) -> date | None:
+        return date(self.first_year, 1, 1) if self.holiday_masks else None
+
+    @property
+    def last(self) -> date | None:
+        if not self.holiday_masks:
+            return None
+        return date(self.first_year + len(self.holiday_masks) - 1, 12, 31)
+
+    def holiday_mask(self, year: int) -> int:
+        i = year - self.first_year if self.holiday_masks else -1
+        return self.holiday_masks[i] if 0 <= i < len(self.holiday_masks) else 0
+
+    @cached_property
+    def holidays(self) -> FrozenSet[date]:
+        return frozenset(
+            date.fromordinal(_year_start(self.first_year + i) + bit)
+            for i, mask in enumerate(self.holiday_masks)
+            for bit in _set_bits(mask)
+        )
+
+    @cached_property
+    def _first_year(self) -> int:
+        return self.first_year or 0
+
+    @cached_property
+    def _year_starts(self) -> List[int]:
+        """ordinal of Jan 1 for every year of the span and the year after it"""
+        return [
+            _year_start(self._first_year + i)
+            for i in range(len(self.holiday_masks) + 1)
+        ]
+
+    @cached_property
+    def _working_masks(self) -> Tuple[int, ...]:
+        return tuple(
+            _weekday_mask(self.first_year + i, self.weekend) & ~mask
+            for i, mask in enumerate(self.holiday_masks)
+        )
+
+    @cached_property
+    def _index(self) -> _WorkdayIndex | None:
+        """built on first use so that unused calendars cost nothing"""
+        if not self.holiday_masks:
+            return None
+        mask = np.concatenate(
+            [
+                _unpack(working, self._year_starts[i + 1] - self._year_starts[i])
+                for i, working in enumerate(self._working_masks)
+            ]
+        )
+        return _WorkdayIndex(
+            self._year_starts[0],
+            np.cumsum(mask).tolist(),
+            (np.flatnonzero(mask) + self._year_starts[0]).tolist(),
+        )
+
+    def is_holiday(self, d: date) -> bool:
+        i = d.year - self._first_year
+        if not 0 <= i < len(self.holiday_masks):
+            return False
+        return self.holiday_masks[i] >> (d.toordinal() - self._year_starts[i]) & 1 == 1
+
+    def is_weekend(self, d: date) -> bool:
+        return d.weekday() in self.weekend
+
+    def is_working_day(self, d: date) -> bool:
+        i = d.year - self._first_year
+        if not 0 <= i < len(self.holiday_masks):
+            return d.weekday() not in self.weekend
+        return self._working_masks[i] >> (d.toordinal() - self._year_starts[i]) & 1 == 1
+
+    def holidays_between(self, start: date, end: date) -> int:
+        """number of holidays in [start, end], weekends aside, by popcount"""
+        return self._count_bits(self.holiday_masks, start, end)
+
+    def _count_bits(self, masks: Tuple[int, ...], start: date, end: date) -> int:
+        if start > end or not masks:
+            return 0
+        first = max(start, self.first)
+        last = min(end, self.last)
+        count = 0
+        for year in range(first.year, last.year + 1):
+            i = year - self.first_year
+            low = first.toordinal() - self._year_starts[i] if year == first.year else 0
+            high = last.toordinal() - self._year_starts[i] if year == last.year else 365
+            count += (masks[i] >> low & ((1 << (high - low + 1)) - 1)).bit_count()
+        return count
+
+    def add_workdays(self, d: date, n: int) -> date:
+        if n == 0:
+            return d
+        if self._index and self._index.covers(d):
+            shifted = self._index.add(d, n)
+            if shifted is not None:
+                return shifted
+        return self._walk_workdays(d, n)
+
+    def _walk_workdays(self, d: date, n: int) -> date:
+        step = 1 if n >= 0 else -1
+        while n != 0:
+            d += timedelta(days=step)
+            if self.is_working_day(d):
+                n -= step
+        return d
+
+    def next_working_day(self, d: date) -> date:
+        return self.add_workdays(d, 1)
+
+    def previous_working_day(self, d: date) -> date:
+        return self.add_workdays(d, -1)
+
+    def working_days_between(self, start: date, end: date) -> int:
+        if start > end:
+            return 0
+        if self._index and self._index.covers(start) and self._index.covers(end):
+            return self._index.between(start, end)
+        return self._count_working_days(start, end)
+
+    def _count_working_days(self, start: date, end: date) -> int:
+        current = start
+        working_days = 0
+        while current <= end:
+            if self.is_working_day(current):
+                working_days += 1
+            current += timedelta(days=1)
+        return working_days
+
+    def end_of_month(self, input_date: date, working_day: bool = False) -> date:
+        eom = date(
+            input_date.year,
+            input_date.month,
+            calendar.monthrange(input_date.year, input_date.month)[1],
+        )
+        return (
+            self.add_workdays(eom, -1)
+            if working_day and not self.is_working_day(eom)
+            else eom
+        )
+
+    def is_end_of_month(self, input_date: date, working_day: bool = False) -> bool:
+        return input_date == self.end_of_month(input_date, working_day)
+
+    @cached_property
+    def busdaycalendar(self) -> np.busdaycalendar:
+        """holiday mask of this calendar for the numpy busday functions"""
+        return np.busdaycalendar(
+            weekmask=[0 if i in self.weekend else 1 for i in range(7)],
+            holidays=np.array(sorted(self.holidays), dtype="datetime64[D]"),
+        )
+
+    def is_working_day_many(self, dates) -> np.ndarray:
+        return np.is_busday(_to_days(dates), busdaycal=self.busdaycalendar)
+
+    def add_workdays_many(self, dates, n) -> np.ndarray:
+        dates = _to_days(dates)
+        n = np.asarray(n, dtype=np.int64)
+        # a non-working day first rolls against the direction of travel,
+        # so that e.g. saturday + 1 is monday as in `add_workdays`
+        forward = np.busday_offset(
+            dates, n, roll="backward", busdaycal=self.busdaycalendar
+        )
+        backward = np.busday_offset(
+            dates, n, roll="forward", busdaycal=self.busdaycalendar
+        )
+        return np.where(n == 0, dates, np.where(n > 0, forward, backward))
+
+    def working_days_between_many(self, starts, ends) -> np.ndarray:
+        starts, ends = _to_days(starts), _to_days(ends)
+        counts = np.busday_count(starts, ends + 1, busdaycal=self.busdaycalendar)
+        return np.where(starts > ends, 0, counts)
+
+
+CalendarLike = Union[str, Calendar, None]
 
 
 def init():
-    if len(_HOLIDAYS) == 0:
-        _load_all_holidays()
+    consume(get_calendar(c) for c in _COUNTRY_CODES)
+
+
+def calendar_version() -> int:
+    """
+    Changes whenever a calendar is reloaded. Anything derived from calendars
+    (tenors, fee day counts, ...) should be cached under this version.
+    """
+    return _VERSION
+
+
+def get_calendar(country_code: CalendarLike = None) -> Calendar:
+    """
+    Calendars are compiled on first use.
+
+    :param country_code: a registered calendar name ("kr", "us", "kr|us", "kr&us", ...),
+        a Calendar, or None for the union of every country calendar
+    """
+    if isinstance(country_code, Calendar):
+        return country_code
+    name = country_code.lower() if country_code else ANY
+    cal = _CALENDARS.get(name)
+    return cal if cal else _build_calendar(name)
+
+
+def get_calendars() -> Dict[str, Calendar]:
+    return _CALENDARS
+
+
+def register_calendar(cal: Calendar, *aliases: str) -> Calendar:
+    with _LOCK:
+        consume(_CALENDARS.__setitem__(n.lower(), cal) for n in (cal.name, *aliases))
+    return cal
+
+
+def reload_calendar(country_code: str, source: str = SOURCE_CSV) -> int:
+    """
+    Rebuilds a country calendar while the process runs and swaps it in atomically.
+    Joint calendars are rebuilt lazily from the new country calendars.
+
+    :param country_code: 2-letter country code
+    :param source: SOURCE_CSV (resources/holidays) or SOURCE_SHEET ("holidays <country>")
+    :return: the new calendar version
+    """
+    global _CALENDARS, _VERSION
+    country_key = country_code.lower()
+    if country_key not in _COUNTRY_CODES:
+        raise KeyError(country_code)
+    if source == SOURCE_CSV:
+        holidays = None
+        compiled = _load_compiled_holidays(country_key)
+    elif source == SOURCE_SHEET:
+        holidays = _sheet_to_date_dict(country_key)
+        cal = Calendar.of(country_key, holidays)
+        compiled = cal.first_year, cal.holiday_masks
+    else:
+        raise ValueError(f"Unknown holiday source: {source}")
+    with _LOCK:
+        init()
+        country_to_masks = {
+            c: (cal.first_year, cal.holiday_masks)
+            for c in _COUNTRY_CODES
+            if (cal := _CALENDARS.get(c))
+        }
+        country_to_masks[country_key] = compiled
+        _CALENDARS = _country_calendars(country_to_masks)
+        if holidays is None:
+            _HOLIDAYS.pop(country_key, None)
+        else:
+            _HOLIDAYS[country_key] = holidays
+        _VERSION += 1
+        return _VERSION
+
+
+def snapshot_calendars() -> Dict[str, Tuple[int | None, Tuple[int, ...]]]:
+    """the country calendars as bare holiday masks, cheap to ship to another process"""
+    init()
+    return {
+        c: (cal.first_year, cal.holiday_masks)
+        for c in _COUNTRY_CODES
+        if (cal := _CALENDARS.get(c))
+    }
+
+
+def restore_calendars(
+    country_to_masks: Dict[str, Tuple[int | None, Tuple[int, ...]]],
+) -> int:
+    """
+    Swaps in the calendars of `snapshot_calendars`, e.g. in a worker process.
+
+    :return: the new calendar version
+    """
+    global _CALENDARS, _VERSION
+    with _LOCK:
+        _CALENDARS = _country_calendars(country_to_masks)
+        _VERSION += 1
+        return _VERSION
+
+
+def union(*country_codes: CalendarLike) -> Calendar:
+    """calendar where a day is a holiday if it is a holiday in any of the calendars"""
+    return _joint("|", country_codes, operator.or_, frozenset.union)
+
+
+def intersection(*country_codes: CalendarLike) -> Calendar:
+    """calendar where a day is a holiday only if it is a holiday in all the calendars"""
+    return _joint("&", country_codes, operator.and_, frozenset.intersection)
+
+
+def _joint(symbol: str, country_codes, combine_masks, combine_weekends) -> Calendar:
+    with _LOCK:
+        calendars = [get_calendar(c) for c in country_codes]
+        name = symbol.join(c.name for c in calendars)
+        if name in _CALENDARS:
+            return _CALENDARS[name]
+        weekend = reduce(combine_weekends, (c.weekend for c in calendars))
+        spans = [c for c in calendars if c.holiday_masks]
+        if not spans:
+            return register_calendar(Calendar(name, None, (), weekend))
+        first_year = min(c.first_year for c in spans)
+        last_year = max(c.last.year for c in spans)
+        masks = tuple(
+            reduce(combine_masks, (c.holiday_mask(year) for c in calendars))
+            for year in range(first_year, last_year + 1)
+        )
+        return register_calendar(Calendar(name, first_year, masks, weekend))
+
+
+def _build_calendar(name: str) -> Calendar:
+    with _LOCK:
+        if name in _CALENDARS:
+            return _CALENDARS[name]
+        if name == ANY:
+            return register_calendar(union(*_COUNTRY_CODES), ANY)
+        if "|" in name:
+            return union(*name.split("|"))
+        if "&" in name:
+            return intersection(*name.split("&"))
+        if name not in _COUNTRY_CODES:
+            raise KeyError(name)
+        _CALENDARS.update(
+            _country_calendars({c: _load_compiled_holidays(c) for c in _COUNTRY_CODES})
+        )
+        return _CALENDARS[name]
+
+
+def _country_calendars(
+    country_to_masks: Dict[str, Tuple[int | None, Tuple[int, ...]]],
+) -> Dict[str, Calendar]:
+    """country calendars share one span, the whole horizon of the holiday files"""
+    spans = [(y, len(m)) for y, m in country_to_masks.values() if m]
+    first_year = min((y for y, _ in spans), default=None)
+    last_year = max((y + n - 1 for y, n in spans), default=None)
+    return {
+        c: Calendar(
+            c,
+            first_year,
+            (
+                tuple(
+                    masks[year - y] if 0 <= year - y < len(masks) else 0
+                    for year in range(first_year, last_year + 1)
+                )
+                if spans
+                else ()
+            ),
+            WEEKEND,
+        )
+        for c, (y, masks) in country_to_masks.items()
+    }
+
+
+def to_date(v) -> date | None:
+    """date of an iso string such as "2023-01-02", None when blank"""
+    if isinstance(v, datetime):
+        return v.date()
+    if v is None or isinstance(v, date):
+        return v
+    v = v.strip()
+    return date.fromisoformat(v) if v else None
+
+
+def to_time(v) -> time | None:
+    """time of a clock string such as "8:44" or "13:05:10", None when blank"""
+    if v is None or isinstance(v, time):
+        return v
+    v = v.strip()
+    if not v:
+        return None
+    return time(*(int(part) for part in v.split(":")))
+
+
+def to_datetime(v) -> datetime | None:
+    """datetime of an iso string such as "2023-01-02 08:44:00", None when blank"""
+    if v is None or isinstance(v, datetime):
+        return v
+    v = v.strip()
+    return datetime.fromisoformat(v) if v else None
 
 
 def days_between(d1: date, d2: date):
@@ -21,71 +499,95 @@ def days_between(d1: date, d2: date):
     return abs(delta.days)
 
 
-def working_days_between(start: date, end: date, country_code: str = None):
-    current = start
-    working_days = 0
-    while current <= end:
-        if is_working_day(current, country_code):
-            working_days += 1
-        current += timedelta(days=1)
-    return working_days
+def working_days_between(start: date, end: date, country_code: CalendarLike = None):
+    return get_calendar(country_code).working_days_between(start, end)
 
 
 def end_of_month(
-    input_date, working_day: bool = False, country_code: str = None
+    input_date, working_day: bool = False, country_code: CalendarLike = None
 ) -> date:
-    # Extract the year and month from the input date
-    year, month = input_date.year, input_date.month
+    return get_calendar(country_code).end_of_month(input_date, working_day)
+
+
+def is_end_of_month(
+    input_date, working_day: bool = False, country_code: CalendarLike = None
+):
+    return get_calendar(country_code).is_end_of_month(input_date, working_day)
+
+
+def add_workdays(d: date, n: int, country_code: CalendarLike = None) -> date:
+    return get_calendar(country_code).add_workdays(d, n)
+
 
-    # Find the last day of the month
-    last_day = calendar.monthrange(year, month)[1]
+def next_working_day(d: date, country_code: CalendarLike = None) -> date:
+    return get_calendar(country_code).next_working_day(d)
+
+
+def previous_working_day(d: date, country_code: CalendarLike = None) -> date:
+    return get_calendar(country_code).previous_working_day(d)
+
+
+def _walk_workdays(d: date, n: int, country_code: CalendarLike = None) -> date:
+    return get_calendar(country_code)._walk_workdays(d, n)
+
+
+def _count_working_days(start: date, end: date, country_code: CalendarLike = None):
+    return get_calendar(country_code)._count_working_days(start, end)
+
+
+def is_working_day_many(dates, country_code: CalendarLike = None) -> np.ndarray:
+    """
+    :param dates: array-like of datetime64[D] (or anything numpy converts to it)
+    :return: boolean array
+    """
+    return get_calendar(country_code).is_working_day_many(dates)
 
-    # Return the end of the month date
-    eom = date(year, month, last_day)
-    return (
-        add_workdays(eom, -1)
-        if working_day and not is_working_day(eom, country_code)
-        else eom
-    )
 
+def add_workdays_many(dates, n, country_code: CalendarLike = None) -> np.ndarray:
+    """
+    :param dates: array-like of datetime64[D]
+    :param n: number of working days to add, scalar or an array broadcastable to `dates`
+    :return: datetime64[D] array
+    """
+    return get_calendar(country_code).add_workdays_many(dates, n)
 
-def is_end_of_month(input_date, working_day: bool = False, country_code: str = None):
-    # Check if the input date is the last day of the month
-    return input_date == end_of_month(input_date, working_day, country_code)
 
+def working_days_between_many(
+    starts, ends, country_code: CalendarLike = None
+) -> np.ndarray:
+    """
+    :param starts: array-like of datetime64[D]
+    :param ends: array-like of datetime64[D], inclusive like `working_days_between`
+    :return: int array
+    """
+    return get_calendar(country_code).working_days_between_many(starts, ends)
 
-def add_workdays(d: date, n: int, country_code: str = None) -> date:
-    step = 1 if n >= 0 else -1
-    while n != 0:
-        d += timedelta(days=step)
-        if is_working_day(d, country_code):
-            n -= step
 
-    return d
+def _to_days(dates) -> np.ndarray:
+    return np.asarray(dates, dtype="datetime64[D]")
 
 
-def is_working_day(d: date, country_code: str = None) -> bool:
-    return is_weekday(d) and not is_holiday(d, country_code)
+def is_working_day(d: date, country_code: CalendarLike = None) -> bool:
+    return get_calendar(country_code).is_working_day(d)
 
 
 def is_weekday(d: date):
     return d.weekday() < 5
 
 
-def is_holiday(d: date, country_code: str = None):
-    if country_code:
-        return d in _HOLIDAYS[country_code.lower()]
-    return any(d in holidays for holidays in _HOLIDAYS.values())
+def is_holiday(d: date, country_code: CalendarLike = None):
+    return get_calendar(country_code).is_holiday(d)
 
 
 def get_holidays(country_code: str):
+    """holiday names are only needed for display, so they are read from the csv on demand"""
     if not country_code:
+        consume(_load_holidays(c) for c in _COUNTRY_CODES if c not in _HOLIDAYS)
         return _HOLIDAYS
-    return _HOLIDAYS[country_code.lower()]
-
-
-def _load_all_holidays():
-    consume(_load_holidays(c) for c in _COUNTRY_CODES)
+    country_key = country_code.lower()
+    if country_key not in _HOLIDAYS:
+        _load_holidays(country_key)
+    return _HOLIDAYS[country_key]
 
 
 def _load_holidays(country_code: str):
@@ -98,23 +600,125 @@ def _load_holidays(country_code: str):
     _HOLIDAYS[country_key] = holidays
 
 
+def _load_compiled_holidays(country_key: str) -> Tuple[int | None, Tuple[int, ...]]:
+    """
+    Holidays from `resources/holidays/compiled/<country>.bin`, a packed bitset per year
+    keyed by the sha1 of the csv. The csv is only parsed to (re)build a stale artifact.
+
+    :return: first year, holiday mask per year
+    """
+    with open(_holiday_csv_path(country_key), "rb") as file:
+        digest = hashlib.sha1(file.read()).digest()
+    path = os.path.join(_COMPILED_DIR, f"{country_key}.bin")
+    compiled = _read_compiled_holidays(path, digest)
+    if compiled is None:
+        cal = Calendar.of(country_key, _csv_to_date_dict(country_key))
+        compiled = cal.first_year, cal.holiday_masks
+        _write_compiled_holidays(path, digest, *compiled)
+    return compiled
+
+
+def _read_compiled_holidays(
+    path: str, digest: bytes
+) -> Tuple[int | None, Tuple[int, ...]] | None:
+    try:
+        with open(path, "rb") as file, mmap.mmap(
+            file.fileno(), 0, access=mmap.ACCESS_READ
+        ) as buffer:
+            magic, source_digest, first_year, years = _COMPILED_HEADER.unpack_from(
+                buffer
+            )
+            if magic != _COMPILED_MAGIC or source_digest != digest:
+                return None
+            offset = _COMPILED_HEADER.size
+            masks = tuple(
+                int.from_bytes(
+                    buffer[offset + i * _YEAR_BYTES : offset + (i + 1) * _YEAR_BYTES],
+                    "little",
+                )
+                for i in range(years)
+            )
+    except (OSError, ValueError, struct.error):
+        return None
+    return (first_year if masks else None), masks
+
+
+def _write_compiled_holidays(
+    path: str, digest: bytes, first_year: int | None, masks: Tuple[int, ...]
+):
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as file:
+            file.write(
+                _COMPILED_HEADER.pack(
+                    _COMPILED_MAGIC, digest, first_year or 0, len(masks)
+                )
+            )
+            file.writelines(m.to_bytes(_YEAR_BYTES, "little") for m in masks)
+        os.replace(temp_path, path)
+    except OSError as e:
+        # a read-only install still works, it just parses the csv every time
+        print(f"Could not write the compiled holidays {path}: {e}")
+
+
+def _year_start(year: int) -> int:
+    return date(year, 1, 1).toordinal()
+
+
+def _weekday_mask(year: int, weekend: FrozenSet[int]) -> int:
+    """bits of the days of `year` that are not on the weekend"""
+    start = _year_start(year)
+    days = _year_start(year + 1) - start
+    first_weekday = date.fromordinal(start).weekday()
+    week = sum(1 << i for i in range(7) if (first_weekday + i) % 7 not in weekend)
+    mask = 0
+    for i in range(0, days, 7):
+        mask |= week << i
+    return mask & ((1 << days) - 1)
+
+
+def _unpack(mask: int, days: int) -> np.ndarray:
+    packed = np.frombuffer(mask.to_bytes(_YEAR_BYTES, "little"), dtype=np.uint8)
+    return np.unpackbits(packed, bitorder="little")[:days]
+
+
+def _set_bits(bits: int):
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+def _holiday_csv_path(country_key: str) -> str:
+    return os.path.join(_HOLIDAY_DIR, f"{country_key}.csv")
+
+
 def _csv_to_date_dict(filename):
     """
-    :param filename: under the `resources/input`
+    :param filename: under the `resources/holidays`
     :return:
     """
-    path = os.path.join(constants.RESOURCE_DIR, "holidays", f"{filename}.csv")
-    date_dict = {}
+    path = _holiday_csv_path(filename)
 
     with open(path, "r", encoding="utf-8") as file:
-        reader = csv.DictReader(file)
-        for row in reader:
-            # Convert the date string to a datetime.date object
-            date = datetime.strptime(row["date"], "%Y-%m-%d").date()
-            # Assign the date object as key and name as value
-            date_dict[date] = row["name"]
+        return _rows_to_date_dict(csv.DictReader(file))
 
-    return date_dict
 
+def _sheet_to_date_dict(country_key: str):
+    # imported here so that google api clients stay off the import path of dateutils
+    from adapter.google import sheets
 
-init()
+    return _rows_to_date_dict(sheets.get_values(f"holidays {country_key}", "A:B"))
+
+
+def _rows_to_date_dict(rows):
+    date_dict = {}
+    for row in rows:
+        if not row.get("date"):
+            continue
+        # Convert the date string to a datetime.date object
+        date = datetime.strptime(row["date"].strip(), "%Y-%m-%d").date()
+        # Assign the date object as key and name as value
+        date_dict[date] = row.get("name", "")
+    return date_dict
@@ -1,5 +1,61 @@
+from __future__ import annotations
+
 import csv
 import os
+from dataclasses import dataclass
+from itertools import chain
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+CHUNK_SIZE = 4096
+
+
+@dataclass(frozen=True)
+class Column:
+    """a csv column read into one field of a record"""
+
+    header: str  # as in the file, matched ignoring case, spaces and underscores
+    field: str  # keyword of the record type
+    parse: Callable[[str], Any] = str  # gets the stripped cell, "" when blank
+
+
+@dataclass(frozen=True)
+class CsvSchema:
+    """
+    How the rows of a csv file become typed records.
+
+    Every cell is parsed exactly once, as it is read, so code downstream of the
+    reader never sees a raw string such as "78,000" or "8:44".
+    """
+
+    record: Callable[..., Any]
+    columns: Tuple[Column, ...]
+    key: str = None  # header of a column that is blank on non-deal rows, e.g. totals
+
+    def indices(self, headers: List[str]) -> Tuple[List[int | None], int | None]:
+        """
+        :return: position of every column in `headers`, None for a column the
+            file lacks, and the position of the key column
+        """
+        header_to_index = {_normalize(h): i for i, h in enumerate(headers)}
+        indices = [header_to_index.get(_normalize(c.header)) for c in self.columns]
+        if self.key is None:
+            return indices, None
+        if _normalize(self.key) not in header_to_index:
+            raise ValueError(f"no {self.key} column in {headers}")
+        return indices, header_to_index[_normalize(self.key)]
+
+    def parse(self, row: Dict[str, Any]) -> Any:
+        """
+        Reads one already split row, e.g. from a sheet, into a record.
+        Cells that are not strings are handed to the parsers as they are.
+        """
+        cells = {_normalize(k): v for k, v in row.items()}
+        return self.record(
+            **{
+                c.field: c.parse(_cell(cells.get(_normalize(c.header))))
+                for c in self.columns
+            }
+        )
 
 
 def read_csv_to_dicts(file_path: str) -> list:
@@ -9,13 +65,78 @@ def read_csv_to_dicts(file_path: str) -> list:
     :param file_path: The path to the CSV file.
     :return: A list of dictionaries, where each dictionary represents a row in the CSV, with keys being the column headers.
     """
-    data = []
+    return list(iter_csv_dicts(file_path))
+
+
+def iter_csv_dicts(file_path: str) -> Iterator[Dict[str, str]]:
+    """
+    `read_csv_to_dicts` one row at a time, for files too large to hold in memory.
+
+    :param file_path: The path to the CSV file.
+    :return: A generator of dictionaries, keyed like `read_csv_to_dicts`.
+    """
     with open(file_path, newline="", encoding="utf-8") as csvfile:
         reader = csv.DictReader(csvfile)
         reader.fieldnames = [name.replace(" ", "_") for name in reader.fieldnames]
         for row in reader:
-            data.append({k.strip(): v.strip() for k, v in row.items()})
-    return data
+            yield {k.strip(): v.strip() for k, v in row.items()}
+
+
+def read_csv_chunks(
+    file_path: str, schema: CsvSchema, chunk_size: int = CHUNK_SIZE
+) -> Iterator[List[Any]]:
+    """
+    Reads a CSV file into typed records, at most `chunk_size` of them at a time.
+    Only the chunk being handed out is held in memory, whatever the size of the file.
+
+    :param file_path: The path to the CSV file.
+    :param schema: columns to read and the record type they are read into.
+    :return: A generator of lists of records, in file order.
+    """
+    with open(file_path, newline="", encoding="utf-8") as csvfile:
+        reader = csv.reader(csvfile)
+        headers = next(reader, None)
+        if headers is None:
+            return
+        indices, key = schema.indices(headers)
+        fields = [(c.field, c.parse, i) for c, i in zip(schema.columns, indices)]
+        record = schema.record
+        chunk = []
+        for row in reader:
+            if key is not None and (key >= len(row) or not row[key].strip()):
+                continue
+            chunk.append(
+                record(
+                    **{
+                        field: parse(
+                            row[i].strip() if i is not None and i < len(row) else ""
+                        )
+                        for field, parse, i in fields
+                    }
+                )
+            )
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+def read_csv_records(
+    file_path: str, schema: CsvSchema, chunk_size: int = CHUNK_SIZE
+) -> Iterator[Any]:
+    """`read_csv_chunks` one record at a time."""
+    return chain.from_iterable(read_csv_chunks(file_path, schema, chunk_size))
+
+
+def _normalize(header: str) -> str:
+    return header.strip().lower().replace("_", " ")
+
+
+def _cell(v):
+    if v is None:
+        return ""
+    return v.strip() if isinstance(v, str) else v
 
 
 def remove_file(file_path):
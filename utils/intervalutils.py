@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Dict, Generic, Hashable, List, Tuple, TypeVar
+
+import numpy as np
+
+T = TypeVar("T")
+
+_OPEN_START = date.min
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+@dataclass
+class EffectiveDated(Generic[T]):
+    """
+    Values in force over [effective_from, effective_to] date intervals, per key.
+
+    Intervals of a key are kept sorted by their start, so the value in force on a
+    date is a bisect. A value without an end is in force until the next one starts,
+    a value without a start has been in force since forever.
+    """
+
+    _starts: Dict[Hashable, List[date]] = field(default_factory=dict)
+    _ends: Dict[Hashable, List[date | None]] = field(default_factory=dict)
+    _values: Dict[Hashable, List[T]] = field(default_factory=dict)
+
+    def add(
+        self,
+        key: Hashable,
+        value: T,
+        effective_from: date | None = None,
+        effective_to: date | None = None,
+    ) -> None:
+        """a value starting on the same date as an existing one replaces it"""
+        start = effective_from or _OPEN_START
+        starts = self._starts.setdefault(key, [])
+        ends = self._ends.setdefault(key, [])
+        values = self._values.setdefault(key, [])
+        i = bisect_right(starts, start)
+        if i and starts[i - 1] == start:
+            ends[i - 1], values[i - 1] = effective_to, value
+            return
+        starts.insert(i, start)
+        ends.insert(i, effective_to)
+        values.insert(i, value)
+
+    def clear(self) -> None:
+        self._starts.clear()
+        self._ends.clear()
+        self._values.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._starts
+
+    def __len__(self):
+        return sum(len(v) for v in self._values.values())
+
+    def keys(self):
+        return self._starts.keys()
+
+    def position(self, key: Hashable, on: date) -> int:
+        """index of the interval of `key` in force on `on`, -1 when there is none"""
+        starts = self._starts.get(key)
+        if not starts:
+            return -1
+        i = bisect_right(starts, on) - 1
+        end = self._ends[key][i] if i >= 0 else None
+        if i < 0 or (end is not None and end < on):
+            return -1
+        return i
+
+    def get(self, key: Hashable, on: date, default: T = None) -> T:
+        i = self.position(key, on)
+        return self._values[key][i] if i >= 0 else default
+
+    def value_at(self, key: Hashable, position: int) -> T:
+        return self._values[key][position]
+
+    def periods(self, key: Hashable) -> List[Tuple[date | None, date | None, T]]:
+        return [
+            (start if start != _OPEN_START else None, end, value)
+            for start, end, value in zip(
+                self._starts.get(key, []),
+                self._ends.get(key, []),
+                self._values.get(key, []),
+            )
+        ]
+
+    def positions(self, key: Hashable, dates) -> np.ndarray:
+        """
+        `position` of many dates at once.
+
+        :param dates: array-like of datetime64[D]
+        :return: int array, -1 where no interval of `key` is in force
+        """
+        days = np.asarray(dates, dtype="datetime64[D]").astype(np.int64)
+        starts = self._starts.get(key)
+        if not starts:
+            return np.full(days.shape, -1)
+        start_days = np.asarray(
+            [s.toordinal() - _EPOCH_ORDINAL for s in starts], dtype=np.int64
+        )
+        end_days = np.asarray(
+            [
+                e.toordinal() - _EPOCH_ORDINAL if e else np.iinfo(np.int64).max
+                for e in self._ends[key]
+            ],
+            dtype=np.int64,
+        )
+        i = np.searchsorted(start_days, days, side="right") - 1
+        in_force = (i >= 0) & (days <= end_days[np.maximum(i, 0)])
+        return np.where(in_force, i, -1)
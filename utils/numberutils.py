@@ -1,2 +1,25 @@
 def accounting_format(n: float):
     return "{:20,.2f}".format(n)
+
+
+def to_int(v, default: int = 0) -> int:
+    """int of a number or a sheet cell such as "5,000", `default` when blank or -"""
+    if v is None:
+        return default
+    if isinstance(v, str):
+        v = v.replace(",", "").strip()
+        if not v or v == "-":
+            return default
+        return int(float(v))
+    return int(v)
+
+
+def to_float(v, default: float = 0.0) -> float:
+    """float of a number or a sheet cell such as "20.5", `default` when blank or -"""
+    if v is None:
+        return default
+    if isinstance(v, str):
+        v = v.replace(",", "").strip()
+        if not v or v == "-":
+            return default
+    return float(v)
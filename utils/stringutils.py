@@ -1,4 +1,5 @@
 import uuid
+from typing import Tuple
 
 from adapter.google import sheets
 
@@ -35,6 +36,26 @@ def __to_trader(o) -> dict:
     }
 
 
+def snapshot() -> Tuple[dict, dict, dict]:
+    """the abbreviations and nicknames loaded, to `restore` in another process"""
+    if not _NICKNAME_TO_TRADER:
+        init()
+    return (
+        dict(_EXPANSION_TO_ABBREVIATION),
+        dict(_ABBREVIATION_TO_EXPANSION),
+        dict(_NICKNAME_TO_TRADER),
+    )
+
+
+def restore(snapshot: Tuple[dict, dict, dict]) -> None:
+    for loaded, values in zip(
+        (_EXPANSION_TO_ABBREVIATION, _ABBREVIATION_TO_EXPANSION, _NICKNAME_TO_TRADER),
+        snapshot,
+    ):
+        loaded.clear()
+        loaded.update(values)
+
+
 def generate_uuid() -> str:
     return str(uuid.uuid4())
 